@@ -0,0 +1,53 @@
+"""
+Check the exact Markov-chain scores against Match.play simulations.
+
+For every pairing of table-driven strategies in the config, prints the exact
+expected scores, the Monte Carlo mean over --samples matches and the z-score of
+the difference. Values well outside +/-3 point at a modelling error.
+
+Usage:
+    python -m benchmarks.analytic_vs_montecarlo --samples 2000 -- noise=0.1 rounds=100
+"""
+import argparse
+import itertools
+import logging
+import statistics
+import time
+from benchmarks.common import load_bench_config
+from src.analytic import expected_match
+from src.batch import BatchMatchEngine, PAYOFF_KEYS
+from src.tournament import Match, Tournament
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--samples", type=int, default=1000)
+    parser.add_argument("overrides", nargs="*")
+    args = parser.parse_args()
+
+    config = load_bench_config(["logging.verbose=false", "gui.enabled=false", "rounds_random=false"] + args.overrides)
+    players = [p for p in Tournament(config).players if BatchMatchEngine.supports(p)]
+    logger = logging.getLogger("TournamentLogger")
+    logger.setLevel(logging.WARNING)
+
+    for p1, p2 in itertools.combinations(players, 2):
+        start = time.perf_counter()
+        payoffs = [config.payoff_matrix.dict()[key] for key in PAYOFF_KEYS]
+        exact = expected_match(p1.cooperation_table(), p2.cooperation_table(), payoffs,
+                               config.noise, config.shock_frequency, config.shock_duration, rounds=config.rounds)
+        solve_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        samples = [Match(p1.spawn(), p2.spawn(), config, logger, seed).play(1.0) for seed in range(args.samples)]
+        sim_time = time.perf_counter() - start
+
+        line = f"{str(p1):<18} {str(p2):<18}"
+        for k in range(2):
+            scores = [s[k] for s in samples]
+            mean = statistics.mean(scores)
+            stderr = statistics.stdev(scores) / len(scores) ** 0.5 if len(scores) > 1 else float("nan")
+            z = (mean - exact[f"score{k + 1}"]) / stderr if stderr else 0.0
+            line += f" exact {exact[f'score{k + 1}']:8.2f} sim {mean:8.2f} z {z:+5.2f} |"
+        print(f"{line} solve {solve_time * 1e3:.1f}ms vs sim {sim_time * 1e3:.0f}ms")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+"""
+Check that a pairing's batch-engine result depends only on its own seed.
+
+Plays the table-driven pairings of the config as one batch, then again with
+each strategy left out in turn and once as one-match batches, and reports any
+pairing whose result changed.
+
+Usage:
+    python -m benchmarks.batch_isolation -- rounds_random=true noise=0.1
+"""
+import argparse
+import logging
+from benchmarks.common import load_bench_config
+from src.agents.llm.base import LLMAgentBase
+from src.batch import BatchMatchEngine
+from src.tournament import STRATEGY_MAP, Match, Tournament
+
+def play(tournament, pairs, batches):
+    """Results of `pairs` (player index pairs) played as the given batches of positions into `pairs`."""
+    seeds = dict(zip(pairs, tournament.pairing_seeds(pairs)))
+    logger = logging.getLogger("TournamentLogger")
+    results = {}
+    for batch in batches:
+        matches = [Match(tournament.players[i], tournament.players[j], tournament.config, logger, seeds[(i, j)])
+                   for i, j in (pairs[k] for k in batch)]
+        for k, result in zip(batch, BatchMatchEngine().play(matches, 1.0)):
+            results[pairs[k]] = result
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("overrides", nargs="*")
+    args = parser.parse_args()
+
+    config = load_bench_config(["logging.verbose=false", "gui.enabled=false", "network.enabled=false",
+                                "engine=batch"] + args.overrides)
+    if config.seed is None:
+        config.seed = 0
+    config.strategies = [name for name in config.strategies
+                         if name in STRATEGY_MAP and not issubclass(STRATEGY_MAP[name], LLMAgentBase)]
+    tournament = Tournament(config)
+    players = [k for k, player in enumerate(tournament.players) if BatchMatchEngine.supports(player)]
+    pairs = [(i, j) for i in players for j in players if i < j]
+    full = play(tournament, pairs, [range(len(pairs))])
+
+    runs = {"one match per batch": play(tournament, pairs, [[k] for k in range(len(pairs))])}
+    for left_out in players:
+        subset = [pair for pair in pairs if left_out not in pair]
+        runs[f"without {tournament.players[left_out]}"] = play(tournament, subset, [range(len(subset))])
+    failures = 0
+    for label, results in runs.items():
+        changed = [pair for pair, result in results.items() if result != full[pair]]
+        failures += len(changed)
+        print(f"{label:<32} {len(results):>4} pairings, {len(changed)} changed")
+    print("identical results: " + str(failures == 0))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,28 @@
+"""
+Compare Strategy.spawn() with copy.deepcopy for every configured strategy.
+
+Usage:
+    python -m benchmarks.clone_vs_deepcopy --repeat 20000 -- meta_agent.switch_frequency=10
+"""
+import argparse
+import copy
+import timeit
+from benchmarks.common import load_bench_config
+from src.tournament import Tournament
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=10000)
+    parser.add_argument("overrides", nargs="*")
+    args = parser.parse_args()
+
+    config = load_bench_config(["logging.verbose=false", "gui.enabled=false"] + args.overrides)
+    tournament = Tournament(config)
+    print(f"{'strategy':<24}{'deepcopy (us)':>15}{'spawn (us)':>12}{'speedup':>10}")
+    for player in tournament.players:
+        deep = timeit.timeit(lambda: copy.deepcopy(player), number=args.repeat) / args.repeat
+        spawn = timeit.timeit(player.spawn, number=args.repeat) / args.repeat
+        print(f"{str(player):<24}{deep * 1e6:>15.1f}{spawn * 1e6:>12.1f}{deep / spawn:>9.1f}x")
+
+if __name__ == "__main__":
+    main()
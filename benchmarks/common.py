@@ -0,0 +1,9 @@
+from hydra import compose, initialize
+from omegaconf import OmegaConf
+from src.config import load_config
+
+def load_bench_config(overrides=None):
+    """Compose conf/config.yaml with Hydra overrides, as main.py would."""
+    with initialize(version_base=None, config_path="../conf"):
+        cfg = compose(config_name="config", overrides=overrides or [])
+    return load_config(OmegaConf.to_container(cfg, resolve=True))
@@ -0,0 +1,43 @@
+"""
+Compare LLM match throughput of the sequential path and the asyncio scheduler.
+
+Needs the LLM agents in the config to be reachable (e.g. a vLLM server at
+local_llm_params.endpoint).
+
+Usage:
+    python -m benchmarks.llm_scheduler --concurrency 1 4 16 -- rounds=20 'strategies=[LocalLLMAgent,Grudger,Joss]'
+"""
+import argparse
+from benchmarks.common import load_bench_config
+from src.scheduler import LLMMatchScheduler
+from src.tournament import Tournament
+
+def llm_matches_per_second(config):
+    tournament = Tournament(config)
+    tournament.run()
+    llm_matches = sum(
+        LLMMatchScheduler.involves_llm(tournament.players[i], tournament.players[j])
+        for i, j in tournament.pairings()
+    )
+    return llm_matches, llm_matches / tournament.elapsed
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[4, 16])
+    parser.add_argument("overrides", nargs="*")
+    args = parser.parse_args()
+
+    config = load_bench_config(["logging.verbose=false", "gui.enabled=false", "network.enabled=false"]
+                               + args.overrides)
+    config.llm_scheduler.enabled = False
+    matches, sequential = llm_matches_per_second(config)
+    print(f"sequential: {sequential:.2f} matches/s ({matches} LLM matches)")
+    for concurrency in args.concurrency:
+        scheduled_config = config.model_copy(deep=True)
+        scheduled_config.llm_scheduler.enabled = True
+        scheduled_config.llm_scheduler.max_concurrency = concurrency
+        _, scheduled = llm_matches_per_second(scheduled_config)
+        print(f"concurrency {concurrency}: {scheduled:.2f} matches/s ({scheduled / sequential:.1f}x)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""
+Measure LLM tournament throughput and per-call tail latency against the bundled
+mock server (src/agents/llm/mock_server.py), through the real agent code.
+
+The mock server runs in its own process. The tournament is played once
+sequentially and once per scheduler concurrency level, and each run reports
+matches per second and the p50/p95/p99 latency of the LLM calls.
+
+Usage:
+    python -m benchmarks.llm_throughput --concurrency 1 4 16 --latency lognormal --latency-ms 100 -- rounds=20
+    python -m benchmarks.llm_throughput --remote -- rounds=20   # RemoteLLMAgent via the OpenAI client
+"""
+import argparse
+import os
+import subprocess
+import sys
+import time
+import requests
+from benchmarks.common import load_bench_config
+from src.agents.llm.client import CLIENT_POOL
+from src.scheduler import LLMMatchScheduler
+from src.tournament import Tournament
+
+DEFAULT_STRATEGIES = ["LocalLLMAgent", "TitForTatExtended", "AlwaysDefect", "Grudger", "Joss"]
+
+def start_mock_server(args):
+    command = [sys.executable, "-m", "src.agents.llm.mock_server", "--port", str(args.port),
+               "--latency", args.latency, "--latency-ms", str(args.latency_ms),
+               "--latency-spread", str(args.latency_spread), "--per-prompt-ms", str(args.per_prompt_ms),
+               "--error-rate", str(args.error_rate), "--seed", "0"]
+    server = subprocess.Popen(command, stdout=subprocess.DEVNULL)
+    url = f"http://127.0.0.1:{args.port}"
+    for _ in range(100):
+        if server.poll() is not None:
+            raise RuntimeError(f"Mock server exited (is port {args.port} already in use?)")
+        try:
+            requests.get(f"{url}/v1/models", timeout=1)
+            return server, url
+        except requests.exceptions.ConnectionError:
+            time.sleep(0.05)
+    server.terminate()
+    raise RuntimeError(f"Mock server did not start on {url}")
+
+def run(config, label):
+    CLIENT_POOL.reset_stats()
+    tournament = Tournament(config)
+    tournament.run()
+    llm_matches = sum(
+        LLMMatchScheduler.involves_llm(tournament.players[i], tournament.players[j])
+        for i, j in tournament.pairings()
+    )
+    line = (f"{label:>16}: {llm_matches / tournament.elapsed:7.2f} matches/s "
+            f"({llm_matches} LLM matches, {len(tournament.failed_matches)} abandoned)")
+    for provider, stats in CLIENT_POOL.latency_summary().items():
+        line += (f" | {provider}: {stats['calls']} calls, {stats['retries']} retries, "
+                 f"p50 {stats['p50_ms']:.0f} ms, p95 {stats['p95_ms']:.0f} ms, p99 {stats['p99_ms']:.0f} ms")
+    print(line)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 16])
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", default="lognormal")
+    parser.add_argument("--latency-ms", type=float, default=50.0)
+    parser.add_argument("--latency-spread", type=float, default=0.5)
+    parser.add_argument("--per-prompt-ms", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--remote", action="store_true", help="Play RemoteLLMAgent (openai) instead of LocalLLMAgent")
+    parser.add_argument("overrides", nargs="*")
+    args = parser.parse_args()
+
+    server, url = start_mock_server(args)
+    try:
+        overrides = ["logging.verbose=false", "gui.enabled=false", "network.enabled=false",
+                     f"local_llm_params.endpoint={url}", f"remote_llm_params.api_base={url}/v1",
+                     "remote_llm_params.provider=openai"]
+        if not any(o.startswith("strategies=") for o in args.overrides):
+            strategies = ["RemoteLLMAgent" if s == "LocalLLMAgent" and args.remote else s
+                          for s in DEFAULT_STRATEGIES]
+            overrides.append(f"strategies=[{','.join(strategies)}]")
+        if args.remote:
+            os.environ.setdefault("OPENAI_API_KEY", "mock")
+        config = load_bench_config(overrides + args.overrides)
+
+        config.llm_scheduler.enabled = False
+        run(config, "sequential")
+        for concurrency in args.concurrency:
+            scheduled_config = config.model_copy(deep=True)
+            scheduled_config.llm_scheduler.enabled = True
+            scheduled_config.llm_scheduler.max_concurrency = concurrency
+            run(scheduled_config, f"concurrency {concurrency}")
+    finally:
+        server.terminate()
+        server.wait()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+"""
+Compare tournament time with verbose logging against a quiet run.
+
+Runs the same seeded tournament quiet (INFO) and verbose (DEBUG) at each
+--sample-rates value of logging.round_sample_rate, and prints each run's time
+relative to the quiet one. Every run waits for the log queue to drain, so
+records still being written count against it. Verbose runs echo their records
+to the console, so send stderr elsewhere.
+
+Usage:
+    python -m benchmarks.logging_overhead --sample-rates 0 0.001 0.01 1 -- rounds=2000 2>/dev/null
+"""
+import argparse
+import os
+import statistics
+import tempfile
+import time
+from benchmarks.common import load_bench_config
+from src.agents.llm.base import LLMAgentBase
+from src.logger import shutdown_logger
+from src.tournament import STRATEGY_MAP, Tournament
+
+def timed_run(config):
+    """Seconds from Tournament() until every log record has been written."""
+    shutdown_logger()
+    start = time.perf_counter()
+    Tournament(config).run()
+    shutdown_logger()
+    return time.perf_counter() - start
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sample-rates", nargs="+", type=float, default=[0.0, 0.001, 0.01, 1.0])
+    parser.add_argument("--repeats", type=int, default=3, help="Runs per setting; the median is reported")
+    parser.add_argument("overrides", nargs="*")
+    args = parser.parse_args()
+
+    config = load_bench_config(["gui.enabled=false", "network.enabled=false"] + args.overrides)
+    if config.seed is None:
+        config.seed = 0
+    config.strategies = [name for name in config.strategies
+                         if name in STRATEGY_MAP and not issubclass(STRATEGY_MAP[name], LLMAgentBase)]
+    with tempfile.TemporaryDirectory() as tmp:
+        config.logging.log_file = os.path.join(tmp, "tournament.log")
+        settings = [("quiet", False, config.logging.round_sample_rate)]
+        settings += [(f"verbose, sample rate {rate:g}", True, rate) for rate in args.sample_rates]
+        baseline = None
+        for label, verbose, rate in settings:
+            run_config = config.model_copy(deep=True)
+            run_config.logging.verbose = verbose
+            run_config.logging.round_sample_rate = rate
+            elapsed = statistics.median(timed_run(run_config) for _ in range(args.repeats))
+            baseline = baseline or elapsed
+            print(f"{label:<30} {elapsed:6.2f}s  {elapsed / baseline - 1:+7.1%}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,41 @@
+"""
+Compare the serial tournament with the process-pool executor.
+
+Usage:
+    python -m benchmarks.parallel_speedup --workers 1 4 8 -- rounds=500 seed=7
+
+Anything after `--` is passed to Hydra as config overrides.
+"""
+import argparse
+from benchmarks.common import load_bench_config
+from src.tournament import Tournament
+
+def run(config):
+    tournament = Tournament(config)
+    tournament.run()
+    return tournament
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, nargs="+", default=[2, 4])
+    parser.add_argument("overrides", nargs="*")
+    args = parser.parse_args()
+
+    overrides = ["logging.verbose=false", "gui.enabled=false"] + args.overrides
+    config = load_bench_config(overrides)
+    if config.seed is None:
+        config.seed = 0
+
+    serial = run(config)
+    print(f"serial: {serial.elapsed:.2f}s for {len(serial.match_results)} matches")
+    for workers in args.workers:
+        parallel_config = config.model_copy(deep=True)
+        parallel_config.parallel.enabled = True
+        parallel_config.parallel.workers = workers
+        parallel = run(parallel_config)
+        identical = parallel.match_results == serial.match_results
+        print(f"{workers} workers: {parallel.elapsed:.2f}s, "
+              f"speedup {serial.elapsed / parallel.elapsed:.2f}x, identical results: {identical}")
+
+if __name__ == "__main__":
+    main()
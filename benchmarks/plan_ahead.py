@@ -0,0 +1,50 @@
+"""
+Compare LLM calls and scores per match across plan horizons, playing against
+the bundled mock server.
+
+Usage:
+    python -m benchmarks.plan_ahead --horizons 1 5 10 -- rounds=100
+"""
+import argparse
+from collections import defaultdict
+from benchmarks.common import load_bench_config
+from benchmarks.llm_throughput import start_mock_server
+from src.tournament import Tournament
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--horizons", nargs="+", type=int, default=[1, 5, 10])
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("overrides", nargs="*")
+    args = parser.parse_args()
+    # Mock server settings: no latency, no errors.
+    args.latency, args.latency_ms, args.latency_spread, args.per_prompt_ms, args.error_rate = "fixed", 0, 0, 0, 0
+
+    server, url = start_mock_server(args)
+    try:
+        overrides = ["logging.verbose=false", "gui.enabled=false", "network.enabled=false",
+                     "llm_scheduler.enabled=true", f"local_llm_params.endpoint={url}",
+                     "strategies=[LocalLLMAgent,AlwaysCooperate,Grudger,TitForTatExtended,RandomStrategy]"]
+        config = load_bench_config(overrides + args.overrides)
+        print(f"{'horizon':>7} {'opponent':>18} {'calls':>7} {'planned':>7} {'replans':>7} {'score':>7}")
+        for horizon in args.horizons:
+            horizon_config = config.model_copy(deep=True)
+            horizon_config.local_llm_params.plan_horizon = horizon
+            tournament = Tournament(horizon_config)
+            tournament.run()
+            rows = defaultdict(list)
+            for index, agent, opponent, stats in tournament.llm_telemetry.matches:
+                if agent != "LocalLLMAgent":
+                    continue
+                result = tournament.match_results[index]
+                score = result["score1"] if result["player1"] == agent else result["score2"]
+                rows[opponent].append((stats.calls, stats.planned_moves, stats.replans, score))
+            for opponent, matches in rows.items():
+                calls, planned, replans, score = (sum(column) / len(matches) for column in zip(*matches))
+                print(f"{horizon:>7} {opponent:>18} {calls:7.1f} {planned:7.1f} {replans:7.1f} {score:7.1f}")
+    finally:
+        server.terminate()
+        server.wait()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,42 @@
+"""
+Compare prompt tokens per match across LLM prompt modes, playing against the
+bundled mock server.
+
+Usage:
+    python -m benchmarks.prompt_modes --modes full window rle stats -- rounds=200
+"""
+import argparse
+from benchmarks.common import load_bench_config
+from benchmarks.llm_throughput import start_mock_server
+from src.agents.llm.prompt_templates import PROMPT_MODES
+from src.tournament import Tournament
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--modes", nargs="+", choices=PROMPT_MODES, default=list(PROMPT_MODES))
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("overrides", nargs="*")
+    args = parser.parse_args()
+    # Mock server settings: no latency, no errors.
+    args.latency, args.latency_ms, args.latency_spread, args.per_prompt_ms, args.error_rate = "fixed", 0, 0, 0, 0
+
+    server, url = start_mock_server(args)
+    try:
+        overrides = ["logging.verbose=false", "gui.enabled=false", "network.enabled=false",
+                     "llm_scheduler.enabled=true", f"local_llm_params.endpoint={url}",
+                     "strategies=[LocalLLMAgent,TitForTatExtended,AlwaysDefect,RandomStrategy]"]
+        config = load_bench_config(overrides + args.overrides)
+        for mode in args.modes:
+            mode_config = config.model_copy(deep=True)
+            mode_config.local_llm_params.prompt_mode = mode
+            tournament = Tournament(mode_config)
+            tournament.run()
+            matches = [stats for _, agent, _, stats in tournament.llm_telemetry.matches if agent == "LocalLLMAgent"]
+            tokens = sum(stats.prompt_tokens for stats in matches)
+            print(f"{mode:>8}: {tokens / len(matches):9.0f} prompt tokens per match ({len(matches)} matches)")
+    finally:
+        server.terminate()
+        server.wait()
+
+if __name__ == "__main__":
+    main()
@@ -13,9 +13,8 @@ def main(cfg: DictConfig):
     tournament.save_results("tournament_results.csv")
     # Prepare leaderboard data.
     sorted_scores = sorted(tournament.scores.items(), key=lambda x: x[1], reverse=True)
-    # For demonstration, we simulate cooperation rate history as random values.
-    # In practice, you would record the global cooperation rate after each match.
-    coop_rate_history = [round(0.5 + 0.1 * (i % 3) - 0.05*i, 2) for i in range(len(tournament.match_results))]
+    # Global cooperation rate recorded after each match.
+    coop_rate_history = tournament.metrics.history
     if config.gui.enabled:
         show_leaderboard(sorted_scores, coop_rate_history)
 
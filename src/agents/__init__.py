@@ -1,2 +1,2 @@
 # Import essential components for external use
-from src.agents.learning import QLearningAgent
\ No newline at end of file
+from src.agents.learning import QLearningAgent, QLearningPopulation
\ No newline at end of file
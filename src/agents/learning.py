@@ -1,49 +1,160 @@
-import random
+import numpy as np
 from src.strategies.base import Strategy
 
+# Q-learning states are small integers. State 0 is the start of a match; after
+# that the state encodes the last (up to 2) rounds as pairs 2 * my_move +
+# opponent_move (C=0, D=1), oldest first: 1-4 after one round, 5-20 after two
+# or more. Actions are 0 (C) and 1 (D).
+N_STATES = 21
+START_STATE = 0
+ACTIONS = ("C", "D")
+_MOVE_BITS = {"C": 0, "D": 1}
+
+def _next_state(state: int, pair: int) -> int:
+    if state == START_STATE:
+        return 1 + pair
+    if state < 5:
+        return 5 + 4 * (state - 1) + pair
+    return 5 + 4 * ((state - 5) % 4) + pair
+
+# NEXT_STATE[state, pair] is the state after a round with that move pair.
+NEXT_STATE = np.array([[_next_state(s, pair) for pair in range(4)] for s in range(N_STATES)], dtype=np.int64)
+_NEXT_STATE_LISTS = NEXT_STATE.tolist()
+
+def q_update(q_values, states, actions, rewards, next_states, learning_rate, discount_factor, rows=None):
+    """
+    One Q-learning step for many learners at once, in place.
+
+    Args:
+        q_values: Array (learners, N_STATES, 2).
+        states, actions, next_states: Integer arrays, one entry per updated learner.
+        rewards: Array, one entry per updated learner.
+        learning_rate, discount_factor: Scalars or arrays like `rewards`.
+        rows: Learners to update (default all of them).
+    """
+    if rows is None:
+        rows = np.arange(len(q_values))
+    future = q_values[rows, next_states].max(axis=1)
+    old = q_values[rows, states, actions]
+    q_values[rows, states, actions] = old + learning_rate * (rewards + discount_factor * future - old)
+
+def save_q_tables(path, q_values, matches_trained, names=None):
+    """
+    Write a checkpoint of one or more Q-tables as a compressed .npz.
+
+    Args:
+        q_values: Array (learners, N_STATES, 2).
+        matches_trained: Matches each table has learned from.
+        names: Optional label per learner.
+    """
+    q_values = np.asarray(q_values, dtype=np.float64)
+    np.savez_compressed(
+        path,
+        q_values=q_values,
+        matches_trained=np.asarray(matches_trained, dtype=np.int64),
+        names=np.array(names if names is not None else [""] * len(q_values), dtype=np.str_),
+    )
+
+def load_q_tables(path) -> dict:
+    """Read a checkpoint written by save_q_tables."""
+    with np.load(path, allow_pickle=False) as data:
+        q_values = data["q_values"]
+        if q_values.ndim != 3 or q_values.shape[1:] != (N_STATES, 2):
+            raise ValueError(f"{path} holds Q-tables of shape {q_values.shape[1:]}, expected ({N_STATES}, 2)")
+        return {"q_values": q_values, "matches_trained": data["matches_trained"], "names": data["names"].tolist()}
+
 class QLearningAgent(Strategy):
+    per_match_state = Strategy.per_match_state + ("q_values",)
+    memory_depth = 2
+
     def __init__(self, learning_rate=0.1, discount_factor=0.9, exploration_rate=0.2):
         super().__init__("QLearningAgent")
         self.lr = learning_rate
         self.df = discount_factor
         self.epsilon = exploration_rate
-        self.q_values = {}
+        self.q_values = np.zeros((N_STATES, 2))
+        self.matches_trained = 0  # Matches the Q-values were learned over (with carry-over or checkpoints)
+        self.state = START_STATE
         self.last_state = None
         self.last_action = None
 
-    def get_state(self):
-        if not self.my_history or not self.opponent_history:
-            return None
-        # Using extended history (last 2 moves) as state.
-        return (tuple(self.my_history[-2:]), tuple(self.opponent_history[-2:]))
-
     def move(self) -> str:
-        state = self.get_state()
-        if state not in self.q_values:
-            self.q_values[state] = {"C": 0.0, "D": 0.0}
-        if random.random() < self.epsilon:
-            action = random.choice(["C", "D"])
+        if self.rng.random() < self.epsilon:
+            action = self.rng.choice(ACTIONS)
         else:
-            action = max(self.q_values[state], key=lambda a: self.q_values[state][a])
-        self.last_state = state
+            q = self.q_values[self.state]
+            # Ties go to C.
+            action = "D" if q[1] > q[0] else "C"
+        self.last_state = self.state
         self.last_action = action
         return action
 
     def update(self, reward, new_state):
-        if self.last_state is None:
+        # The opening move is not learned from.
+        if self.last_state is None or self.last_state == START_STATE:
             return
-        if new_state not in self.q_values:
-            self.q_values[new_state] = {"C": 0.0, "D": 0.0}
-        old = self.q_values[self.last_state][self.last_action]
-        future = max(self.q_values[new_state].values())
-        self.q_values[self.last_state][self.last_action] = old + self.lr * (reward + self.df * future - old)
+        q = self.q_values
+        action = _MOVE_BITS[self.last_action]
+        old = q[self.last_state, action]
+        future = max(q[new_state, 0], q[new_state, 1])
+        q[self.last_state, action] = old + self.lr * (reward + self.df * future - old)
 
     def record(self, my_move: str, opp_move: str, reward=0):
         super().record(my_move, opp_move)
-        new_state = self.get_state()
-        self.update(reward, new_state)
+        self.state = _NEXT_STATE_LISTS[self.state][2 * _MOVE_BITS[my_move] + _MOVE_BITS[opp_move]]
+        self.update(reward, self.state)
 
     def reset(self):
         super().reset()
+        self.state = START_STATE
         self.last_state = None
-        self.last_action = None
\ No newline at end of file
+        self.last_action = None
+
+class QLearningPopulation:
+    """
+    Many independent Q-learners stepped together as arrays, so a round costs
+    the same handful of NumPy calls however many learners there are.
+
+    Each learner has its own (N_STATES, 2) table in `q_values` and its own
+    current state; learning and exploration rates may be scalars or per-learner
+    arrays. Moves are 0 (C) and 1 (D).
+    """
+    def __init__(self, size, learning_rate=0.1, discount_factor=0.9, exploration_rate=0.2, q_values=None):
+        self.size = size
+        self.lr = learning_rate
+        self.df = discount_factor
+        self.epsilon = exploration_rate
+        self.q_values = np.zeros((size, N_STATES, 2)) if q_values is None else np.asarray(q_values, dtype=float)
+        self.states = np.full(size, START_STATE, dtype=np.int64)
+        self.actions = np.zeros(size, dtype=np.int64)
+
+    @classmethod
+    def from_agents(cls, agents):
+        """Population starting from the tables of QLearningAgents (which must share their rates)."""
+        first = agents[0]
+        return cls(len(agents), first.lr, first.df, first.epsilon, np.stack([a.q_values for a in agents]))
+
+    def reset(self, rows=None):
+        """Start a new match for every learner (or the given ones); the tables are kept."""
+        self.states[slice(None) if rows is None else rows] = START_STATE
+
+    def act(self, rng):
+        """Epsilon-greedy moves for every learner, drawn from the numpy Generator `rng`."""
+        rows = np.arange(self.size)
+        q = self.q_values[rows, self.states]
+        greedy = (q[:, 1] > q[:, 0]).astype(np.int64)
+        explore = rng.random(self.size) < self.epsilon
+        self.actions = np.where(explore, rng.integers(0, 2, self.size), greedy)
+        return self.actions
+
+    def observe(self, my_moves, opponent_moves, rewards):
+        """Record the round's moves (as played, after noise) and rewards, and learn from them."""
+        next_states = NEXT_STATE[self.states, 2 * np.asarray(my_moves) + np.asarray(opponent_moves)]
+        # As in QLearningAgent, the opening move is not learned from.
+        learners = np.flatnonzero(self.states != START_STATE)
+        if len(learners):
+            lr = self.lr if np.isscalar(self.lr) else self.lr[learners]
+            df = self.df if np.isscalar(self.df) else self.df[learners]
+            q_update(self.q_values, self.states[learners], self.actions[learners], np.asarray(rewards)[learners],
+                     next_states[learners], lr, df, learners)
+        self.states = next_states
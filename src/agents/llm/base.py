@@ -1,32 +1,137 @@
 from abc import abstractmethod
+import asyncio
 import os
+import time
 from src.strategies.base import Strategy
 from dotenv import load_dotenv
-from src.agents.llm.prompt_templates import BASIC_PROMPT, ADVANCED_PROMPT
+from src.agents.llm.prompt_templates import (BASIC_PROMPT, ADVANCED_PROMPT, PLAN_INSTRUCTION, PROMPT_MODES,
+                                             format_history, estimate_tokens)
+from src.agents.llm.decisions import DECISION_MODES, scale_probability
+from src.agents.llm.client import CLIENT_POOL
+from src.agents.llm.telemetry import CallStats
 
 # Load environment variables
 load_dotenv()
 
 class LLMAgentBase(Strategy):
-    def __init__(self, name="LLMAgent", temperature=0.1, extended_prompt=True, reward_visibility="none"):
+    # Usage and the current plan are per match.
+    per_match_state = Strategy.per_match_state + ("call_stats", "plan")
+    # Moves come from a model outside the seeded random streams, so results are not reused.
+    cacheable = False
+
+    def __init__(self, name="LLMAgent", temperature=0.1, extended_prompt=True, reward_visibility="none",
+                 prompt_mode="full", history_window=10, decision_mode="text", plan_horizon=1):
         super().__init__(name)
+        if prompt_mode not in PROMPT_MODES:
+            raise ValueError(f"Unknown prompt mode '{prompt_mode}'; expected one of {PROMPT_MODES}")
+        if decision_mode not in DECISION_MODES:
+            raise ValueError(f"Unknown decision mode '{decision_mode}'; expected one of {DECISION_MODES}")
+        if plan_horizon < 1:
+            raise ValueError(f"plan_horizon must be at least 1, got {plan_horizon}")
         self.temperature = temperature
         self.extended_prompt = extended_prompt
         self.reward_visibility = reward_visibility  # Options: "none", "self", "both"
+        self.prompt_mode = prompt_mode  # Options: "full", "window", "rle", "stats"
+        self.history_window = history_window  # Rounds shown in "window" mode
+        self.decision_mode = decision_mode  # Options: "text", "constrained"
+        self.plan_horizon = plan_horizon  # Moves planned per call; 1 asks every round
+        self.plan = []  # Planned moves not yet played
+        self.plan_assumption = None  # Opponent move the plan assumes
+        self.call_stats = CallStats()  # Calls, tokens and latencies this match
+        # Token counts reported by the backend for the last call, if any.
+        self.last_usage = None
         self.payoff_matrix = None  # Will be set by the tournament
+        self.decision_cache = None  # Optional DecisionCache shared by the tournament
+        self.budget = None  # Optional LLMBudget shared by the tournament
     
     def move(self) -> str:
+        if self.plan:
+            # Keep following the plan while the opponent plays as assumed.
+            if self.opponent_history[len(self.opponent_history) - 1] == self.plan_assumption:
+                self.call_stats.record_planned_move()
+                return self.plan.pop(0)
+            self.call_stats.record_replan()
+            self.plan = []
+        cache = self.decision_cache
+        if cache is not None:
+            key = cache.make_key(self.cache_identity(), self.my_history, self.opponent_history,
+                                 self.reputation, self.payoff_matrix)
+            decision = cache.lookup(key, self.temperature, self.rng)
+            if decision is not None:
+                self.call_stats.record_cache_hit()
+                return decision
+        if self.budget is not None:
+            self.budget.check()
+        if self.plan_horizon > 1:
+            decision = self.make_plan()
+            if cache is not None:
+                cache.store(key, decision)
+            return decision
         prompt = self.build_prompt()
+        self.last_usage = None
+        start = time.perf_counter()
+        if self.decision_mode == "constrained":
+            # Sample locally from the model's C/D probabilities.
+            p_cooperate = scale_probability(self.get_cooperation_probability(prompt), self.temperature)
+            self.record_call(prompt, time.perf_counter() - start)
+            decision = "C" if self.rng.random() < p_cooperate else "D"
+            if cache is not None:
+                cache.store_probability(key, p_cooperate)
+            return decision
         decision = self.get_llm_decision(prompt)
+        self.record_call(prompt, time.perf_counter() - start)
+        if cache is not None:
+            cache.store(key, decision)
         return decision
 
+    def make_plan(self) -> str:
+        """
+        Ask for the next `plan_horizon` moves in one call, assuming the opponent
+        repeats its last move (cooperates if there is none). Returns the first
+        move and keeps the rest in `plan`. Plans are always read from text.
+        """
+        rounds = len(self.opponent_history)
+        self.plan_assumption = self.opponent_history[rounds - 1] if rounds else "C"
+        prompt = self.build_prompt() + PLAN_INSTRUCTION.format(horizon=self.plan_horizon,
+                                                               assumed=self.plan_assumption)
+        self.last_usage = None
+        start = time.perf_counter()
+        moves = self.get_llm_plan(prompt)
+        self.record_call(prompt, time.perf_counter() - start)
+        self.plan = moves[1:]
+        return moves[0]
+
+    def record_call(self, prompt: str, latency: float):
+        """Add a finished call to this match's stats and charge it to the budget."""
+        usage = self.last_usage or {}
+        prompt_tokens = usage.get("prompt_tokens") or estimate_tokens(prompt)
+        completion_tokens = usage.get("completion_tokens") or 1
+        retries = max(0, CLIENT_POOL.last_attempts() - 1)
+        self.call_stats.record_call(prompt_tokens, completion_tokens, latency, retries)
+        if self.budget is not None:
+            self.budget.charge(prompt_tokens, completion_tokens)
+
+    def cache_identity(self) -> tuple:
+        """Everything besides the game state that changes how the agent answers."""
+        return (self.name, getattr(self, "provider", "local"), getattr(self, "model", None),
+                self.temperature, self.extended_prompt, self.reward_visibility, self.prompt_mode,
+                self.decision_mode, self.plan_horizon)
+
+    def reset(self):
+        super().reset()
+        self.plan = []
+
+    async def move_async(self) -> str:
+        # The LLM call blocks, so run it on the event loop's worker threads.
+        return await asyncio.to_thread(self.move)
+
     def build_prompt(self) -> str:
         rounds = len(self.my_history)
         
         if rounds == 0:
             return f"No history. Please choose C or D. Your reputation is {self.reputation:.2f}."
             
-        history = f"Your moves: {','.join(self.my_history)}; Opponent moves: {','.join(self.opponent_history)}."
+        history = self.format_history()
         
         # Build a reward info string based on configuration
         rewards_info = self.build_rewards_info()
@@ -46,6 +151,9 @@ class LLMAgentBase(Strategy):
             
         return prompt
     
+    def format_history(self) -> str:
+        return format_history(self.my_history, self.opponent_history, self.prompt_mode, self.history_window)
+
     def build_rewards_info(self) -> str:
         if self.reward_visibility == "none" or not hasattr(self, 'round_rewards'):
             return ""
@@ -63,4 +171,19 @@ class LLMAgentBase(Strategy):
     @abstractmethod
     def get_llm_decision(self, prompt: str) -> str:
         """Get decision from an LLM. Must be implemented by subclasses."""
-        pass
\ No newline at end of file
+        pass
+
+    def get_cooperation_probability(self, prompt: str) -> float:
+        """
+        P(C) for the "constrained" decision mode, from a single C/D token.
+        Subclasses whose backend returns log-probabilities override this; the
+        default treats the model's answer as certain.
+        """
+        return 1.0 if self.get_llm_decision(prompt) == "C" else 0.0
+
+    def get_llm_plan(self, prompt: str) -> list:
+        """
+        Up to `plan_horizon` moves for a plan prompt. Subclasses override this;
+        the default asks for a single decision.
+        """
+        return [self.get_llm_decision(prompt)]
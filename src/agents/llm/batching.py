@@ -0,0 +1,75 @@
+import json
+import threading
+from concurrent.futures import Future
+import requests
+
+class CompletionBatcher:
+    """
+    Groups /v1/completions calls from concurrent callers into batched requests.
+
+    A caller blocks in complete() while its prompt waits for others with the same
+    parameters, for at most `max_wait` seconds or until `max_batch` prompts are
+    pending. The batch is then sent as one request with a list of prompts, which
+    vLLM (and other OpenAI-compatible servers) answer with one choice per prompt.
+    """
+    def __init__(self, endpoint, max_batch=16, max_wait=0.005, timeout=30, session=None):
+        self.url = f"{endpoint}/v1/completions"
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self.timeout = timeout
+        self.owns_session = session is None
+        self.session = session if session is not None else requests.Session()
+        self.lock = threading.Lock()
+        self.pending = {}  # parameters -> list of (prompt, Future)
+        self.requests_sent = 0
+        self.prompts_sent = 0
+
+    def complete(self, params: dict, prompt: str) -> dict:
+        """Return the completion choice for `prompt` (blocks until its batch is answered)."""
+        key = json.dumps(params, sort_keys=True)  # params may hold lists (e.g. guided_choice)
+        future = Future()
+        with self.lock:
+            batch = self.pending.get(key)
+            if batch is None:
+                batch = self.pending[key] = []
+                timer = threading.Timer(self.max_wait, self._flush, args=(key, batch))
+                timer.daemon = True
+                timer.start()
+            batch.append((prompt, future))
+            full = len(batch) >= self.max_batch
+            if full:
+                del self.pending[key]
+        if full:
+            self._send(params, batch)
+        return future.result()
+
+    def _flush(self, key, batch):
+        with self.lock:
+            # The batch may already have been sent because it filled up.
+            if self.pending.get(key) is not batch:
+                return
+            del self.pending[key]
+        self._send(json.loads(key), batch)
+
+    def _send(self, params, batch):
+        try:
+            response = self.session.post(
+                self.url, json={**params, "prompt": [prompt for prompt, _ in batch]}, timeout=self.timeout
+            )
+            response.raise_for_status()
+            choices = sorted(response.json().get("choices", []), key=lambda c: c.get("index", 0))
+            if len(choices) != len(batch):
+                raise ValueError(f"Expected {len(batch)} choices, got {len(choices)}")
+        except Exception as e:
+            for _, future in batch:
+                future.set_exception(e)
+            return
+        with self.lock:
+            self.requests_sent += 1
+            self.prompts_sent += len(batch)
+        for (_, future), choice in zip(batch, choices):
+            future.set_result(choice)
+
+    def close(self):
+        if self.owns_session:
+            self.session.close()
@@ -0,0 +1,108 @@
+import json
+import os
+import threading
+from collections import OrderedDict
+
+class DecisionCache:
+    """
+    LRU cache of LLM decisions keyed on a normalized game state.
+
+    The key is the agent's identity (name, model, temperature, prompt style),
+    the last `history_window` moves of each player, the reputation rounded to
+    `reputation_bucket` and the payoff matrix, so equivalent situations share an
+    entry even when the raw prompts differ.
+
+    Each entry counts the C and D answers seen for its state. At temperatures up
+    to `deterministic_temperature` one answer is reused as is; above it the cache
+    keeps asking the model until it has `min_samples` answers and then samples
+    from their C/D distribution.
+    """
+    def __init__(self, max_entries=10000, path=None, history_window=3, reputation_bucket=0.1,
+                 min_samples=5, deterministic_temperature=0.05):
+        self.max_entries = max_entries
+        self.path = path
+        self.history_window = history_window
+        self.reputation_bucket = reputation_bucket
+        self.min_samples = min_samples
+        self.deterministic_temperature = deterministic_temperature
+        self.entries = OrderedDict()  # key -> [cooperations, defections]
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+        if path and os.path.exists(path):
+            self.load(path)
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state["lock"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.lock = threading.Lock()
+
+    def make_key(self, identity, my_history, opponent_history, reputation, payoff_matrix):
+        window = self.history_window
+        start = max(0, len(my_history) - window)
+        payoffs = tuple(sorted(payoff_matrix.items())) if payoff_matrix else ()
+        return (
+            tuple(identity),
+            "".join(my_history[start:]),
+            "".join(opponent_history[start:]),
+            round(round(reputation / self.reputation_bucket) * self.reputation_bucket, 6),
+            payoffs,
+        )
+
+    def lookup(self, key, temperature, rng):
+        """Return a cached decision for `key`, or None if the model must be asked."""
+        with self.lock:
+            counts = self.entries.get(key)
+            deterministic = temperature <= self.deterministic_temperature
+            needed = 1 if deterministic else self.min_samples
+            if counts is None or sum(counts) < needed:
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+        if deterministic:
+            return "C" if counts[0] >= counts[1] else "D"
+        return "C" if rng.random() < counts[0] / sum(counts) else "D"
+
+    def store(self, key, decision):
+        with self.lock:
+            counts = self.entries.get(key)
+            if counts is None:
+                counts = self.entries[key] = [0, 0]
+            counts[0 if decision == "C" else 1] += 1
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+
+    def store_probability(self, key, p_cooperate):
+        """Record a known C/D distribution for `key`, counted as `min_samples` answers."""
+        with self.lock:
+            self.entries[key] = [p_cooperate * self.min_samples, (1 - p_cooperate) * self.min_samples]
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def save(self, path=None):
+        path = path or self.path
+        with self.lock:
+            entries = [[list(key[0]), key[1], key[2], key[3], [list(p) for p in key[4]], counts]
+                       for key, counts in self.entries.items()]
+        tmp = f"{path}.tmp"
+        with open(tmp, "w") as f:
+            json.dump(entries, f)
+        os.replace(tmp, path)
+
+    def load(self, path):
+        with open(path) as f:
+            entries = json.load(f)
+        for identity, mine, theirs, reputation, payoffs, counts in entries[-self.max_entries:]:
+            key = (tuple(identity), mine, theirs, reputation, tuple(tuple(p) for p in payoffs))
+            self.entries[key] = counts
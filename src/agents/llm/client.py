@@ -0,0 +1,212 @@
+import logging
+import os
+import random
+import threading
+import time
+import requests
+from requests.adapters import HTTPAdapter
+from src.logger import log_event
+
+class LLMCallError(RuntimeError):
+    """An LLM call failed for good. Ends the current match, not the tournament."""
+
+class TokenBucket:
+    """Blocking token-bucket limiter: `rate` calls per second with bursts of up to `burst`."""
+    def __init__(self, rate: float, burst: int = 1):
+        self.rate = rate
+        self.burst = max(1, burst)
+        self.tokens = float(self.burst)
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+# Transport failures raised by the optional OpenAI and Anthropic SDKs (both use
+# these names), matched by name so neither SDK has to be installed.
+SDK_TRANSIENT_ERRORS = ("APIConnectionError", "APITimeoutError", "RateLimitError", "InternalServerError")
+
+def _status(error):
+    """HTTP status code carried by an SDK or requests error, if any."""
+    status = getattr(error, "status_code", None)
+    if status is None:
+        status = getattr(getattr(error, "response", None), "status_code", None)
+    return status
+
+def _transport_error(error) -> bool:
+    return (isinstance(error, (requests.ConnectionError, requests.Timeout))
+            or type(error).__name__ in SDK_TRANSIENT_ERRORS)
+
+def _retryable(error) -> bool:
+    """Connection errors, timeouts, 429s and 5xx responses are worth retrying."""
+    if _transport_error(error):
+        return True
+    status = _status(error)
+    return status is not None and (status == 429 or status >= 500)
+
+class LLMClientPool:
+    """
+    Shared clients for every LLM agent in the process.
+
+    Holds one keep-alive requests.Session for OpenAI-compatible HTTP endpoints
+    and one SDK client per OpenAI/Anthropic configuration, so connections are
+    reused across moves and matches. call() applies a per-provider token bucket,
+    retries failed calls with jittered exponential backoff, records each call's
+    latency, and raises LLMCallError once the retries are used up or the
+    endpoint rejects the request (other 4xx). Exceptions that are neither
+    transport failures nor HTTP errors propagate unchanged.
+
+    A forked child (such as a process-pool worker) drops the inherited
+    connections and opens its own, so processes never share a socket.
+    """
+    def __init__(self, max_retries=3, backoff_base=0.5, backoff_max=8.0, timeout=30.0,
+                 pool_size=32, rate_limits=None, burst=1):
+        self.lock = threading.Lock()
+        self.configure(max_retries, backoff_base, backoff_max, timeout, pool_size, rate_limits, burst)
+        self._session = None
+        self._sdk_clients = {}
+        self._jitter = random.Random()
+        self._local = threading.local()  # attempts made by this thread's last call()
+        self.latencies = {}  # provider -> list of seconds for successful calls
+        self.retries = {}
+        self.errors = {}
+
+    def configure(self, max_retries=3, backoff_base=0.5, backoff_max=8.0, timeout=30.0,
+                  pool_size=32, rate_limits=None, burst=1):
+        """
+        Args:
+            max_retries: Retries after the first attempt before giving up.
+            backoff_base: Backoff before the first retry in seconds; doubles per retry.
+            backoff_max: Cap on a single backoff.
+            timeout: Per-request timeout in seconds.
+            pool_size: Keep-alive connections kept per host.
+            rate_limits: Provider name -> calls per second. Providers not listed are unlimited.
+            burst: Calls a provider may make back to back before its limit applies.
+        """
+        with self.lock:
+            self.max_retries = max_retries
+            self.backoff_base = backoff_base
+            self.backoff_max = backoff_max
+            self.timeout = timeout
+            self.pool_size = pool_size
+            self.buckets = {provider: TokenBucket(rate, burst)
+                            for provider, rate in (rate_limits or {}).items() if rate}
+
+    def session(self) -> requests.Session:
+        with self.lock:
+            if self._session is None:
+                self._session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=self.pool_size, pool_maxsize=self.pool_size)
+                self._session.mount("http://", adapter)
+                self._session.mount("https://", adapter)
+            return self._session
+
+    def openai_client(self, api_key, base_url=None):
+        key = ("openai", api_key, base_url)
+        with self.lock:
+            if key not in self._sdk_clients:
+                from openai import OpenAI
+                # Retries are handled by call(), not by the SDK.
+                self._sdk_clients[key] = OpenAI(api_key=api_key, base_url=base_url,
+                                                timeout=self.timeout, max_retries=0)
+            return self._sdk_clients[key]
+
+    def anthropic_client(self, api_key):
+        key = ("anthropic", api_key)
+        with self.lock:
+            if key not in self._sdk_clients:
+                import anthropic
+                self._sdk_clients[key] = anthropic.Anthropic(api_key=api_key, timeout=self.timeout, max_retries=0)
+            return self._sdk_clients[key]
+
+    def call(self, provider: str, fn, *args, **kwargs):
+        """Call `fn(*args, **kwargs)` under `provider`'s rate limit, retrying transient failures."""
+        logger = logging.getLogger("TournamentLogger")
+        bucket = self.buckets.get(provider)
+        for attempt in range(self.max_retries + 1):
+            self._local.attempts = attempt + 1
+            if bucket is not None:
+                bucket.acquire()
+            start = time.perf_counter()
+            try:
+                result = fn(*args, **kwargs)
+            except Exception as e:
+                with self.lock:
+                    self.errors[provider] = self.errors.get(provider, 0) + 1
+                if _status(e) is None and not _transport_error(e):
+                    # Not a failed call but a bug or missing dependency: let it surface.
+                    raise
+                if attempt == self.max_retries or not _retryable(e):
+                    raise LLMCallError(f"{provider} call failed after {attempt + 1} attempt(s): {e}") from e
+                delay = min(self.backoff_max, self.backoff_base * 2 ** attempt)
+                delay *= self._jitter.uniform(0.5, 1.0)
+                log_event(logger, logging.WARNING, "llm_retry", provider=provider, attempt=attempt + 1,
+                          delay_s=f"{delay:.2f}", error=e)
+                with self.lock:
+                    self.retries[provider] = self.retries.get(provider, 0) + 1
+                time.sleep(delay)
+                continue
+            latency = time.perf_counter() - start
+            with self.lock:
+                self.latencies.setdefault(provider, []).append(latency)
+            log_event(logger, logging.DEBUG, "llm_call", provider=provider, attempt=attempt + 1,
+                      latency_ms=f"{latency * 1000:.1f}")
+            return result
+
+    def last_attempts(self) -> int:
+        """Attempts made by the calling thread's most recent call()."""
+        return getattr(self._local, "attempts", 0)
+
+    def latency_summary(self) -> dict:
+        """Per-provider call counts, retries, errors and latency percentiles in milliseconds."""
+        summary = {}
+        with self.lock:
+            for provider in set(self.latencies) | set(self.errors):
+                ordered = sorted(self.latencies.get(provider, []))
+                pick = lambda q: 1000 * ordered[min(len(ordered) - 1, int(q * len(ordered)))] if ordered else 0.0
+                summary[provider] = {
+                    "calls": len(ordered),
+                    "retries": self.retries.get(provider, 0),
+                    "errors": self.errors.get(provider, 0),
+                    "mean_ms": 1000 * sum(ordered) / len(ordered) if ordered else 0.0,
+                    "p50_ms": pick(0.50),
+                    "p95_ms": pick(0.95),
+                    "p99_ms": pick(0.99),
+                }
+        return summary
+
+    def reset_stats(self):
+        with self.lock:
+            self.latencies = {}
+            self.retries = {}
+            self.errors = {}
+
+    def _after_fork(self):
+        # The inherited sockets still belong to the parent; leave them alone and
+        # let this process connect afresh.
+        self.lock = threading.Lock()
+        self._local = threading.local()
+        self._session = None
+        self._sdk_clients = {}
+
+    def close(self):
+        with self.lock:
+            if self._session is not None:
+                self._session.close()
+                self._session = None
+            for client in self._sdk_clients.values():
+                client.close()
+            self._sdk_clients = {}
+
+# Process-wide pool used by all LLM agents.
+CLIENT_POOL = LLMClientPool()
+os.register_at_fork(after_in_child=CLIENT_POOL._after_fork)
@@ -0,0 +1,83 @@
+import math
+import re
+
+# How LLM agents turn a model response into a move.
+#   text:        free-form reply of up to 10 tokens, parsed for C or D
+#   constrained: exactly one C/D token; the C/D log-probabilities give P(C) and
+#                the agent samples its move from that locally
+DECISION_MODES = ("text", "constrained")
+
+_LEADING_WORD = re.compile(r"[A-Z]+")
+_STANDALONE_MOVE = re.compile(r"\b([CD])\b")
+_PLAN_MOVES = re.compile(r"COOPERAT\w*|DEFECT\w*|\b[CD]+\b")
+
+def parse_decision(text: str) -> str:
+    """
+    Read a move from a model reply.
+
+    The first word decides when it is C, D or starts with COOPERATE/DEFECT;
+    otherwise the first standalone C or D, then the first mention of either
+    word. Replies with none of these count as cooperation.
+    """
+    text = text.upper()
+    first = _LEADING_WORD.search(text)
+    if first:
+        word = first.group(0)
+        if word == "C" or word.startswith("COOPERAT"):
+            return "C"
+        if word == "D" or word.startswith("DEFECT"):
+            return "D"
+    standalone = _STANDALONE_MOVE.search(text)
+    if standalone:
+        return standalone.group(1)
+    cooperate, defect = text.find("COOPERAT"), text.find("DEFECT")
+    if defect >= 0 and (cooperate < 0 or defect < cooperate):
+        return "D"
+    return "C"
+
+def cooperation_probability(top_logprobs):
+    """
+    P(C) from the top log-probabilities of a single generated token.
+
+    `top_logprobs` maps token strings to log-probabilities; tokens that are C or
+    D after stripping whitespace and case are pooled, and the two masses are
+    renormalized. Returns None when neither token is among them, since the
+    reply then says nothing about P(C).
+    """
+    mass = {"C": 0.0, "D": 0.0}
+    for token, logprob in (top_logprobs or {}).items():
+        move = token.strip().upper()
+        if move in mass and logprob is not None:
+            mass[move] += math.exp(logprob)
+    total = mass["C"] + mass["D"]
+    if total <= 0:
+        return None
+    return mass["C"] / total
+
+def scale_probability(p_cooperate: float, temperature: float) -> float:
+    """
+    P(C) sharpened or flattened by `temperature`, i.e. p ** (1 / temperature)
+    renormalized against P(D); temperature 0 gives the likelier move probability 1.
+    """
+    if temperature <= 0 or p_cooperate in (0.0, 1.0):
+        return 1.0 if p_cooperate >= 0.5 else 0.0
+    # Scaled log-odds, clamped so exp() cannot overflow.
+    logit = (math.log(p_cooperate) - math.log(1 - p_cooperate)) / temperature
+    logit = max(-50.0, min(50.0, logit))
+    return 1 / (1 + math.exp(-logit))
+
+def parse_plan(text: str, horizon: int) -> list:
+    """
+    Read a plan of up to `horizon` moves from a model reply.
+
+    Moves may be separate letters ("C C D"), one run ("CCD") or words
+    ("cooperate, then defect"). Replies without any give a one-move plan read
+    by parse_decision.
+    """
+    moves = []
+    for token in _PLAN_MOVES.findall(text.upper()):
+        if token.startswith(("COOPERAT", "DEFECT")):
+            moves.append(token[0])
+        else:
+            moves.extend(token)
+    return moves[:horizon] or [parse_decision(text)]
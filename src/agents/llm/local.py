@@ -1,13 +1,20 @@
 import requests
 import sys
 from src.agents.llm.base import LLMAgentBase
+from src.agents.llm.client import CLIENT_POOL, LLMCallError
+from src.agents.llm.decisions import cooperation_probability, parse_decision, parse_plan
+from src.agents.llm.prompt_templates import estimate_tokens
 
 class LocalLLMAgent(LLMAgentBase):
     def __init__(self, model="SeaLLMs/SeaLLMs-v3-1.5B-Chat", endpoint="http://localhost:8000", 
-                 temperature=0.5, extended_prompt=True, **kwargs):
-        super().__init__("LocalLLMAgent", temperature, extended_prompt)
+                 temperature=0.5, extended_prompt=True, prompt_mode="full", history_window=10,
+                 decision_mode="text", plan_horizon=1, **kwargs):
+        super().__init__("LocalLLMAgent", temperature, extended_prompt, prompt_mode=prompt_mode,
+                         history_window=history_window, decision_mode=decision_mode, plan_horizon=plan_horizon)
         self.endpoint = endpoint
         self.model = model
+        # Set by the LLM match scheduler to batch concurrent completion requests.
+        self.batcher = None
         
         # Verify server connection at initialization
         if not self.check_server_availability():
@@ -25,53 +32,59 @@ class LocalLLMAgent(LLMAgentBase):
         except requests.exceptions.RequestException:
             return False
 
-    def move(self) -> str:
-        prompt = self.build_prompt()
-        return self.get_llm_decision(prompt)
-
     def build_prompt(self) -> str:
         rounds = len(self.my_history)
         rep = f" (reputation: {self.reputation:.2f})"  if self.reputation else ""
         if rounds == 0:
             return f"No history. Please choose C or D.{rep}"
-        history = f"Your moves: {','.join(self.my_history)}; Opponent moves: {','.join(self.opponent_history)}."
+        history = self.format_history()
         if self.extended_prompt:
-            prompt = f"You are playing Iterated Prisoner's Dilemma. {history} Your current reputation is {self.reputation:.2f}. Based on this, decide whether to cooperate (C) or defect (D)."
+            prompt = f"You are playing Iterated Prisoner's Dilemma. Your current reputation is {self.reputation:.2f}. {history} Based on this, decide whether to cooperate (C) or defect (D)."
         else:
             prompt = f"{history} Decide C or D."
         return prompt
 
     def get_llm_decision(self, prompt: str) -> str:
-        try:
-            response = requests.post(
-                f"{self.endpoint}/v1/completions",
-                json={
-                    "prompt": prompt,
-                    "max_tokens": 10,
-                    "temperature": self.temperature,
-                    "model": self.model
-                },
-                timeout=10  # Add timeout to avoid hanging
-            )
-            
-            if response.status_code == 200:
-                result = response.json()
-                # Extract the text from response
-                text = result.get("choices", [{}])[0].get("text", "").strip().upper()
-                return "D" if "D" in text else "C"
-            else:
-                # Server is up but returned an error - EXIT instead of returning C
-                print(f"\033[91mERROR: LLM server returned status {response.status_code}\033[0m")
-                print(f"Response: {response.text[:200]}")  # Print first part of error
-                print("The simulation cannot continue without a working LLM.")
-                sys.exit(1)  # Exit with error code
-        except requests.exceptions.ConnectionError:
-            # Server went down during execution
-            print("\033[91mERROR: Lost connection to local LLM server\033[0m")
-            print("The server appears to have gone down during execution.")
-            sys.exit(1)
-        except Exception as e:
-            # Any other exception - EXIT instead of returning C
-            print(f"\033[91mERROR with local LLM API: {e}\033[0m")
-            print("The simulation cannot continue without a working LLM.")
-            sys.exit(1)  # Exit with error code
\ No newline at end of file
+        params = {"max_tokens": 10, "temperature": self.temperature, "model": self.model}
+        text = self.request(params, prompt).get("text", "")
+        if self.last_usage is None:
+            self.last_usage = {"completion_tokens": estimate_tokens(text)}
+        return parse_decision(text)
+
+    def get_llm_plan(self, prompt: str) -> list:
+        # Room for "C " per move plus a little slack.
+        params = {"max_tokens": 2 * self.plan_horizon + 8, "temperature": self.temperature, "model": self.model}
+        text = self.request(params, prompt).get("text", "")
+        if self.last_usage is None:
+            self.last_usage = {"completion_tokens": estimate_tokens(text)}
+        return parse_plan(text, self.plan_horizon)
+
+    def get_cooperation_probability(self, prompt: str) -> float:
+        # vLLM's guided_choice restricts the single generated token to C or D;
+        # the move itself is sampled locally, so decode greedily.
+        params = {"max_tokens": 1, "temperature": 0, "model": self.model,
+                  "logprobs": 5, "guided_choice": ["C", "D"]}
+        choice = self.request(params, prompt)
+        top = ((choice.get("logprobs") or {}).get("top_logprobs") or [{}])[0]
+        p_cooperate = cooperation_probability(top)
+        if p_cooperate is None:
+            raise LLMCallError(f"Reply {choice.get('text', '')!r} has no C/D log-probabilities")
+        return p_cooperate
+
+    def request(self, params: dict, prompt: str) -> dict:
+        if self.batcher is not None:
+            return CLIENT_POOL.call("local", self.batcher.complete, params, prompt)
+        return CLIENT_POOL.call("local", self.complete, params, prompt)
+
+    def complete(self, params: dict, prompt: str) -> dict:
+        """Send one completion request over the pooled session and return its first choice."""
+        response = CLIENT_POOL.session().post(
+            f"{self.endpoint}/v1/completions",
+            json={**params, "prompt": prompt},
+            timeout=CLIENT_POOL.timeout,
+        )
+        response.raise_for_status()
+        result = response.json()
+        # Batched requests report usage for the whole batch, so only unbatched calls record it.
+        self.last_usage = result.get("usage")
+        return result.get("choices", [{}])[0]
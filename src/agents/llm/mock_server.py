@@ -0,0 +1,275 @@
+"""
+OpenAI-compatible stand-in for an LLM server, for benchmarking and testing the
+LLM agents without a GPU or API keys.
+
+Serves /v1/models, /v1/completions and /v1/chat/completions. Every request
+waits for a latency drawn from the configured distribution, fails with the
+configured error rate, and otherwise answers with the move chosen by a
+deterministic policy read from the game history in the prompt. When logprobs
+are requested it reports `confidence` for that move and the rest for the other.
+
+Usage:
+    python -m src.agents.llm.mock_server --port 8000 --latency lognormal --latency-ms 150 --error-rate 0.01
+
+Point LocalLLMAgent at it with local_llm_params.endpoint=http://localhost:8000,
+or RemoteLLMAgent (provider openai) with remote_llm_params.api_base=http://localhost:8000/v1.
+"""
+import argparse
+import hashlib
+import json
+import math
+import random
+import re
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+POLICIES = ("tit_for_tat", "cooperate", "defect", "hash")
+LATENCY_DISTRIBUTIONS = ("fixed", "uniform", "exponential", "lognormal")
+
+_OPPONENT_MOVES = re.compile(r"Opponent moves:\s*([CD×\d,\s]*)")
+_OPPONENT_LAST_MOVE = re.compile(r"Opponent's last move:\s*([CD])")
+_PLAN_REQUEST = re.compile(r"Plan your next (\d+) moves")
+
+def choose_move(prompt: str, policy: str = "tit_for_tat") -> str:
+    """
+    Deterministic move for a prompt.
+
+    tit_for_tat repeats the opponent's last move from the history in the prompt
+    in any prompt mode (C when there is none); hash picks C or D from a hash
+    of the prompt, so identical prompts always get the same answer.
+    """
+    if policy == "cooperate":
+        return "C"
+    if policy == "defect":
+        return "D"
+    if policy == "hash":
+        return "C" if hashlib.sha256(prompt.encode()).digest()[0] < 128 else "D"
+    match = _OPPONENT_LAST_MOVE.search(prompt)
+    if match:
+        return match.group(1)
+    match = _OPPONENT_MOVES.search(prompt)
+    moves = match.group(1).replace(",", " ").split() if match else []
+    return moves[-1][0] if moves else "C"
+
+def reply_text(prompt: str, policy: str = "tit_for_tat") -> str:
+    """The move for a prompt, repeated for every move a plan prompt asks for."""
+    move = choose_move(prompt, policy)
+    plan = _PLAN_REQUEST.search(prompt)
+    return " ".join([move] * int(plan.group(1))) if plan else move
+
+class MockLLMServer:
+    """
+    Threaded HTTP server with configurable latency, errors and move policy.
+
+    Args:
+        latency: One of LATENCY_DISTRIBUTIONS.
+        latency_ms: Mean latency of a request in milliseconds.
+        latency_spread: Spread of the distribution; half-width (ms) for uniform,
+            sigma of the underlying normal for lognormal. Unused otherwise.
+        per_prompt_ms: Extra latency per prompt in a batched completion request.
+        error_rate: Probability that a request fails with `error_status`.
+        policy: One of POLICIES.
+        confidence: Probability given to the policy's move in returned logprobs.
+        seed: Seed for the latency and error draws.
+    """
+    def __init__(self, host="127.0.0.1", port=8000, model="mock-model", latency="fixed", latency_ms=50.0,
+                 latency_spread=0.5, per_prompt_ms=0.0, error_rate=0.0, error_status=503,
+                 policy="tit_for_tat", seed=None, confidence=0.9):
+        if latency not in LATENCY_DISTRIBUTIONS:
+            raise ValueError(f"Unknown latency distribution '{latency}'")
+        if policy not in POLICIES:
+            raise ValueError(f"Unknown policy '{policy}'")
+        self.model = model
+        self.latency = latency
+        self.latency_ms = latency_ms
+        self.latency_spread = latency_spread
+        self.per_prompt_ms = per_prompt_ms
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.policy = policy
+        self.confidence = confidence
+        self.rng = random.Random(seed)
+        self.lock = threading.Lock()
+        self.requests = 0
+        self.errors = 0
+        self.httpd = ThreadingHTTPServer((host, port), self._handler())
+        self.httpd.daemon_threads = True
+        self.thread = None
+
+    @property
+    def url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def draw_latency(self, prompts=1) -> float:
+        """Latency of one request in seconds."""
+        mean = self.latency_ms
+        with self.lock:
+            if self.latency == "fixed":
+                ms = mean
+            elif self.latency == "uniform":
+                ms = self.rng.uniform(mean - self.latency_spread, mean + self.latency_spread)
+            elif self.latency == "exponential":
+                ms = self.rng.expovariate(1 / mean) if mean > 0 else 0.0
+            else:
+                sigma = self.latency_spread
+                ms = self.rng.lognormvariate(math.log(mean) - sigma ** 2 / 2, sigma) if mean > 0 else 0.0
+        return max(0.0, ms + self.per_prompt_ms * prompts) / 1000
+
+    def should_fail(self) -> bool:
+        with self.lock:
+            self.requests += 1
+            failed = self.rng.random() < self.error_rate
+            self.errors += failed
+        return failed
+
+    def move_logprobs(self, move):
+        """Log-probabilities of C and D when the policy picks `move`."""
+        other = "D" if move == "C" else "C"
+        return {move: math.log(self.confidence), other: math.log(1 - self.confidence)}
+
+    @staticmethod
+    def _single_token(body) -> bool:
+        # One-token or guided-choice requests get the bare move, otherwise " C"/" D".
+        return body.get("max_tokens") == 1 or "guided_choice" in body
+
+    def completion(self, body):
+        prompts = body.get("prompt", "")
+        prompts = prompts if isinstance(prompts, list) else [prompts]
+        prefix = "" if self._single_token(body) else " "
+        choices = []
+        for i, prompt in enumerate(prompts):
+            move = choose_move(prompt, self.policy)
+            logprobs = None
+            if body.get("logprobs"):
+                top = {prefix + token: lp for token, lp in self.move_logprobs(move).items()}
+                logprobs = {"tokens": [prefix + move], "token_logprobs": [top[prefix + move]],
+                            "top_logprobs": [top], "text_offset": [0]}
+            choices.append({"index": i, "text": prefix + reply_text(prompt, self.policy), "logprobs": logprobs,
+                            "finish_reason": "stop"})
+        return len(prompts), {
+            "id": f"cmpl-{uuid.uuid4().hex}",
+            "object": "text_completion",
+            "created": int(time.time()),
+            "model": body.get("model", self.model),
+            "choices": choices,
+            "usage": self._usage(" ".join(prompts), len(prompts)),
+        }
+
+    def chat_completion(self, body):
+        prompt = "\n".join(m.get("content", "") for m in body.get("messages", []) if m.get("role") == "user")
+        move = choose_move(prompt, self.policy)
+        message = {"role": "assistant", "content": reply_text(prompt, self.policy)}
+        logprobs = None
+        if body.get("logprobs"):
+            top = [{"token": token, "logprob": lp, "bytes": list(token.encode())}
+                   for token, lp in self.move_logprobs(move).items()]
+            logprobs = {"content": [{**top[0], "top_logprobs": top}]}
+        return 1, {
+            "id": f"chatcmpl-{uuid.uuid4().hex}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body.get("model", self.model),
+            "choices": [{"index": 0, "message": message, "logprobs": logprobs, "finish_reason": "stop"}],
+            "usage": self._usage(prompt, 1),
+        }
+
+    @staticmethod
+    def _usage(text, completions):
+        prompt_tokens = len(text.split())
+        return {"prompt_tokens": prompt_tokens, "completion_tokens": completions,
+                "total_tokens": prompt_tokens + completions}
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"  # keep-alive
+            disable_nagle_algorithm = True
+
+            def log_message(self, *args):
+                pass
+
+            def send_json(self, status, payload):
+                data = json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def do_GET(self):
+                if self.path.rstrip("/") == "/v1/models":
+                    self.send_json(200, {"object": "list",
+                                         "data": [{"id": server.model, "object": "model", "owned_by": "mock"}]})
+                else:
+                    self.send_json(404, {"error": {"message": f"Unknown path {self.path}"}})
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length", 0))
+                try:
+                    body = json.loads(self.rfile.read(length) or b"{}")
+                except json.JSONDecodeError:
+                    self.send_json(400, {"error": {"message": "Invalid JSON"}})
+                    return
+                path = self.path.rstrip("/")
+                if path == "/v1/completions":
+                    prompts, payload = server.completion(body)
+                elif path == "/v1/chat/completions":
+                    prompts, payload = server.chat_completion(body)
+                else:
+                    self.send_json(404, {"error": {"message": f"Unknown path {self.path}"}})
+                    return
+                time.sleep(server.draw_latency(prompts))
+                if server.should_fail():
+                    self.send_json(server.error_status, {"error": {"message": "Mock server error",
+                                                                   "type": "server_error"}})
+                    return
+                self.send_json(200, payload)
+
+        return Handler
+
+    def start(self):
+        """Serve on a background thread."""
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def serve_forever(self):
+        self.httpd.serve_forever()
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--model", default="mock-model")
+    parser.add_argument("--latency", choices=LATENCY_DISTRIBUTIONS, default="fixed")
+    parser.add_argument("--latency-ms", type=float, default=50.0)
+    parser.add_argument("--latency-spread", type=float, default=0.5)
+    parser.add_argument("--per-prompt-ms", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--error-status", type=int, default=503)
+    parser.add_argument("--policy", choices=POLICIES, default="tit_for_tat")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--confidence", type=float, default=0.9)
+    args = parser.parse_args()
+
+    server = MockLLMServer(args.host, args.port, args.model, args.latency, args.latency_ms, args.latency_spread,
+                           args.per_prompt_ms, args.error_rate, args.error_status, args.policy, args.seed,
+                           args.confidence)
+    print(f"Mock LLM server listening on {server.url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.httpd.server_close()
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,11 @@
+import re
+
+# Templates keep the parts that stay fixed during a match (rules, reputation)
+# ahead of the history, so servers with prefix caching can reuse them.
 BASIC_PROMPT = """
 You are playing Iterated Prisoner's Dilemma. 
-{history}
 Your current reputation is {reputation:.2f}.
+{history}
 Based on this, decide whether to cooperate (C) or defect (D).
 """
 
@@ -15,9 +19,57 @@ GAME RULES:
 - If both defect (D,D), both get {payoff_dd} points
 
 GAME STATE:
-{history}
 Your current reputation: {reputation:.2f}
+{history}
 {rewards_info}
 
 Based on this information, decide whether to cooperate (C) or defect (D).
-"""
\ No newline at end of file
+"""
+
+# Appended to the prompt when an agent plans several moves in one call.
+PLAN_INSTRUCTION = """
+Plan your next {horizon} moves, assuming the opponent keeps playing {assumed}.
+Answer with {horizon} letters, each C or D, separated by spaces.
+"""
+
+# How the move history is written into prompts.
+#   full:   every move so far
+#   window: only the last `history_window` rounds
+#   rle:    every move, run-length encoded ("C×37, D×2")
+#   stats:  cooperation counts plus the last round
+PROMPT_MODES = ("full", "window", "rle", "stats")
+
+def run_length_encode(moves) -> str:
+    runs = []
+    for move in moves:
+        if runs and runs[-1][0] == move:
+            runs[-1][1] += 1
+        else:
+            runs.append([move, 1])
+    return ", ".join(f"{move}×{count}" for move, count in runs)
+
+def format_history(my_history, opponent_history, mode="full", window=10) -> str:
+    """Describe the moves so far (at least one round) in the given prompt mode."""
+    rounds = len(my_history)
+    if mode == "full":
+        return f"Your moves: {','.join(my_history)}; Opponent moves: {','.join(opponent_history)}."
+    if mode == "window":
+        start = max(0, rounds - window)
+        return (f"Rounds played: {rounds}. Last {rounds - start} rounds - "
+                f"Your moves: {','.join(my_history[start:])}; Opponent moves: {','.join(opponent_history[start:])}.")
+    if mode == "rle":
+        return (f"Rounds played: {rounds}. Your moves: {run_length_encode(my_history)}; "
+                f"Opponent moves: {run_length_encode(opponent_history)}.")
+    if mode == "stats":
+        mine = my_history.count("C")
+        theirs = opponent_history.count("C")
+        return (f"Rounds played: {rounds}. You cooperated {mine} times ({mine / rounds:.0%}); "
+                f"the opponent cooperated {theirs} times ({theirs / rounds:.0%}). "
+                f"Last round: you played {my_history[rounds - 1]}; Opponent's last move: {opponent_history[rounds - 1]}.")
+    raise ValueError(f"Unknown prompt mode '{mode}'; expected one of {PROMPT_MODES}")
+
+_TOKEN = re.compile(r"\w+|[^\w\s]")
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (words and punctuation marks), for comparing prompt sizes."""
+    return len(_TOKEN.findall(text))
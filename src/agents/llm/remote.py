@@ -1,15 +1,24 @@
 import os
 import sys
 from src.agents.llm.base import LLMAgentBase
+from src.agents.llm.client import CLIENT_POOL, LLMCallError
+from src.agents.llm.decisions import cooperation_probability, parse_decision, parse_plan
+
+# Token ids of "C" and "D" in OpenAI's tiktoken encodings (cl100k_base, o200k_base),
+# where single printable ASCII bytes come first from "!" = 0. A bias of 100
+# leaves only these two tokens for the one-token constrained reply.
+OPENAI_MOVE_LOGIT_BIAS = {"34": 100, "35": 100}
 
 class RemoteLLMAgent(LLMAgentBase):
     def __init__(self, provider="openai", model="gpt-4o", temperature=0.1, 
-                 extended_prompt=True, api_base=None, use_api=True, **kwargs):
+                 extended_prompt=True, api_base=None, use_api=True, reward_visibility="none",
+                 prompt_mode="full", history_window=10, decision_mode="text", plan_horizon=1, **kwargs):
         """
         provider: 'openai' or 'anthropic'
         """
         name = f"Remote{provider.capitalize()}Agent"
-        super().__init__(name, temperature, extended_prompt)
+        super().__init__(name, temperature, extended_prompt, reward_visibility, prompt_mode, history_window,
+                         decision_mode, plan_horizon)
         self.provider = provider.lower()
         self.model = model
         self.api_base = api_base
@@ -30,58 +39,100 @@ class RemoteLLMAgent(LLMAgentBase):
 
     def get_llm_decision(self, prompt: str) -> str:
         if self.provider == "openai":
-            return self.get_openai_decision(prompt)
+            return CLIENT_POOL.call(self.provider, self.get_openai_decision, prompt)
         elif self.provider == "anthropic":
-            return self.get_anthropic_decision(prompt)
+            return CLIENT_POOL.call(self.provider, self.get_anthropic_decision, prompt)
         else:
-            print(f"\033[91mERROR: Unsupported provider '{self.provider}'\033[0m")
-            print("Supported providers are 'openai' and 'anthropic'")
-            sys.exit(1)
+            raise LLMCallError(f"Unsupported provider '{self.provider}'; supported providers are "
+                               f"'openai' and 'anthropic'")
+
+    def get_llm_plan(self, prompt: str) -> list:
+        # Room for "C " per move plus a little slack.
+        max_tokens = 2 * self.plan_horizon + 8
+        if self.provider == "openai":
+            system = "You are playing an Iterated Prisoner's Dilemma game. You should respond with your planned moves, each 'C' to cooperate or 'D' to defect."
+            text = CLIENT_POOL.call(self.provider, self.get_openai_reply, system, prompt, max_tokens)
+        elif self.provider == "anthropic":
+            system = "You are playing Prisoner's Dilemma. Respond with your planned moves, each C to cooperate or D to defect."
+            text = CLIENT_POOL.call(self.provider, self.get_anthropic_reply, system, prompt, max_tokens)
+        else:
+            raise LLMCallError(f"Unsupported provider '{self.provider}'; supported providers are "
+                               f"'openai' and 'anthropic'")
+        return parse_plan(text, self.plan_horizon)
 
     def get_openai_decision(self, prompt: str) -> str:
-        try:
-            from openai import OpenAI
-            
-            client = OpenAI(
-                api_key=self.openai_api_key,
-                base_url=self.api_base if self.api_base else None
-            )
-            
-            response = client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {"role": "system", "content": "You are playing an Iterated Prisoner's Dilemma game. You should respond with either 'C' to cooperate or 'D' to defect."},
-                    {"role": "user", "content": prompt}
-                ],
-                temperature=self.temperature,
-                max_tokens=10
-            )
-            
-            text = response.choices[0].message.content.strip().upper()
-            return "D" if "D" in text else "C"
-        except Exception as e:
-            print(f"\033[91mERROR with OpenAI API: {e}\033[0m")
-            print("The simulation cannot continue without a working API connection.")
-            sys.exit(1)
+        system = "You are playing an Iterated Prisoner's Dilemma game. You should respond with either 'C' to cooperate or 'D' to defect."
+        return parse_decision(self.get_openai_reply(system, prompt, 10))
+
+    def get_openai_reply(self, system: str, prompt: str, max_tokens: int) -> str:
+        client = CLIENT_POOL.openai_client(self.openai_api_key, self.api_base)
+        response = client.chat.completions.create(
+            model=self.model,
+            messages=[
+                {"role": "system", "content": system},
+                {"role": "user", "content": prompt}
+            ],
+            temperature=self.temperature,
+            max_tokens=max_tokens
+        )
+        self.record_openai_usage(response)
+        return response.choices[0].message.content or ""
+
+    def get_anthropic_decision(self, prompt: str, max_tokens=10) -> str:
+        system = "You are playing Prisoner's Dilemma. Respond with C to cooperate or D to defect."
+        return parse_decision(self.get_anthropic_reply(system, prompt, max_tokens))
+
+    def get_anthropic_reply(self, system: str, prompt: str, max_tokens: int) -> str:
+        client = CLIENT_POOL.anthropic_client(self.anthropic_api_key)
+        response = client.messages.create(
+            model="claude-3-haiku-20240307",
+            max_tokens=max_tokens,
+            temperature=self.temperature,
+            system=system,
+            messages=[
+                {"role": "user", "content": prompt}
+            ]
+        )
+        if response.usage is not None:
+            self.last_usage = {"prompt_tokens": response.usage.input_tokens,
+                               "completion_tokens": response.usage.output_tokens}
+        return response.content[0].text
+
+    def get_cooperation_probability(self, prompt: str) -> float:
+        if self.provider == "openai":
+            return CLIENT_POOL.call(self.provider, self.get_openai_probability, prompt)
+        # Anthropic returns no log-probabilities: ask for one token and treat it as certain.
+        return 1.0 if CLIENT_POOL.call(self.provider, self.get_anthropic_decision, prompt, 1) == "C" else 0.0
+
+    def get_openai_probability(self, prompt: str) -> float:
+        client = CLIENT_POOL.openai_client(self.openai_api_key, self.api_base)
+        if self.api_base:
+            # OpenAI-compatible servers such as vLLM have their own vocabularies; constrain by choice instead.
+            constraint = {"extra_body": {"guided_choice": ["C", "D"]}}
+        else:
+            constraint = {"logit_bias": OPENAI_MOVE_LOGIT_BIAS}
+        response = client.chat.completions.create(
+            model=self.model,
+            messages=[
+                {"role": "system", "content": "You are playing an Iterated Prisoner's Dilemma game. Respond with exactly one letter: 'C' to cooperate or 'D' to defect."},
+                {"role": "user", "content": prompt}
+            ],
+            temperature=0,
+            max_tokens=1,
+            logprobs=True,
+            top_logprobs=5,
+            **constraint
+        )
+        self.record_openai_usage(response)
+        choice = response.choices[0]
+        content = choice.logprobs.content if choice.logprobs else None
+        top = {entry.token: entry.logprob for entry in content[0].top_logprobs} if content else {}
+        p_cooperate = cooperation_probability(top)
+        if p_cooperate is None:
+            raise LLMCallError(f"Reply {choice.message.content!r} has no C/D log-probabilities")
+        return p_cooperate
 
-    def get_anthropic_decision(self, prompt: str) -> str:
-        try:
-            import anthropic
-            client = anthropic.Anthropic(api_key=self.anthropic_api_key)
-            
-            response = client.messages.create(
-                model="claude-3-haiku-20240307",
-                max_tokens=10,
-                temperature=self.temperature,
-                system="You are playing Prisoner's Dilemma. Respond with C to cooperate or D to defect.",
-                messages=[
-                    {"role": "user", "content": prompt}
-                ]
-            )
-            
-            text = response.content[0].text.strip().upper()
-            return "D" if "D" in text else "C"
-        except Exception as e:
-            print(f"\033[91mERROR with Anthropic API: {e}\033[0m")
-            print("The simulation cannot continue without a working API connection.")
-            sys.exit(1)
\ No newline at end of file
+    def record_openai_usage(self, response):
+        if response.usage is not None:
+            self.last_usage = {"prompt_tokens": response.usage.prompt_tokens,
+                               "completion_tokens": response.usage.completion_tokens}
@@ -0,0 +1,173 @@
+import json
+import threading
+from src.agents.llm.client import LLMCallError
+
+# Upper edges (ms) of the latency histogram buckets; the last bucket is open-ended.
+LATENCY_BUCKETS_MS = (10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+def percentile(ordered, q):
+    """Nearest-rank percentile of an already sorted list (0.0 if empty)."""
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+class CallStats:
+    """
+    LLM usage of one agent over one match (or merged over many): calls, cache
+    hits, moves played from plans (calls saved), replans, prompt/completion
+    tokens, retries and per-call latencies in seconds.
+    """
+    __slots__ = ("calls", "cache_hits", "planned_moves", "replans", "prompt_tokens", "completion_tokens",
+                 "retries", "latencies")
+
+    def __init__(self):
+        self.calls = 0
+        self.cache_hits = 0
+        self.planned_moves = 0
+        self.replans = 0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self.retries = 0
+        self.latencies = []
+
+    def record_call(self, prompt_tokens, completion_tokens, latency, retries=0):
+        self.calls += 1
+        self.prompt_tokens += prompt_tokens
+        self.completion_tokens += completion_tokens
+        self.retries += retries
+        self.latencies.append(latency)
+
+    def record_cache_hit(self):
+        self.cache_hits += 1
+
+    def record_planned_move(self):
+        self.planned_moves += 1
+
+    def record_replan(self):
+        """A plan was dropped early because the opponent broke its assumption."""
+        self.replans += 1
+
+    def merge(self, other):
+        self.calls += other.calls
+        self.cache_hits += other.cache_hits
+        self.planned_moves += other.planned_moves
+        self.replans += other.replans
+        self.prompt_tokens += other.prompt_tokens
+        self.completion_tokens += other.completion_tokens
+        self.retries += other.retries
+        self.latencies.extend(other.latencies)
+
+    def summary(self, prompt_cost_per_1k=0.0, completion_cost_per_1k=0.0) -> dict:
+        ordered = sorted(self.latencies)
+        histogram = [0] * (len(LATENCY_BUCKETS_MS) + 1)
+        for latency in ordered:
+            ms = latency * 1000
+            histogram[next((i for i, edge in enumerate(LATENCY_BUCKETS_MS) if ms <= edge), -1)] += 1
+        lookups = self.calls + self.cache_hits
+        return {
+            "calls": self.calls,
+            "cache_hits": self.cache_hits,
+            "cache_hit_rate": self.cache_hits / lookups if lookups else 0.0,
+            "planned_moves": self.planned_moves,
+            "replans": self.replans,
+            "prompt_tokens": self.prompt_tokens,
+            "completion_tokens": self.completion_tokens,
+            "retries": self.retries,
+            "estimated_cost": (self.prompt_tokens * prompt_cost_per_1k
+                               + self.completion_tokens * completion_cost_per_1k) / 1000,
+            "latency_ms": {
+                "mean": 1000 * sum(ordered) / len(ordered) if ordered else 0.0,
+                "p50": 1000 * percentile(ordered, 0.50),
+                "p95": 1000 * percentile(ordered, 0.95),
+                "p99": 1000 * percentile(ordered, 0.99),
+                "max": 1000 * ordered[-1] if ordered else 0.0,
+                "histogram": dict(zip([f"<={edge}" for edge in LATENCY_BUCKETS_MS] + [f">{LATENCY_BUCKETS_MS[-1]}"],
+                                      histogram)),
+            },
+        }
+
+class BudgetExhausted(LLMCallError):
+    """The tournament's LLM budget is used up; the match is abandoned like a failed call."""
+
+class LLMBudget:
+    """
+    Hard limit on LLM usage shared by every agent in the tournament.
+
+    Agents check() before each call and charge() after it. Calls already in
+    flight when the limit is reached still complete, so concurrent matches can
+    overshoot by at most one call each.
+    """
+    def __init__(self, max_tokens=None, max_calls=None, max_cost=None,
+                 prompt_cost_per_1k=0.0, completion_cost_per_1k=0.0):
+        self.max_tokens = max_tokens
+        self.max_calls = max_calls
+        self.max_cost = max_cost
+        self.prompt_cost_per_1k = prompt_cost_per_1k
+        self.completion_cost_per_1k = completion_cost_per_1k
+        self.tokens = 0
+        self.calls = 0
+        self.cost = 0.0
+        self.lock = threading.Lock()
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state["lock"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.lock = threading.Lock()
+
+    def exhausted(self) -> bool:
+        return ((self.max_tokens is not None and self.tokens >= self.max_tokens)
+                or (self.max_calls is not None and self.calls >= self.max_calls)
+                or (self.max_cost is not None and self.cost >= self.max_cost))
+
+    def check(self):
+        if self.exhausted():
+            raise BudgetExhausted(f"LLM budget exhausted ({self.calls} calls, {self.tokens} tokens, "
+                                  f"cost {self.cost:.4f})")
+
+    def charge(self, prompt_tokens, completion_tokens):
+        with self.lock:
+            self.calls += 1
+            self.tokens += prompt_tokens + completion_tokens
+            self.cost += (prompt_tokens * self.prompt_cost_per_1k
+                          + completion_tokens * self.completion_cost_per_1k) / 1000
+
+class TournamentTelemetry:
+    """Rolls per-match CallStats up per match, per opponent and per agent."""
+    def __init__(self, prompt_cost_per_1k=0.0, completion_cost_per_1k=0.0):
+        self.prompt_cost_per_1k = prompt_cost_per_1k
+        self.completion_cost_per_1k = completion_cost_per_1k
+        self.matches = []  # (match index, agent, opponent, CallStats)
+        self.by_agent = {}
+        self.by_opponent = {}  # (agent, opponent) -> CallStats
+
+    def add_match(self, match_index, agent, opponent, stats):
+        self.matches.append((match_index, agent, opponent, stats))
+        for table, key in ((self.by_agent, agent), (self.by_opponent, (agent, opponent))):
+            if key not in table:
+                table[key] = CallStats()
+            table[key].merge(stats)
+
+    def total(self) -> CallStats:
+        total = CallStats()
+        for stats in self.by_agent.values():
+            total.merge(stats)
+        return total
+
+    def summary(self) -> dict:
+        prices = (self.prompt_cost_per_1k, self.completion_cost_per_1k)
+        return {
+            "tournament": self.total().summary(*prices),
+            "agents": {agent: stats.summary(*prices) for agent, stats in self.by_agent.items()},
+            "opponents": [{"agent": agent, "opponent": opponent, **stats.summary(*prices)}
+                          for (agent, opponent), stats in self.by_opponent.items()],
+            "matches": [{"match": index, "agent": agent, "opponent": opponent, **stats.summary(*prices)}
+                        for index, agent, opponent, stats in self.matches],
+        }
+
+    def write(self, path):
+        with open(path, "w") as f:
+            json.dump(self.summary(), f, indent=2)
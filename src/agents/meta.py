@@ -1,24 +1,51 @@
-import random
+import math
 from src.agents.base import Agent
 from src.strategies.base import Strategy
+from src.strategies.table import NEXT_STATE
+
+# How MetaAgent picks the next base strategy at every switch.
+#   ucb:      highest counterfactual mean reward plus an exploration bonus that
+#             shrinks with the rounds the strategy has actually been played
+#   thompson: highest draw from a normal around each counterfactual mean, with
+#             the same shrinking spread
+#   random:   any other base strategy, uniformly
+SELECTION_POLICIES = ("ucb", "thompson", "random")
+
+# Used when the match has not set a payoff matrix.
+DEFAULT_PAYOFFS = {"CC": 3, "CD": 0, "DC": 5, "DD": 1}
+
+_NEXT_STATE = NEXT_STATE.tolist()
 
 class MetaAgent(Agent):
     """
     MetaAgent that can switch between a set of base strategies.
-    Implements a meta-strategy that evaluates and changes underlying strategies
-    at certain intervals based on performance.
+
+    Every round each base strategy is scored counterfactually: the expected
+    reward it would have earned against the opponent's actual move, read from
+    its cooperation table (see src.strategies.table), whose state is advanced
+    incrementally. Strategies without a table are scored only on rounds they
+    play. Every `switch_frequency` rounds a bandit policy picks the strategy
+    to play next. All base strategies see the shared history, so whichever is
+    picked continues from the current game state.
     """
-    def __init__(self, base_strategies=None, switch_frequency=50):
+    # strategy_mapping and the tables are shared; base_strategies are spawned in spawn().
+    per_match_state = Agent.per_match_state + ("scores", "scored_rounds", "active_rounds", "table_states")
+    # Moves are delegated to the base strategies, which keep their own history.
+    memory_depth = 0
+
+    def __init__(self, base_strategies=None, switch_frequency=50, selection="ucb", exploration=1.0):
         super().__init__("MetaAgent")
-        
+        if selection not in SELECTION_POLICIES:
+            raise ValueError(f"Unknown selection policy '{selection}'; expected one of {SELECTION_POLICIES}")
+
         # Default strategies if none provided
         if base_strategies is None:
             base_strategies = ["TitForTatExtended", "AlwaysDefect", "RandomStrategy"]
-        
+
         # Import strategies here to avoid circular imports
         from src.strategies.basic import AlwaysCooperate, AlwaysDefect, RandomStrategy
         from src.strategies.reactive import TitForTatExtended, Grudger, Joss, TitForTwoTats, HumanStrategy
-        
+
         # Map strategy names to classes
         self.strategy_mapping = {
             "AlwaysCooperate": AlwaysCooperate,
@@ -30,82 +57,139 @@ class MetaAgent(Agent):
             "TitForTwoTats": TitForTwoTats,
             "HumanStrategy": HumanStrategy
         }
-        
+
         # Initialize base strategies
         self.base_strategies = []
         for name in base_strategies:  # Changed from base_strategy_names
             if name in self.strategy_mapping:
                 self.base_strategies.append(self.strategy_mapping[name]())
-        
+
         # Ensure we have at least one strategy
         if not self.base_strategies:
             self.base_strategies.append(TitForTatExtended())
-            
+
         # Setup initial strategy and counters
         self.current_strategy = self.base_strategies[0]
+        self.active = 0  # Index of current_strategy
         self.switch_frequency = switch_frequency
+        self.selection = selection  # Options: "ucb", "thompson", "random"
+        self.exploration = exploration  # Scale of the UCB bonus / Thompson spread
         self.round_counter = 0
-        
-        # Track performance of each strategy
-        self.strategy_scores = {str(strategy): 0 for strategy in self.base_strategies}
+        self.payoff_matrix = None  # Will be set by the match
+
+        # Cooperation tables for counterfactual scoring (None where a strategy has none).
+        self.tables = [strategy.cooperation_table() for strategy in self.base_strategies]
+        self.reset_scores()
         self.last_score = 0
-        
+
+    def reset_scores(self):
+        n = len(self.base_strategies)
+        self.scores = [0.0] * n  # Counterfactual reward this match
+        self.scored_rounds = [0] * n  # Rounds each score covers
+        self.active_rounds = [0] * n  # Rounds each strategy was actually played
+        self.table_states = [0] * n
+
+    @property
+    def strategy_scores(self) -> dict:
+        """Counterfactual reward of every base strategy so far this match."""
+        return {str(strategy): score for strategy, score in zip(self.base_strategies, self.scores)}
+
     def move(self) -> str:
         """Return the move determined by the current active strategy."""
         # Every switch_frequency rounds, evaluate and switch strategy if needed
         self.round_counter += 1
         if self.round_counter % self.switch_frequency == 0:
             self.switch_strategy()
-            
+
         # Use the selected strategy's move
         return self.current_strategy.move()
 
     def switch_strategy(self):
-        """Evaluate and possibly change the active strategy."""
-        # For now, randomly pick a different base strategy
-        # In a more sophisticated implementation, this could use 
-        # performance metrics to choose the best strategy
-        new_strategy = random.choice(self.base_strategies)
-        
-        # Ensure we don't pick the same strategy if possible
-        if len(self.base_strategies) > 1:
-            while new_strategy == self.current_strategy:
-                new_strategy = random.choice(self.base_strategies)
-        
-        self.current_strategy = new_strategy
+        """Pick the strategy to play next with the configured selection policy."""
+        if self.selection == "random":
+            new_strategy = self.rng.choice(self.base_strategies)
+            # Ensure we don't pick the same strategy if possible
+            if len(self.base_strategies) > 1:
+                while new_strategy == self.current_strategy:
+                    new_strategy = self.rng.choice(self.base_strategies)
+            self.active = self.base_strategies.index(new_strategy)
+            self.current_strategy = new_strategy
+            return
+
+        payoffs = self.payoff_matrix or DEFAULT_PAYOFFS
+        span = max(payoffs.values()) - min(payoffs.values())
+        log_rounds = math.log(max(2, self.round_counter))
+        best, best_value = 0, -math.inf
+        for k, (score, scored, active) in enumerate(zip(self.scores, self.scored_rounds, self.active_rounds)):
+            mean = score / scored if scored else 0.0
+            if self.selection == "ucb":
+                value = mean + self.exploration * span * math.sqrt(log_rounds / (active + 1))
+            else:
+                value = self.rng.gauss(mean, self.exploration * span / math.sqrt(active + 1))
+            if value > best_value:
+                best, best_value = k, value
+        self.active = best
+        self.current_strategy = self.base_strategies[best]
+
+    def spawn(self):
+        clone = super().spawn()
+        clone.base_strategies = [strategy.spawn() for strategy in self.base_strategies]
+        clone.current_strategy = clone.base_strategies[self.active]
+        return clone
+
+    def set_rng(self, rng):
+        """Share the random stream with the base strategies."""
+        super().set_rng(rng)
+        for strategy in self.base_strategies:
+            strategy.set_rng(rng)
 
     def record(self, my_move: str, opp_move: str):
-        """Record moves in both the meta-agent and the current strategy."""
+        """Record the round in every base strategy and score each of them against it."""
         super().record(my_move, opp_move)
-        
-        # Also record moves in the current strategy
-        self.current_strategy.record(my_move, opp_move)
+        payoffs = self.payoff_matrix or DEFAULT_PAYOFFS
+        if_cooperate = payoffs["C" + opp_move]
+        if_defect = payoffs["D" + opp_move]
+        opp_defected = opp_move == "D"
+        active = self.active
+        for k, table in enumerate(self.tables):
+            if table is not None:
+                state = self.table_states[k]
+                self.scores[k] += if_defect + table[state] * (if_cooperate - if_defect)
+                self.scored_rounds[k] += 1
+                self.table_states[k] = _NEXT_STATE[state][opp_defected]
+            elif k == active:
+                self.scores[k] += payoffs[my_move + opp_move]
+                self.scored_rounds[k] += 1
+        self.active_rounds[active] += 1
+
+        for strategy in self.base_strategies:
+            strategy.record(my_move, opp_move)
         self.current_strategy.update_reputation()
-    
+
     def update(self, reward, state=None):
         """
-        Update performance metrics for the current strategy.
-        
+        Note the reward received after the last move. Strategy scores are kept
+        by record(), so this is only informational.
+
         Args:
             reward: Reward received after the last move
             state: Current state (not used in this implementation)
         """
-        # Track the score for the current strategy
-        self.strategy_scores[str(self.current_strategy)] += reward
         self.last_score = reward
-    
+
     def reset(self):
         """Reset the agent's state."""
         super().reset()
         self.round_counter = 0
-        
+
         # Reset all base strategies
         for strategy in self.base_strategies:
             strategy.reset()
-            
+
         # Reset performance tracking
-        self.strategy_scores = {str(strategy): 0 for strategy in self.base_strategies}
+        self.reset_scores()
         self.last_score = 0
-        
+
         # Start with the first strategy again
-        self.current_strategy = self.base_strategies[0]
\ No newline at end of file
+        self.active = 0
+        self.current_strategy = self.base_strategies[0]
@@ -0,0 +1,106 @@
+"""
+Exact expected scores for pairings between table-driven strategies.
+
+Each player's state (see src.strategies.table) only depends on the other
+player's moves, so a pairing is a Markov chain over joint states
+(state1, state2). Noise flips each intended move independently and shock
+events double the noise for shock_duration rounds; the shock countdown is
+tracked alongside the joint state so the result is exact, not an average over
+shock timing.
+"""
+import numpy as np
+from src.strategies.table import N_STATES, NEXT_STATE
+
+N_JOINT = N_STATES * N_STATES
+
+def _round_model(table1, table2, payoffs, noise):
+    """
+    Build the one-round transition matrix and expected per-round outcomes.
+
+    Returns:
+        (P, rewards1, rewards2, cooperations1, cooperations2) where P is the
+        N_JOINT x N_JOINT transition matrix and the others are N_JOINT vectors.
+    """
+    s1, s2 = np.divmod(np.arange(N_JOINT), N_STATES)
+    coop1 = np.asarray(table1)[s1] * (1 - noise) + (1 - np.asarray(table1)[s1]) * noise
+    coop2 = np.asarray(table2)[s2] * (1 - noise) + (1 - np.asarray(table2)[s2]) * noise
+
+    P = np.zeros((N_JOINT, N_JOINT))
+    rewards1 = np.zeros(N_JOINT)
+    rewards2 = np.zeros(N_JOINT)
+    for d1 in (0, 1):
+        for d2 in (0, 1):
+            prob = (1 - coop1 if d1 else coop1) * (1 - coop2 if d2 else coop2)
+            nxt = NEXT_STATE[s1, d2] * N_STATES + NEXT_STATE[s2, d1]
+            np.add.at(P, (np.arange(N_JOINT), nxt), prob)
+            rewards1 += prob * payoffs[2 * d1 + d2]
+            rewards2 += prob * payoffs[2 * d2 + d1]
+    return P, rewards1, rewards2, coop1, coop2
+
+def expected_round_outcomes(table1, table2, payoffs, noise, shock_frequency, shock_duration, rounds):
+    """
+    Expected outcome of every round of a match.
+
+    Args:
+        table1, table2: Cooperation tables of the two players.
+        payoffs: Sequence of the CC, CD, DC, DD payoffs.
+        rounds: Number of rounds to evaluate.
+
+    Returns:
+        Array of shape (rounds, 4) with the expected reward of each player and the
+        probability that each player cooperates, round by round.
+    """
+    payoffs = np.asarray(payoffs, dtype=float)
+    normal = _round_model(table1, table2, payoffs, noise)
+    shocked = _round_model(table1, table2, payoffs, noise * 2)
+    normal_outcomes = np.stack(normal[1:], axis=1)
+    shocked_outcomes = np.stack(shocked[1:], axis=1)
+
+    # dist[k] is the joint-state distribution with k shocked rounds still to go.
+    levels = max(shock_duration, 1)
+    trigger = shock_frequency if shock_duration > 0 else 0.0
+    dist = np.zeros((levels, N_JOINT))
+    dist[0, 0] = 1.0
+
+    out = np.empty((rounds, 4))
+    for r in range(rounds):
+        calm = dist[0] * (1 - trigger)
+        # Rounds in a shock: those already counting down plus newly triggered ones.
+        in_shock = dist[1:].copy()
+        starting = dist[0] * trigger
+        out[r] = calm @ normal_outcomes + (in_shock.sum(axis=0) + starting) @ shocked_outcomes
+
+        nxt = np.zeros_like(dist)
+        nxt[0] = calm @ normal[0]
+        if levels > 1:
+            nxt[:-1] += in_shock @ shocked[0]
+            nxt[levels - 1] += starting @ shocked[0]
+        else:
+            nxt[0] += starting @ shocked[0]
+        dist = nxt
+    return out
+
+def expected_match(table1, table2, payoffs, noise, shock_frequency, shock_duration,
+                   rounds=None, min_rounds=None, max_rounds=None):
+    """
+    Expected totals for one match of `rounds` rounds, or of a length drawn
+    uniformly from [min_rounds, max_rounds].
+
+    Returns:
+        Dict with expected score1, score2, cooperations1, cooperations2 and rounds.
+    """
+    horizon = rounds if rounds is not None else max_rounds
+    cumulative = np.cumsum(expected_round_outcomes(
+        table1, table2, payoffs, noise, shock_frequency, shock_duration, horizon), axis=0)
+    if rounds is not None:
+        totals, expected_rounds = cumulative[-1], rounds
+    else:
+        totals = cumulative[min_rounds - 1:max_rounds].mean(axis=0)
+        expected_rounds = (min_rounds + max_rounds) / 2
+    return {
+        "score1": float(totals[0]),
+        "score2": float(totals[1]),
+        "cooperations1": float(totals[2]),
+        "cooperations2": float(totals[3]),
+        "rounds": expected_rounds,
+    }
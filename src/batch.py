@@ -0,0 +1,127 @@
+import numpy as np
+from src.strategies.table import N_STATES, NEXT_STATE
+from src.trace import TRACE_DTYPE
+
+# Payoff column for a (my defected, opponent defected) pair: CC, CD, DC, DD.
+PAYOFF_KEYS = ("CC", "CD", "DC", "DD")
+
+# Rounds of random numbers drawn from each match's generator at a time.
+DRAW_CHUNK = 64
+
+class BatchMatchEngine:
+    """
+    Plays many matches between table-driven strategies at once.
+
+    Every match is a row in a set of arrays and each round is a single array step
+    for all of them, following the same rules as Match.play: noise flips each
+    move, shock events double the noise for shock_duration rounds, and the
+    payoffs/round counts are the ones the Match objects were set up with.
+
+    Each row draws its random numbers from its own Match's generator, so a
+    match's result depends only on its seed, not on which other matches share
+    the batch or where it sits in it.
+    """
+
+    @staticmethod
+    def supports(player) -> bool:
+        return player.cooperation_table() is not None
+
+    def play(self, matches, global_coop_rate: float, trace=False):
+        """
+        Play a list of Match objects whose players are all table-driven.
+
+        Returns:
+            List of result dicts (score1, score2, cooperations1, cooperations2,
+            rounds, plus the round records under "trace" when `trace` is set)
+            in the order of `matches`.
+        """
+        n = len(matches)
+        if n == 0:
+            return []
+
+        tables1 = np.empty((n, N_STATES))
+        tables2 = np.empty((n, N_STATES))
+        payoffs = np.empty((n, 4), dtype=np.int64)
+        rounds = np.empty(n, dtype=np.int64)
+        noise = np.empty(n)
+        shock_frequency = np.empty(n)
+        shock_duration = np.empty(n, dtype=np.int64)
+        for k, match in enumerate(matches):
+            match.update_dynamic_payoffs(global_coop_rate)
+            tables1[k] = match.p1.cooperation_table()
+            tables2[k] = match.p2.cooperation_table()
+            payoffs[k] = [match.payoffs.get(key, 0) for key in PAYOFF_KEYS]
+            rounds[k] = match.rounds
+            noise[k] = match.noise
+            shock_frequency[k] = match.shock_frequency
+            shock_duration[k] = match.shock_duration
+
+        rows = np.arange(n)
+        state1 = np.zeros(n, dtype=np.int64)
+        state2 = np.zeros(n, dtype=np.int64)
+        shock_remaining = np.zeros(n, dtype=np.int64)
+        totals1 = np.zeros(n, dtype=np.int64)
+        totals2 = np.zeros(n, dtype=np.int64)
+        cooperations1 = np.zeros(n, dtype=np.int64)
+        cooperations2 = np.zeros(n, dtype=np.int64)
+        trace_steps = [] if trace else None
+
+        generators = [match.rng for match in matches]
+        for r in range(int(rounds.max())):
+            active = r < rounds
+            # Five numbers per round and match: shock check, two intents and two
+            # noise flips. Each match's generator fills its own column, a chunk of
+            # rounds at a time.
+            if r % DRAW_CHUNK == 0:
+                draws = np.zeros((DRAW_CHUNK, 5, n))
+                for k in np.flatnonzero(active):
+                    count = min(DRAW_CHUNK, rounds[k] - r)
+                    draws[:count, :, k] = generators[k].random((count, 5))
+            u = draws[r % DRAW_CHUNK]
+
+            triggered = (shock_remaining == 0) & (u[0] < shock_frequency)
+            shock_remaining[triggered] = shock_duration[triggered]
+            shocked = shock_remaining > 0
+            current_noise = np.where(shocked, noise * 2, noise)
+            shock_remaining -= shocked
+
+            intended1 = u[1] >= tables1[rows, state1]
+            intended2 = u[2] >= tables2[rows, state2]
+            defect1 = intended1 ^ (u[3] < current_noise)
+            defect2 = intended2 ^ (u[4] < current_noise)
+            d1 = defect1.astype(np.int64)
+            d2 = defect2.astype(np.int64)
+
+            reward1 = payoffs[rows, 2 * d1 + d2]
+            reward2 = payoffs[rows, 2 * d2 + d1]
+            totals1 += np.where(active, reward1, 0)
+            totals2 += np.where(active, reward2, 0)
+            cooperations1 += active & ~defect1
+            cooperations2 += active & ~defect2
+
+            state1 = NEXT_STATE[state1, d2]
+            state2 = NEXT_STATE[state2, d1]
+            if trace_steps is not None:
+                trace_steps.append((intended1, intended2, defect1, defect2, reward1, reward2, shocked))
+
+        results = [
+            {
+                "score1": int(totals1[k]),
+                "score2": int(totals2[k]),
+                "cooperations1": int(cooperations1[k]),
+                "cooperations2": int(cooperations2[k]),
+                "rounds": int(rounds[k]),
+            }
+            for k in range(n)
+        ]
+        if trace_steps is not None:
+            # Each field becomes a (round, match) array; slice out one column per match.
+            fields = [np.stack(column) for column in zip(*trace_steps)]
+            for k, result in enumerate(results):
+                records = np.zeros(rounds[k], dtype=TRACE_DTYPE)
+                records["round"] = np.arange(rounds[k])
+                for name, values in zip(("intended1", "intended2", "move1", "move2",
+                                         "reward1", "reward2", "shock"), fields):
+                    records[name] = values[:rounds[k], k]
+                result["trace"] = records
+        return results
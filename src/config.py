@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field
-from typing import List, Optional
+from typing import Dict, List, Optional
 
 class PayoffMatrix(BaseModel):
     CC: int = Field(..., description="Payoff for mutual cooperation")
@@ -12,6 +12,11 @@ class RLParams(BaseModel):
     discount_factor: float = 0.9
     exploration_rate: float = 0.2
 
+class LearnerStateParams(BaseModel):
+    carry_over: bool = False  # Q-learning agents keep their Q-values from one match to the next
+    load_path: Optional[str] = None  # .npz checkpoint to warm-start Q-learning agents from
+    save_path: Optional[str] = None  # Where to write the learned Q-values after the run
+
 class LLMParams(BaseModel):
     use_api: bool = False
     provider: str = "local"
@@ -19,6 +24,10 @@ class LLMParams(BaseModel):
     temperature: float = 0.5
     extended_prompt: bool = True
     reward_visibility: str = "none"  # Options: "none", "self", "both"
+    prompt_mode: str = "full"  # Options: "full", "window", "rle", "stats"
+    history_window: int = 10  # Rounds shown in "window" mode
+    decision_mode: str = "text"  # "text" (parsed reply) or "constrained" (one C/D token, sampled from its logprobs)
+    plan_horizon: int = 1  # Moves planned per LLM call; replans when the opponent changes its move
 
 class RemoteLLMParams(BaseModel):
     use_api: bool = True
@@ -27,6 +36,10 @@ class RemoteLLMParams(BaseModel):
     temperature: float = 0.5
     extended_prompt: bool = True
     reward_visibility: str = "none"  # Options: "none", "self", "both"
+    prompt_mode: str = "full"  # Options: "full", "window", "rle", "stats"
+    history_window: int = 10  # Rounds shown in "window" mode
+    decision_mode: str = "text"  # "text" (parsed reply) or "constrained" (one C/D token, sampled from its logprobs)
+    plan_horizon: int = 1  # Moves planned per LLM call; replans when the opponent changes its move
     # Make api_base optional by using Optional[str]
     api_base: Optional[str] = None
 
@@ -36,19 +49,80 @@ class LocalLLMParams(BaseModel):
     temperature: float = 0.5
     extended_prompt: bool = True
     reward_visibility: str = "none"  # Options: "none", "self", "both"
+    prompt_mode: str = "full"  # Options: "full", "window", "rle", "stats"
+    history_window: int = 10  # Rounds shown in "window" mode
+    decision_mode: str = "text"  # "text" (parsed reply) or "constrained" (one C/D token, sampled from its logprobs)
+    plan_horizon: int = 1  # Moves planned per LLM call; replans when the opponent changes its move
 
 class MetaAgentParams(BaseModel):
     base_strategies: List[str] = ["TitForTatExtended", "AlwaysDefect", "RandomStrategy"]
     switch_frequency: int = 50
+    selection: str = "ucb"  # Options: "ucb", "thompson", "random"
+    exploration: float = 1.0  # Scale of the UCB bonus / Thompson spread, in payoff ranges
+
+class DistilledPolicyParams(BaseModel):
+    path: str = "llm_policy.npz"  # Written by `python -m src.distill`
 
 class NetworkParams(BaseModel):
     enabled: bool = True
     type: str = "random"
     connectivity: float = 0.5
 
+class ParallelParams(BaseModel):
+    enabled: bool = False
+    workers: Optional[int] = None  # Defaults to the number of CPUs
+
+class LLMSchedulerParams(BaseModel):
+    enabled: bool = False
+    max_concurrency: int = 8  # LLM matches in flight at once
+    max_batch: int = 16  # Prompts per batched completion request (LocalLLMAgent)
+    batch_wait_ms: float = 5.0  # How long a prompt waits for others to batch with
+
+class LLMClientParams(BaseModel):
+    max_retries: int = 3  # Retries per call before the match is failed
+    backoff_base: float = 0.5  # Seconds before the first retry; doubles per retry, with jitter
+    backoff_max: float = 8.0
+    timeout: float = 30.0  # Per-request timeout in seconds
+    pool_size: int = 32  # Keep-alive connections per host
+    rate_limits: Dict[str, float] = {}  # Provider ("local", "openai", "anthropic") -> calls per second
+    burst: int = 1  # Calls a provider may make back to back before its rate limit applies
+
+class LLMTelemetryParams(BaseModel):
+    write_summary: bool = True  # Write <results>_llm_telemetry.json next to the results CSV
+    prompt_cost_per_1k: float = 0.0  # Price per 1000 prompt tokens, for cost estimates and max_cost
+    completion_cost_per_1k: float = 0.0
+    # Hard budget across all LLM agents; once reached, remaining LLM matches are abandoned.
+    max_tokens: Optional[int] = None
+    max_calls: Optional[int] = None
+    max_cost: Optional[float] = None
+
+class LLMCacheParams(BaseModel):
+    enabled: bool = False
+    max_entries: int = 10000  # Least recently used states are evicted beyond this
+    path: Optional[str] = None  # JSON file that keeps the cache across runs
+    history_window: int = 3  # Recent moves of each player in the cache key
+    reputation_bucket: float = 0.1  # Reputation is rounded to this step in the cache key
+    min_samples: int = 5  # Answers collected per state before sampling from them (temperature > 0)
+    deterministic_temperature: float = 0.05  # At or below this one cached answer is reused
+
+class TraceParams(BaseModel):
+    enabled: bool = False
+    path: str = "tournament_trace"  # Writes <path>.trace and <path>.index.npy
+
+class ResultsStoreParams(BaseModel):
+    enabled: bool = False
+    path: str = "results.db"  # SQLite database shared across runs
+
+class PairCacheParams(BaseModel):
+    enabled: bool = False
+    path: str = "pair_cache.db"  # SQLite file shared across runs
+    max_entries: int = 100000  # Least recently used results are evicted beyond this
+
 class LoggingConfig(BaseModel):
     log_file: str = "tournament.log"
     verbose: bool = True
+    queue: bool = True  # Write log records from a background thread
+    round_sample_rate: float = 0.001  # Fraction of rounds logged as DEBUG events (0 disables)
 
 class GUIConfig(BaseModel):
     enabled: bool = True
@@ -62,17 +136,31 @@ class TournamentConfig(BaseModel):
     shadow_probability: float = 0.95
     payoff_matrix: PayoffMatrix
     dynamic_payoffs: bool = False
+    payoff_update_interval: int = 10  # Matches per cooperation-rate snapshot when dynamic_payoffs is on
     noise: float = 0.05
     shock_frequency: float = 0.02
     shock_duration: int = 20
     reputation_weight: float = 0.5
+    engine: str = "scalar"  # Options: "scalar", "batch", "analytic"
+    seed: Optional[int] = None  # Drawn at random (and logged) when not set
+    metrics_window: int = 2000  # Moves in the sliding cooperation rate used by dynamic payoffs
     rl_params: RLParams
+    learner_state: LearnerStateParams = LearnerStateParams()
     # Make llm_params optional with a default value
     llm_params: LLMParams = LLMParams()
     remote_llm_params: RemoteLLMParams
     local_llm_params: LocalLLMParams
     meta_agent: MetaAgentParams
+    distilled_policy: DistilledPolicyParams = DistilledPolicyParams()
     network: NetworkParams
+    parallel: ParallelParams = ParallelParams()
+    llm_scheduler: LLMSchedulerParams = LLMSchedulerParams()
+    llm_client: LLMClientParams = LLMClientParams()
+    llm_cache: LLMCacheParams = LLMCacheParams()
+    llm_telemetry: LLMTelemetryParams = LLMTelemetryParams()
+    trace: TraceParams = TraceParams()
+    results_store: ResultsStoreParams = ResultsStoreParams()
+    pair_cache: PairCacheParams = PairCacheParams()
     logging: LoggingConfig
     gui: GUIConfig
 
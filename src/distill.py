@@ -0,0 +1,162 @@
+"""
+Distill an LLM agent into a lookup-table policy and check how faithful it is.
+
+The agent is asked once per state: every history of up to `memory` rounds at
+every reputation bucket, under the configured payoff matrix. Agents in the
+"constrained" decision mode report P(cooperate) directly; in "text" mode it is
+estimated from `samples` answers. The policy is played by
+src.strategies.distilled.DistilledPolicy without any network calls.
+
+Usage:
+    python -m src.distill --agent LocalLLMAgent --memory 2 --out llm_policy.npz --fidelity-matches 3 -- rounds=50
+"""
+import argparse
+import json
+import logging
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+from src.agents.llm.base import LLMAgentBase
+from src.agents.llm.decisions import scale_probability
+from src.strategies.distilled import (DistilledPolicy, history_offsets, iter_policy_states, n_policy_states,
+                                      reputation_buckets, save_policy, state_index)
+from src.strategies.history import History
+
+def query_probability(agent, my_moves, opponent_moves, reputation, payoffs, samples=5):
+    """P(cooperate) the agent gives for one state, asked on a copy of the agent."""
+    player = agent.spawn()
+    player.my_history = History(None, my_moves)
+    player.opponent_history = History(None, opponent_moves)
+    player.reputation = reputation
+    player.payoff_matrix = dict(payoffs)
+    prompt = player.build_prompt()
+    if player.decision_mode == "constrained":
+        return scale_probability(player.get_cooperation_probability(prompt), player.temperature)
+    return sum(player.get_llm_decision(prompt) == "C" for _ in range(samples)) / samples
+
+def distill(agent, payoffs, memory=2, reputation_bucket=0.25, samples=5, workers=8):
+    """
+    Query `agent` over the whole state space.
+
+    Returns:
+        Array (reputation buckets, states) of P(cooperate).
+    """
+    states = list(iter_policy_states(memory))
+    reputations = reputation_buckets(reputation_bucket)
+    probabilities = np.zeros((len(reputations), n_policy_states(memory)))
+    queries = [(b, index, mine, theirs) for b in range(len(reputations)) for index, mine, theirs in states]
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        answers = executor.map(
+            lambda q: query_probability(agent, q[2], q[3], reputations[q[0]], payoffs, samples), queries)
+        for (b, index, _, _), p in zip(queries, answers):
+            probabilities[b, index] = p
+    return probabilities
+
+def live_states(records, memory, offsets):
+    """State index player 1 was in at every round of a traced match."""
+    mine = ["CD"[m] for m in records["move1"]]
+    theirs = ["CD"[m] for m in records["move2"]]
+    return [state_index(mine[max(0, r - memory):r], theirs[max(0, r - memory):r], offsets)
+            for r in range(len(records))]
+
+def fidelity_report(agent, policy, opponents, config, matches=3, seed=0):
+    """
+    Play the live agent and the distilled policy against each opponent on the
+    same match seeds and compare them.
+
+    Per opponent the report has `agreement` (share of the live agent's moves
+    that the policy's likelier move matches), `mean_likelihood` (average
+    probability the policy gave the live move), and the mean score and
+    cooperation rate of both.
+    """
+    from src.tournament import Match  # Imported here: src.tournament imports the strategies.
+    logger = logging.getLogger("TournamentLogger")
+    offsets = history_offsets(policy.memory)
+    report = {}
+    for opponent in opponents:
+        agree = likelihood = rounds = 0
+        live_scores, distilled_scores, live_coop, distilled_coop = [], [], [], []
+        for m in range(matches):
+            match_seed = zlib.crc32(f"{seed}:{opponent}:{m}".encode())
+            live = Match(agent.spawn(), opponent.spawn(), config, logger, match_seed, trace=True)
+            live.play(1.0)
+            distilled = Match(policy.spawn(), opponent.spawn(), config, logger, match_seed)
+            distilled.play(1.0)
+
+            records = live.trace_records
+            bucket = min(len(policy.probabilities) - 1, int(round(agent.reputation / policy.reputation_bucket)))
+            for state, intended in zip(live_states(records, policy.memory, offsets), records["intended1"]):
+                p = policy.probabilities[bucket][state]
+                agree += (p >= 0.5) == (intended == 0)
+                likelihood += p if intended == 0 else 1 - p
+            rounds += len(records)
+            live_scores.append(live.p1_total)
+            distilled_scores.append(distilled.p1_total)
+            live_coop.append(live.p1.my_history.count("C") / live.rounds)
+            distilled_coop.append(distilled.p1.my_history.count("C") / distilled.rounds)
+        report[str(opponent)] = {
+            "rounds": rounds,
+            "agreement": agree / rounds,
+            "mean_likelihood": likelihood / rounds,
+            "live_score": float(np.mean(live_scores)),
+            "distilled_score": float(np.mean(distilled_scores)),
+            "live_cooperation": float(np.mean(live_coop)),
+            "distilled_cooperation": float(np.mean(distilled_coop)),
+        }
+    return report
+
+def main():
+    from hydra import compose, initialize
+    from omegaconf import OmegaConf
+    from src.config import load_config
+    from src.tournament import Tournament
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--agent", default="LocalLLMAgent", choices=["LocalLLMAgent", "RemoteLLMAgent"])
+    parser.add_argument("--memory", type=int, default=2, help="Rounds of history per state")
+    parser.add_argument("--reputation-bucket", type=float, default=0.25)
+    parser.add_argument("--samples", type=int, default=5, help="Answers per state in text decision mode")
+    parser.add_argument("--workers", type=int, default=8, help="Concurrent queries")
+    parser.add_argument("--out", default="llm_policy.npz")
+    parser.add_argument("--fidelity-matches", type=int, default=3, help="Matches per opponent (0 skips the report)")
+    parser.add_argument("--report", default=None, help="Also write the fidelity report as JSON")
+    parser.add_argument("overrides", nargs="*", help="Hydra overrides for conf/config.yaml")
+    args = parser.parse_args()
+    if args.memory < 0:
+        parser.error("--memory must be 0 or more")
+
+    with initialize(version_base=None, config_path="../conf"):
+        cfg = compose(config_name="config", overrides=["gui.enabled=false", "network.enabled=false"]
+                      + args.overrides)
+    config = load_config(OmegaConf.to_container(cfg, resolve=True))
+    # Build the agent and the opponents the way the tournament would.
+    config.strategies = [args.agent] + [name for name in config.strategies
+                                        if name not in ("LocalLLMAgent", "RemoteLLMAgent", "HumanStrategy",
+                                                        "DistilledPolicy")]
+    players = Tournament(config).players
+    agent, opponents = players[0], players[1:]
+    assert isinstance(agent, LLMAgentBase)
+
+    payoffs = config.payoff_matrix.dict()
+    n_queries = n_policy_states(args.memory) * len(reputation_buckets(args.reputation_bucket))
+    print(f"Querying {agent} for {n_queries} states...")
+    probabilities = distill(agent, payoffs, args.memory, args.reputation_bucket, args.samples, args.workers)
+    source = f"{agent.name} model={getattr(agent, 'model', None)} temperature={agent.temperature} " \
+             f"prompt_mode={agent.prompt_mode} decision_mode={agent.decision_mode}"
+    save_policy(args.out, probabilities, args.memory, args.reputation_bucket, payoffs, source)
+    print(f"Policy written to {args.out}")
+
+    if args.fidelity_matches > 0:
+        policy = DistilledPolicy(args.out)
+        report = fidelity_report(agent, policy, opponents, config, args.fidelity_matches, config.seed or 0)
+        print(f"{'opponent':>20} {'agreement':>9} {'likelihood':>10} {'live score':>10} {'distilled':>9} "
+              f"{'live coop':>9} {'dist coop':>9}")
+        for opponent, row in report.items():
+            print(f"{opponent:>20} {row['agreement']:9.1%} {row['mean_likelihood']:10.3f} {row['live_score']:10.1f} "
+                  f"{row['distilled_score']:9.1f} {row['live_cooperation']:9.1%} {row['distilled_cooperation']:9.1%}")
+        if args.report:
+            with open(args.report, "w") as f:
+                json.dump(report, f, indent=2)
+
+if __name__ == "__main__":
+    main()
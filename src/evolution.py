@@ -0,0 +1,281 @@
+"""
+Evolutionary population dynamics over the tournament's strategies.
+
+The pairwise payoff matrix (mean payoff per round of each strategy against
+each other one, itself included) is computed once, from played matches or,
+for table-driven pairings, from the exact analytic solution. Replicator or
+Moran dynamics then run for many generations as NumPy operations, with
+mutation spreading a fraction of each generation uniformly over the
+strategies. With dynamic payoffs the matrix depends on the population's
+cooperation rate; it is evaluated again only the first time the population
+reaches a payoff regime it has not seen yet.
+
+Usage:
+    python -m src.evolution --dynamics replicator --generations 5000 --mutation 0.001 --out evolution.npz
+
+The output .npz holds the strategy names and the mean frequency of every
+strategy and the population's cooperation rate per recorded generation.
+"""
+import argparse
+import hashlib
+import logging
+import os
+import time
+import numpy as np
+from src.analytic import expected_match
+from src.batch import PAYOFF_KEYS
+from src.results_store import config_hash
+from src.tournament import Match, play_pairing
+
+DYNAMICS = ("replicator", "moran")
+PAYOFF_SOURCES = ("match", "analytic")
+
+def pairwise_payoffs(players, config, source="analytic", global_coop_rate=1.0, seed=0, repeats=1):
+    """
+    Payoff and cooperation matrices of every ordered pair of players.
+
+    Args:
+        source: "match" plays every pairing `repeats` times; "analytic" solves
+            pairings between table-driven players exactly and plays the rest.
+
+    Returns:
+        (payoffs, cooperation): arrays (n, n) where [i, j] is the mean payoff
+        per round, and the cooperation rate, of players[i] against players[j].
+    """
+    logger = logging.getLogger("TournamentLogger")
+    n = len(players)
+    payoffs = np.zeros((n, n))
+    cooperation = np.zeros((n, n))
+    for i in range(n):
+        for j in range(i, n):
+            p1, p2 = players[i], players[j]
+            tables = (p1.cooperation_table(), p2.cooperation_table())
+            if source == "analytic" and None not in tables:
+                match = Match(p1, p2, config, logger)
+                match.update_dynamic_payoffs(global_coop_rate)
+                results = [expected_match(
+                    *tables, [match.payoffs.get(key, 0) for key in PAYOFF_KEYS],
+                    config.noise, config.shock_frequency, config.shock_duration,
+                    rounds=None if config.rounds_random else config.rounds,
+                    min_rounds=config.min_rounds, max_rounds=config.max_rounds,
+                )]
+            else:
+                results = []
+                for r in range(repeats):
+                    digest = hashlib.sha256(f"{seed}:{i}:{p1}:{j}:{p2}:{r}".encode()).digest()
+                    results.append(play_pairing(p1, p2, config, int.from_bytes(digest[:8], "little"),
+                                                global_coop_rate))
+            rounds = sum(result["rounds"] for result in results)
+            score1 = sum(result["score1"] for result in results) / rounds
+            score2 = sum(result["score2"] for result in results) / rounds
+            coop1 = sum(result["cooperations1"] for result in results) / rounds
+            coop2 = sum(result["cooperations2"] for result in results) / rounds
+            if i == j:
+                # Both seats are the same strategy.
+                score1 = score2 = (score1 + score2) / 2
+                coop1 = coop2 = (coop1 + coop2) / 2
+            payoffs[i, j], payoffs[j, i] = score1, score2
+            cooperation[i, j], cooperation[j, i] = coop1, coop2
+    return payoffs, cooperation
+
+class PayoffLandscape:
+    """
+    Payoff matrices per payoff regime, evaluated on first use.
+
+    Without dynamic payoffs there is a single regime. With them, the regime is
+    the payoff matrix a Match would use at a given global cooperation rate, so
+    the pairings are only evaluated again when that matrix changes.
+    """
+    def __init__(self, players, config, source="analytic", seed=0, repeats=1, cache_path=None):
+        self.players = players
+        self.config = config
+        self.source = source
+        self.seed = seed
+        self.repeats = repeats
+        self.cache_path = cache_path
+        self.rules = Match(None, None, config, logging.getLogger("TournamentLogger"))
+        self.base_payoffs = config.payoff_matrix.dict()
+        self.names = [str(player) for player in players]
+        self.key = config_hash(config)
+        self.matrices = {}  # regime -> (payoffs, cooperation)
+        self.evaluations = 0
+        self.load()
+
+    def regime(self, cooperation_rate: float) -> tuple:
+        if not self.config.dynamic_payoffs:
+            return tuple(self.base_payoffs[key] for key in PAYOFF_KEYS)
+        self.rules.payoffs = dict(self.base_payoffs)
+        self.rules.update_dynamic_payoffs(cooperation_rate)
+        return tuple(self.rules.payoffs.get(key, 0) for key in PAYOFF_KEYS)
+
+    def matrices_at(self, cooperation_rate: float):
+        """(payoffs, cooperation) matrices for a population cooperating at this rate."""
+        regime = self.regime(cooperation_rate)
+        if regime not in self.matrices:
+            self.matrices[regime] = pairwise_payoffs(self.players, self.config, self.source, cooperation_rate,
+                                                     self.seed, self.repeats)
+            self.evaluations += 1
+            self.save()
+        return self.matrices[regime]
+
+    def load(self):
+        """Reuse matrices saved for the same strategies and outcome-relevant config."""
+        if not self.cache_path or not os.path.exists(self.cache_path):
+            return
+        with np.load(self.cache_path, allow_pickle=False) as data:
+            if str(data["key"]) != self.key or data["names"].tolist() != self.names \
+                    or str(data["source"]) != self.source:
+                return
+            for regime, payoffs, cooperation in zip(data["regimes"], data["payoffs"], data["cooperation"]):
+                self.matrices[tuple(int(v) for v in regime)] = (payoffs, cooperation)
+
+    def save(self):
+        if not self.cache_path:
+            return
+        regimes = list(self.matrices)
+        np.savez_compressed(
+            self.cache_path,
+            key=np.str_(self.key),
+            source=np.str_(self.source),
+            names=np.array(self.names, dtype=np.str_),
+            regimes=np.array(regimes, dtype=np.int64),
+            payoffs=np.stack([self.matrices[regime][0] for regime in regimes]),
+            cooperation=np.stack([self.matrices[regime][1] for regime in regimes]),
+        )
+
+def replicator(landscape, frequencies, generations, selection=1.0, mutation=0.0, record_every=1):
+    """
+    Discrete-time replicator dynamics with uniform mutation.
+
+    Each generation a strategy's frequency grows with its fitness
+    1 - selection + selection * (expected payoff per round against the
+    population), then `mutation` of the population is spread evenly over all
+    strategies.
+
+    Returns:
+        (frequencies, cooperation): arrays with one row per recorded generation.
+    """
+    x = np.asarray(frequencies, dtype=float)
+    x = x / x.sum()
+    n = len(x)
+    history, cooperation_history = [], []
+    # As at the start of a tournament, before any moves, the cooperation rate counts as 1.
+    rate = 1.0
+    for generation in range(generations + 1):
+        payoffs, cooperation = landscape.matrices_at(rate)
+        rate = x @ cooperation @ x
+        if generation % record_every == 0:
+            history.append(x.copy())
+            cooperation_history.append(rate)
+        if generation == generations:
+            break
+        fitness = 1 - selection + selection * (payoffs @ x)
+        x = x * fitness
+        x = (1 - mutation) * x / x.sum() + mutation / n
+    return np.array(history, dtype=np.float32), np.array(cooperation_history, dtype=np.float32)
+
+def moran(landscape, counts, generations, rng, replicates=100, selection=1.0, mutation=0.0, record_every=1):
+    """
+    Moran birth-death process in `replicates` independent populations of
+    sum(counts) individuals, stepped together.
+
+    In every step each population picks one individual to reproduce, with
+    probability proportional to its fitness 1 - selection + selection *
+    (mean payoff per round against the rest of its population), and one to
+    replace, uniformly. With probability `mutation` the offspring is a uniformly
+    chosen strategy instead. A generation is population-size steps. Dynamic
+    payoffs follow the cooperation rate averaged over the replicates, updated
+    once per generation.
+
+    Returns:
+        (frequencies, cooperation): mean over replicates, one row per recorded
+        generation.
+    """
+    counts = np.tile(np.asarray(counts, dtype=np.int64), (replicates, 1))
+    size = int(counts[0].sum())
+    n = counts.shape[1]
+    rows = np.arange(replicates)
+    history, cooperation_history = [], []
+    rate = 1.0
+    for generation in range(generations + 1):
+        x = counts / size
+        payoffs, cooperation = landscape.matrices_at(rate)
+        rate = float(np.einsum("ri,ij,rj->r", x, cooperation, x).mean())
+        if generation % record_every == 0:
+            history.append(x.mean(axis=0))
+            cooperation_history.append(rate)
+        if generation == generations:
+            break
+        self_payoff = np.diag(payoffs)
+        for _ in range(size):
+            # Mean payoff against everyone else in the population.
+            mean_payoff = (counts @ payoffs.T - self_payoff) / max(1, size - 1)
+            weights = counts * (1 - selection + selection * mean_payoff)
+            birth = (np.cumsum(weights, axis=1) < rng.random(replicates)[:, None] * weights.sum(axis=1)[:, None]) \
+                .sum(axis=1)
+            mutants = rng.random(replicates) < mutation
+            birth = np.where(mutants, rng.integers(0, n, replicates), birth)
+            death = (np.cumsum(counts, axis=1) <= rng.integers(0, size, replicates)[:, None]).sum(axis=1)
+            counts[rows, birth] += 1
+            counts[rows, death] -= 1
+    return np.array(history, dtype=np.float32), np.array(cooperation_history, dtype=np.float32)
+
+def main():
+    from hydra import compose, initialize
+    from omegaconf import OmegaConf
+    from src.agents.llm.base import LLMAgentBase
+    from src.config import load_config
+    from src.tournament import STRATEGY_MAP, Tournament
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--dynamics", choices=DYNAMICS, default="replicator")
+    parser.add_argument("--generations", type=int, default=1000)
+    parser.add_argument("--mutation", type=float, default=0.0, help="Share of offspring that mutate per generation")
+    parser.add_argument("--selection", type=float, default=1.0, help="Selection intensity (0 is neutral drift)")
+    parser.add_argument("--source", choices=PAYOFF_SOURCES, default="analytic",
+                        help="How pairings are evaluated: solved where possible, or always played")
+    parser.add_argument("--repeats", type=int, default=1, help="Matches per pairing when played")
+    parser.add_argument("--population", type=int, default=100, help="Individuals per Moran population")
+    parser.add_argument("--replicates", type=int, default=100, help="Moran populations run together")
+    parser.add_argument("--record-every", type=int, default=1)
+    parser.add_argument("--strategies", nargs="+", default=None, help="Strategies (default: those in the config)")
+    parser.add_argument("--matrix", default=None, help="Payoff matrix cache (.npz) to reuse across runs")
+    parser.add_argument("--out", default="evolution.npz")
+    parser.add_argument("overrides", nargs="*", help="Hydra overrides for conf/config.yaml")
+    args = parser.parse_args()
+
+    with initialize(version_base=None, config_path="../conf"):
+        cfg = compose(config_name="config", overrides=["gui.enabled=false", "network.enabled=false",
+                                                       "logging.verbose=false"] + args.overrides)
+    config = load_config(OmegaConf.to_container(cfg, resolve=True))
+    # LLM and human players cannot be evaluated offline.
+    config.strategies = [name for name in (args.strategies or config.strategies)
+                         if name in STRATEGY_MAP and name != "HumanStrategy"
+                         and not issubclass(STRATEGY_MAP[name], LLMAgentBase)]
+    tournament = Tournament(config)
+    players = tournament.players
+    names = [str(player) for player in players]
+    seed = tournament.seed
+    landscape = PayoffLandscape(players, config, args.source, seed, args.repeats, args.matrix)
+
+    start = time.perf_counter()
+    if args.dynamics == "replicator":
+        frequencies, cooperation = replicator(landscape, np.ones(len(players)), args.generations,
+                                              args.selection, args.mutation, args.record_every)
+    else:
+        counts = np.full(len(players), args.population // len(players))
+        counts[:args.population - counts.sum()] += 1
+        frequencies, cooperation = moran(landscape, counts, args.generations, np.random.default_rng(seed),
+                                         args.replicates, args.selection, args.mutation, args.record_every)
+    elapsed = time.perf_counter() - start
+    np.savez_compressed(args.out, names=np.array(names, dtype=np.str_), frequencies=frequencies,
+                        cooperation=cooperation, record_every=np.int64(args.record_every))
+
+    print(f"{args.generations} {args.dynamics} generations in {elapsed:.2f}s "
+          f"({landscape.evaluations} payoff matrix evaluations); series written to {args.out}")
+    for name, share in sorted(zip(names, frequencies[-1]), key=lambda item: -item[1]):
+        print(f"{name:>20} {share:7.1%}")
+    print(f"{'cooperation':>20} {cooperation[-1]:7.1%}")
+
+if __name__ == "__main__":
+    main()
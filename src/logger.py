@@ -1,6 +1,36 @@
+import atexit
 import logging
+import queue
+from logging.handlers import QueueHandler, QueueListener
 
-def setup_logger(log_file="tournament.log", verbose=True):
+class Event:
+    """
+    Structured log message: an event name plus key=value fields.
+
+    Rendering to text is deferred until a handler formats the record, which with
+    the queue handler happens on the listener thread, off the game loop.
+    """
+    __slots__ = ("name", "fields")
+
+    def __init__(self, name, fields):
+        self.name = name
+        self.fields = fields
+
+    def __str__(self):
+        return " ".join([self.name] + [f"{key}={value}" for key, value in self.fields.items()])
+
+def log_event(logger, level, name, **fields):
+    """Log a structured event; does nothing (not even build the record) if `level` is disabled."""
+    if logger.isEnabledFor(level):
+        logger.log(level, Event(name, fields))
+
+class _DeferredQueueHandler(QueueHandler):
+    # The queue never leaves the process, so records are passed through as-is
+    # instead of being formatted on the calling thread.
+    def prepare(self, record):
+        return record
+
+def setup_logger(log_file="tournament.log", verbose=True, use_queue=True):
     logger = logging.getLogger("TournamentLogger")
     logger.setLevel(logging.DEBUG if verbose else logging.INFO)
     fh = logging.FileHandler(log_file)
@@ -11,6 +41,40 @@ def setup_logger(log_file="tournament.log", verbose=True):
     fh.setFormatter(formatter)
     ch.setFormatter(formatter)
     if not logger.handlers:
-        logger.addHandler(fh)
-        logger.addHandler(ch)
+        if use_queue:
+            # File and console I/O run on a background thread fed by a queue.
+            records = queue.SimpleQueue()
+            listener = QueueListener(records, fh, ch, respect_handler_level=True)
+            listener.start()
+            handler = _DeferredQueueHandler(records)
+            handler.listener = listener
+            atexit.register(shutdown_logger)
+            logger.addHandler(handler)
+        else:
+            logger.addHandler(fh)
+            logger.addHandler(ch)
+    else:
+        fh.close()
     return logger
+
+def shutdown_logger():
+    """Remove the tournament logger's handlers, first writing out any records still queued."""
+    logger = logging.getLogger("TournamentLogger")
+    for handler in list(logger.handlers):
+        logger.removeHandler(handler)
+        listener = getattr(handler, "listener", None)
+        if listener is not None:
+            listener.stop()
+            for target in listener.handlers:
+                target.close()
+        handler.close()
+
+def setup_worker_logger(log_file="tournament.log", verbose=True):
+    """
+    Configure logging in a pool worker. A forked worker inherits the parent's
+    queue handler but not its listener thread, so it logs directly instead.
+    """
+    logger = logging.getLogger("TournamentLogger")
+    for handler in list(logger.handlers):
+        logger.removeHandler(handler)
+    return setup_logger(log_file, verbose, use_queue=False)
@@ -0,0 +1,123 @@
+from collections import deque
+
+class _Window:
+    """Cooperations over roughly the last `size` moves, kept as blocks of (cooperations, moves)."""
+    __slots__ = ("size", "blocks", "cooperations", "moves")
+
+    def __init__(self, size):
+        self.size = size
+        self.blocks = deque()  # Oldest first
+        self.cooperations = 0
+        self.moves = 0
+
+    def add(self, cooperations, moves):
+        self.blocks.append((cooperations, moves))
+        self.cooperations += cooperations
+        self.moves += moves
+        while len(self.blocks) > 1 and self.moves - self.blocks[0][1] >= self.size:
+            old_cooperations, old_moves = self.blocks.popleft()
+            self.cooperations -= old_cooperations
+            self.moves -= old_moves
+
+class CooperationMetrics:
+    """
+    Running cooperation rates for a tournament, fed as rounds finish.
+
+    Keeps counts overall, per strategy and per pairing, each both in total and
+    over the last `window` moves. Rounds passed to record_round() are held
+    until the match is committed with commit_match(), so an abandoned match
+    (discard_match()) leaves no partial counts. Every update is O(1);
+    `history` and `window_history` hold one sample per finished match.
+    """
+    def __init__(self, window=2000):
+        self.window = window
+        self.cooperations = 0
+        self.moves = 0
+        self.by_strategy = {}  # name -> [cooperations, moves]
+        self.by_pairing = {}   # (name1, name2) -> [cooperations, moves]
+        self._recent = _Window(window)
+        self._recent_by_strategy = {}  # name -> _Window
+        self._recent_by_pairing = {}   # (name1, name2) -> _Window
+        self._pending = {}  # (name1, name2) -> [cooperations1, cooperations2, rounds] of matches in progress
+        self.history = []
+        self.window_history = []
+
+    def record_round(self, name1: str, name2: str, move1: str, move2: str):
+        """Add one round of a match between `name1` and `name2`; counted once the match is committed."""
+        counts = self._pending.get((name1, name2))
+        if counts is None:
+            counts = self._pending[(name1, name2)] = [0, 0, 0]
+        counts[0] += move1 == "C"
+        counts[1] += move2 == "C"
+        counts[2] += 1
+
+    def commit_match(self, name1: str, name2: str):
+        """Count the rounds recorded for the match between `name1` and `name2`."""
+        counts = self._pending.pop((name1, name2), None)
+        if counts is not None:
+            self.record_counts(name1, name2, *counts)
+
+    def discard_match(self, name1: str, name2: str):
+        """Drop the rounds recorded for an abandoned match."""
+        self._pending.pop((name1, name2), None)
+
+    def record_counts(self, name1: str, name2: str, cooperations1: int, cooperations2: int, rounds: int):
+        """Add `rounds` rounds at once, e.g. a whole match played elsewhere."""
+        cooperations = cooperations1 + cooperations2
+        moves = 2 * rounds
+        self.cooperations += cooperations
+        self.moves += moves
+        self._add(self.by_strategy, name1, cooperations1, rounds)
+        self._add(self.by_strategy, name2, cooperations2, rounds)
+        self._add(self.by_pairing, (name1, name2), cooperations, moves)
+
+        self._recent.add(cooperations, moves)
+        self._window(self._recent_by_strategy, name1).add(cooperations1, rounds)
+        self._window(self._recent_by_strategy, name2).add(cooperations2, rounds)
+        self._window(self._recent_by_pairing, (name1, name2)).add(cooperations, moves)
+
+    @staticmethod
+    def _add(table, key, cooperations, moves):
+        counts = table.get(key)
+        if counts is None:
+            table[key] = [cooperations, moves]
+        else:
+            counts[0] += cooperations
+            counts[1] += moves
+
+    def _window(self, table, key) -> _Window:
+        window = table.get(key)
+        if window is None:
+            window = table[key] = _Window(self.window)
+        return window
+
+    def end_match(self):
+        """Sample the current rates into the per-match time series."""
+        self.history.append(self.rate())
+        self.window_history.append(self.window_rate())
+
+    @staticmethod
+    def _rate(cooperations, moves):
+        return cooperations / moves if moves > 0 else 1.0
+
+    def rate(self) -> float:
+        return self._rate(self.cooperations, self.moves)
+
+    def window_rate(self) -> float:
+        return self._rate(self._recent.cooperations, self._recent.moves)
+
+    def strategy_rate(self, name: str) -> float:
+        return self._rate(*self.by_strategy.get(name, (0, 0)))
+
+    def strategy_window_rate(self, name: str) -> float:
+        """Cooperation rate over the last `window` moves of strategy `name`."""
+        window = self._recent_by_strategy.get(name)
+        return self._rate(window.cooperations, window.moves) if window else 1.0
+
+    def pairing_rate(self, name1: str, name2: str) -> float:
+        return self._rate(*self.by_pairing.get((name1, name2), (0, 0)))
+
+    def pairing_window_rate(self, name1: str, name2: str) -> float:
+        """Cooperation rate over the last `window` moves between `name1` and `name2`."""
+        window = self._recent_by_pairing.get((name1, name2))
+        return self._rate(window.cooperations, window.moves) if window else 1.0
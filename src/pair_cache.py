@@ -0,0 +1,131 @@
+"""
+Content-addressed cache of pairwise match results.
+
+A match between two players is fully determined by the players' parameters,
+the match rules in the config and the pairing seed, so its result is stored
+under a hash of exactly those. Any run that meets the same pairing again (a
+repeated sweep point, or a tournament with one more strategy) reads the
+result instead of playing it. Entries live in a SQLite file; the least
+recently used ones beyond `max_entries` are evicted on flush().
+"""
+import hashlib
+import json
+import sqlite3
+import time
+import numpy as np
+from src.strategies.base import Strategy
+
+# TournamentConfig fields that decide how a match between two given players plays out.
+MATCH_FIELDS = ("rounds", "rounds_random", "min_rounds", "max_rounds", "payoff_matrix", "noise",
+                "shock_frequency", "shock_duration")
+
+# Part of every key; bump it when an engine change alters the result of the
+# same pairing and seed, so results from the old engine are not reused.
+# 2: batch rows draw from their own match's generator.
+KEY_VERSION = 2
+
+# Result fields kept per pairing.
+RESULT_FIELDS = ("score1", "score2", "cooperations1", "cooperations2", "rounds")
+
+# Strategy attributes that are not parameters: the match histories and the random stream.
+RUNTIME_ATTRS = ("my_history", "opponent_history", "rng")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    key TEXT PRIMARY KEY,
+    result TEXT NOT NULL,
+    last_used REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS results_last_used ON results (last_used);
+"""
+
+def _canonical(value):
+    """JSON-serializable form of a strategy attribute."""
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, np.ndarray):
+        digest = hashlib.sha256(np.ascontiguousarray(value).tobytes()).hexdigest()
+        return {"dtype": str(value.dtype), "shape": list(value.shape), "sha256": digest}
+    if isinstance(value, (list, tuple)):
+        return [_canonical(item) for item in value]
+    if isinstance(value, dict):
+        return {str(key): _canonical(item) for key, item in value.items()}
+    if isinstance(value, Strategy):
+        return strategy_fingerprint(value)
+    if isinstance(value, type):
+        return f"{value.__module__}.{value.__qualname__}"
+    # Other objects (clients, caches, ...) only contribute their type.
+    return f"{type(value).__module__}.{type(value).__qualname__}"
+
+def strategy_fingerprint(player) -> dict:
+    """The class and parameters of a strategy, as plain JSON data."""
+    cls = type(player)
+    return {
+        "class": f"{cls.__module__}.{cls.__qualname__}",
+        "params": {attr: _canonical(value) for attr, value in vars(player).items() if attr not in RUNTIME_ATTRS},
+    }
+
+def pair_key(fingerprint1, fingerprint2, config, engine, seed) -> str:
+    """
+    Cache key of one pairing: a SHA-256 over both players' fingerprints (in
+    seat order), the match rules, the engine that plays it and its seed (None
+    for results that do not depend on one, such as analytic solutions).
+    """
+    payload = {
+        "version": KEY_VERSION,
+        "players": [fingerprint1, fingerprint2],
+        "rules": config.dict(include=set(MATCH_FIELDS)),
+        "engine": engine,
+        "seed": seed,
+    }
+    return hashlib.sha256(json.dumps(payload, sort_keys=True).encode()).hexdigest()
+
+class PairResultsCache:
+    """SQLite-backed LRU map from pair_key() to a match result dict."""
+    def __init__(self, path, max_entries=100000):
+        self.path = path
+        self.max_entries = max_entries
+        self.conn = sqlite3.connect(path)
+        self.conn.executescript(SCHEMA)
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return self.conn.execute("SELECT COUNT(*) FROM results").fetchone()[0]
+
+    def get(self, key):
+        """Return the cached result for `key`, or None."""
+        row = self.conn.execute("SELECT result FROM results WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self.conn.execute("UPDATE results SET last_used = ? WHERE key = ?", (time.time(), key))
+        return json.loads(row[0])
+
+    def put(self, key, result):
+        stored = {field: _canonical(result[field]) for field in RESULT_FIELDS}
+        self.conn.execute("INSERT OR REPLACE INTO results VALUES (?, ?, ?)", (key, json.dumps(stored), time.time()))
+
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def evict(self) -> int:
+        """Drop the least recently used entries beyond max_entries; returns how many."""
+        cursor = self.conn.execute(
+            "DELETE FROM results WHERE key NOT IN (SELECT key FROM results ORDER BY last_used DESC LIMIT ?)",
+            (self.max_entries,))
+        return cursor.rowcount
+
+    def flush(self) -> int:
+        """Evict down to max_entries and write the changes; returns how many entries were evicted."""
+        evicted = self.evict()
+        self.conn.commit()
+        return evicted
+
+    def close(self):
+        self.flush()
+        self.conn.close()
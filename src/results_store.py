@@ -0,0 +1,152 @@
+import hashlib
+import json
+import sqlite3
+import time
+import uuid
+
+# Settings that do not change match outcomes and are left out of the config hash.
+NON_OUTCOME_FIELDS = ("logging", "gui", "parallel", "trace", "results_store", "llm_client", "llm_telemetry",
+                      "llm_scheduler", "pair_cache")
+
+# Run columns that can be filtered on; numeric ones also accept min_/max_ prefixes.
+RUN_COLUMNS = ("run_id", "config_hash", "seed", "engine", "noise", "rounds", "rounds_random",
+               "dynamic_payoffs", "shock_frequency", "shock_duration")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    run_id TEXT PRIMARY KEY,
+    config_hash TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    seed INTEGER,
+    engine TEXT,
+    noise REAL,
+    rounds INTEGER,
+    rounds_random INTEGER,
+    dynamic_payoffs INTEGER,
+    shock_frequency REAL,
+    shock_duration INTEGER,
+    config_json TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS runs_config_hash ON runs (config_hash);
+CREATE INDEX IF NOT EXISTS runs_noise ON runs (noise);
+CREATE TABLE IF NOT EXISTS matches (
+    run_id TEXT NOT NULL REFERENCES runs (run_id),
+    match_index INTEGER NOT NULL,
+    player1 TEXT NOT NULL,
+    player2 TEXT NOT NULL,
+    score1 REAL NOT NULL,
+    score2 REAL NOT NULL,
+    PRIMARY KEY (run_id, match_index)
+);
+CREATE INDEX IF NOT EXISTS matches_pairing ON matches (player1, player2);
+CREATE INDEX IF NOT EXISTS matches_player2 ON matches (player2);
+"""
+
+def config_hash(config) -> str:
+    """Hash of every config setting that can change match outcomes."""
+    settings = config.dict(exclude=set(NON_OUTCOME_FIELDS))
+    return hashlib.sha256(json.dumps(settings, sort_keys=True).encode()).hexdigest()
+
+class ResultsStore:
+    """
+    SQLite store of match results across tournament runs.
+
+    Every run is keyed by a run ID and the hash of its outcome-relevant config,
+    with the most common sweep parameters kept as indexed columns so results can
+    be filtered by them without parsing the stored config.
+    """
+    def __init__(self, path="results.db"):
+        self.path = path
+        self.conn = sqlite3.connect(path)
+        self.conn.executescript(SCHEMA)
+
+    def close(self):
+        self.conn.close()
+
+    def record_run(self, config, match_results, run_id=None, seed=None) -> str:
+        """Insert a run and all its match results in one transaction."""
+        run_id = run_id or uuid.uuid4().hex
+        with self.conn:
+            self.conn.execute(
+                "INSERT INTO runs VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (run_id, config_hash(config), time.time(), seed, config.engine, config.noise,
+                 config.rounds, config.rounds_random, config.dynamic_payoffs, config.shock_frequency,
+                 config.shock_duration, json.dumps(config.dict(), sort_keys=True)),
+            )
+            self.conn.executemany(
+                "INSERT INTO matches VALUES (?, ?, ?, ?, ?, ?)",
+                [(run_id, index, row["player1"], row["player2"], row["score1"], row["score2"])
+                 for index, row in enumerate(match_results)],
+            )
+        return run_id
+
+    @staticmethod
+    def _run_filter(filters):
+        """
+        Build a WHERE clause on runs from keyword filters such as
+        noise=0.05, min_noise=0.1 or config_hash="...".
+        """
+        clauses, params = [], []
+        for key, value in filters.items():
+            op = "="
+            column = key
+            if key.startswith("min_"):
+                op, column = ">=", key[4:]
+            elif key.startswith("max_"):
+                op, column = "<=", key[4:]
+            if column not in RUN_COLUMNS:
+                raise ValueError(f"Cannot filter runs on '{key}'")
+            clauses.append(f"r.{column} {op} ?")
+            params.append(value)
+        where = " AND ".join(clauses) if clauses else "1"
+        return where, params
+
+    def head_to_head(self, player1: str, player2: str, **filters) -> dict:
+        """
+        Aggregate every match between two players (in either seat) over the runs
+        matching `filters`.
+
+        Returns:
+            Dict with the number of matches and runs and the mean score of each player.
+        """
+        where, params = self._run_filter(filters)
+        row = self.conn.execute(
+            f"""
+            SELECT COUNT(*), COUNT(DISTINCT m.run_id), AVG(m.s1), AVG(m.s2)
+            FROM (
+                SELECT run_id, score1 AS s1, score2 AS s2 FROM matches WHERE player1 = ? AND player2 = ?
+                UNION ALL
+                SELECT run_id, score2 AS s1, score1 AS s2 FROM matches WHERE player1 = ? AND player2 = ?
+            ) AS m
+            JOIN runs AS r ON r.run_id = m.run_id
+            WHERE {where}
+            """,
+            [player1, player2, player2, player1] + params,
+        ).fetchone()
+        return {"matches": row[0], "runs": row[1], "mean_score1": row[2], "mean_score2": row[3]}
+
+    def leaderboard(self, **filters):
+        """
+        Rank players by mean score per match over the runs matching `filters`.
+
+        Returns:
+            List of dicts (player, matches, mean_score, total_score), best first.
+        """
+        where, params = self._run_filter(filters)
+        rows = self.conn.execute(
+            f"""
+            SELECT m.player, COUNT(*), AVG(m.score), SUM(m.score)
+            FROM (
+                SELECT run_id, player1 AS player, score1 AS score FROM matches
+                UNION ALL
+                SELECT run_id, player2 AS player, score2 AS score FROM matches
+            ) AS m
+            JOIN runs AS r ON r.run_id = m.run_id
+            WHERE {where}
+            GROUP BY m.player
+            ORDER BY AVG(m.score) DESC
+            """,
+            params,
+        ).fetchall()
+        return [{"player": player, "matches": count, "mean_score": mean, "total_score": total}
+                for player, count, mean, total in rows]
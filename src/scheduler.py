@@ -0,0 +1,74 @@
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from src.agents.llm.base import LLMAgentBase
+from src.agents.llm.batching import CompletionBatcher
+from src.agents.llm.client import CLIENT_POOL
+from src.agents.llm.local import LocalLLMAgent
+
+class LLMMatchScheduler:
+    """
+    Runs matches that involve LLM agents concurrently on an asyncio event loop.
+
+    Up to `max_concurrency` matches are in flight at once and both players of a
+    match choose their move at the same time. LLM calls block on worker threads;
+    LocalLLMAgents that share an endpoint are given a CompletionBatcher so their
+    pending prompts go out together as batched completion requests.
+    """
+    def __init__(self, max_concurrency=8, max_batch=16, batch_wait=0.005, logger=None):
+        self.max_concurrency = max_concurrency
+        self.max_batch = max_batch
+        self.batch_wait = batch_wait
+        self.logger = logger
+        self.batchers = {}
+
+    @staticmethod
+    def involves_llm(player1, player2) -> bool:
+        return isinstance(player1, LLMAgentBase) or isinstance(player2, LLMAgentBase)
+
+    def attach(self, players):
+        """Give every LocalLLMAgent prototype a batcher shared per endpoint."""
+        for player in players:
+            if isinstance(player, LocalLLMAgent):
+                if player.endpoint not in self.batchers:
+                    self.batchers[player.endpoint] = CompletionBatcher(
+                        player.endpoint, self.max_batch, self.batch_wait,
+                        CLIENT_POOL.timeout, CLIENT_POOL.session())
+                player.batcher = self.batchers[player.endpoint]
+
+    def detach(self, players):
+        for player in players:
+            if isinstance(player, LocalLLMAgent):
+                player.batcher = None
+        for batcher in self.batchers.values():
+            batcher.close()
+        self.batchers = {}
+
+    def run(self, jobs):
+        """
+        Run coroutine factories (callables returning an awaitable match result)
+        and return their results in order.
+        """
+        start = time.perf_counter()
+        results = asyncio.run(self._run(jobs))
+        elapsed = time.perf_counter() - start
+        if self.logger and jobs:
+            self.logger.info(f"Played {len(jobs)} LLM matches in {elapsed:.2f}s "
+                             f"({len(jobs) / elapsed:.2f} matches/s, concurrency {self.max_concurrency}).")
+            for endpoint, batcher in self.batchers.items():
+                if batcher.requests_sent:
+                    self.logger.info(f"{endpoint}: {batcher.prompts_sent} prompts in {batcher.requests_sent} "
+                                     f"batched requests.")
+        return results
+
+    async def _run(self, jobs):
+        loop = asyncio.get_running_loop()
+        # Each match can have two blocking calls in flight.
+        loop.set_default_executor(ThreadPoolExecutor(max_workers=2 * self.max_concurrency))
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        async def bounded(job):
+            async with semaphore:
+                return await job()
+
+        return await asyncio.gather(*(bounded(job) for job in jobs))
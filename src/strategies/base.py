@@ -1,10 +1,27 @@
+import copy
+import random
 from abc import ABC, abstractmethod
+from src.strategies.history import History
 
 class Strategy(ABC):
+    # Whether matches involving this strategy may be played in a worker process.
+    parallel_safe = True
+    # Whether match results involving this strategy may be reused from the
+    # pairwise results cache (see src.pair_cache).
+    cacheable = True
+    # Source of randomness for move(); a Match gives each player its own seeded stream.
+    rng = random
+    # Attributes that are mutated in place during a match. spawn() gives each copy
+    # its own instance of these; every other attribute is shared with the prototype
+    # and treated as read-only while playing.
+    per_match_state = ("my_history", "opponent_history")
+    # How many past moves move() looks back at; None keeps the full history.
+    memory_depth = None
+
     def __init__(self, name):
         self.name = name
-        self.my_history = []
-        self.opponent_history = []
+        self.my_history = History(self.memory_depth)
+        self.opponent_history = History(self.memory_depth)
         self.reputation = 0.5  # Default neutral reputation
 
     def __str__(self):
@@ -15,6 +32,29 @@ class Strategy(ABC):
         """Return 'C' for cooperate or 'D' for defect."""
         pass
 
+    async def move_async(self) -> str:
+        """Awaitable move(); strategies that wait on I/O override it."""
+        return self.move()
+
+    def spawn(self):
+        """Return a cheap copy of this strategy to play one match with."""
+        clone = object.__new__(type(self))
+        clone.__dict__.update(self.__dict__)
+        for attr in self.per_match_state:
+            setattr(clone, attr, copy.deepcopy(getattr(self, attr)))
+        return clone
+
+    def cooperation_table(self):
+        """
+        Return this strategy as a lookup table of cooperation probabilities
+        (see src.strategies.table), or None if it cannot be written as one.
+        """
+        return None
+
+    def set_rng(self, rng):
+        """Use `rng` (a random.Random) for this strategy's random decisions."""
+        self.rng = rng
+
     def record(self, my_move: str, opp_move: str):
         """Record the moves made by both players."""
         self.my_history.append(my_move)
@@ -22,8 +62,8 @@ class Strategy(ABC):
 
     def reset(self):
         """Reset the strategy state."""
-        self.my_history = []
-        self.opponent_history = []
+        self.my_history = History(self.memory_depth)
+        self.opponent_history = History(self.memory_depth)
         
     def update_reputation(self):
         """Update reputation based on cooperation rate."""
@@ -1,24 +1,39 @@
 from src.strategies.base import Strategy
-import random
+from src.strategies.table import build_table
 
 class AlwaysCooperate(Strategy):
+    memory_depth = 0
+
     def __init__(self):
         super().__init__("AlwaysCooperate")
     
     def move(self) -> str:
         return "C"
 
+    def cooperation_table(self):
+        return build_table(lambda prev, last, grudge: 1.0)
+
 class AlwaysDefect(Strategy):
+    memory_depth = 0
+
     def __init__(self):
         super().__init__("AlwaysDefect")
     
     def move(self) -> str:
         return "D"
 
+    def cooperation_table(self):
+        return build_table(lambda prev, last, grudge: 0.0)
+
 class RandomStrategy(Strategy):
+    memory_depth = 0
+
     def __init__(self, p_cooperate=0.5):
         super().__init__("RandomStrategy")
         self.p_cooperate = p_cooperate
     
     def move(self) -> str:
-        return "C" if random.random() < self.p_cooperate else "D"
\ No newline at end of file
+        return "C" if self.rng.random() < self.p_cooperate else "D"
+
+    def cooperation_table(self):
+        return build_table(lambda prev, last, grudge: self.p_cooperate)
\ No newline at end of file
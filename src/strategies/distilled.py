@@ -0,0 +1,111 @@
+"""
+Lookup-table policies distilled from LLM agents (see src/distill.py).
+
+A policy gives the probability of cooperating for every combination of the
+last `memory` rounds (both players' moves, fewer at the start of a match) and
+a reputation bucket. It is stored as a compressed .npz file.
+"""
+import numpy as np
+from src.strategies.base import Strategy
+
+_MOVE_BITS = {"C": 0, "D": 1}
+
+def history_offsets(memory: int):
+    """Index of the first state for each history length 0..memory (plus the total)."""
+    offsets = [0]
+    for length in range(memory + 1):
+        offsets.append(offsets[-1] + 4 ** length)
+    return offsets
+
+def n_policy_states(memory: int) -> int:
+    return history_offsets(memory)[-1]
+
+def state_index(my_moves, opponent_moves, offsets) -> int:
+    """State of equally long move sequences (oldest first) of at most `memory` rounds."""
+    code = 0
+    for mine, theirs in zip(my_moves, opponent_moves):
+        code = code * 4 + 2 * _MOVE_BITS[mine] + _MOVE_BITS[theirs]
+    return offsets[len(my_moves)] + code
+
+def iter_policy_states(memory: int):
+    """Yield (state index, my moves, opponent moves) for every state, in index order."""
+    offsets = history_offsets(memory)
+    for length in range(memory + 1):
+        for code in range(4 ** length):
+            mine, theirs = [], []
+            for shift in range(length - 1, -1, -1):
+                pair = (code >> (2 * shift)) & 3
+                mine.append("CD"[pair >> 1])
+                theirs.append("CD"[pair & 1])
+            yield offsets[length] + code, mine, theirs
+
+def reputation_buckets(bucket: float):
+    """Reputation value at the center of every bucket, from 0 to 1."""
+    return [min(1.0, i * bucket) for i in range(int(round(1 / bucket)) + 1)]
+
+def save_policy(path, probabilities, memory, reputation_bucket, payoffs, source=""):
+    """
+    Args:
+        probabilities: Array (reputation buckets, states) of P(cooperate).
+        payoffs: Payoff matrix dict the policy was distilled under.
+        source: Description of the agent it was distilled from.
+    """
+    np.savez_compressed(
+        path,
+        probabilities=np.asarray(probabilities, dtype=np.float32),
+        memory=np.int64(memory),
+        reputation_bucket=np.float64(reputation_bucket),
+        payoffs=np.array([payoffs[key] for key in ("CC", "CD", "DC", "DD")], dtype=np.int64),
+        source=np.str_(source),
+    )
+
+def load_policy(path) -> dict:
+    with np.load(path, allow_pickle=False) as data:
+        return {
+            "probabilities": data["probabilities"].astype(np.float64),
+            "memory": int(data["memory"]),
+            "reputation_bucket": float(data["reputation_bucket"]),
+            "payoffs": dict(zip(("CC", "CD", "DC", "DD"), data["payoffs"].tolist())),
+            "source": str(data["source"]),
+        }
+
+class DistilledPolicy(Strategy):
+    def __init__(self, path="llm_policy.npz", name="DistilledPolicy"):
+        """
+        Plays a distilled policy file: cooperates with the stored probability
+        for the last `memory` rounds and the current reputation bucket.
+        """
+        policy = load_policy(path)
+        # Only the last `memory` rounds are ever looked at.
+        self.memory_depth = policy["memory"]
+        super().__init__(name)
+        self.path = path
+        self.memory = policy["memory"]
+        self.reputation_bucket = policy["reputation_bucket"]
+        self.payoffs = policy["payoffs"]
+        self.source = policy["source"]
+        # Plain lists are faster to index one element at a time than arrays.
+        self.probabilities = policy["probabilities"].tolist()
+        self.offsets = history_offsets(self.memory)
+        self.code_modulus = 4 ** self.memory
+        # State code of the last `memory` rounds, updated as rounds are added.
+        self.code = 0
+        self.rounds_seen = 0
+
+    def move(self) -> str:
+        rounds = len(self.my_history)
+        if rounds < self.rounds_seen:
+            self.code = self.rounds_seen = 0
+        # A memory-0 policy keeps no history and has a single state per bucket.
+        while self.memory and self.rounds_seen < rounds:
+            r = self.rounds_seen
+            pair = 2 * (self.my_history[r] == "D") + (self.opponent_history[r] == "D")
+            self.code = (self.code * 4 + pair) % self.code_modulus
+            self.rounds_seen += 1
+        state = self.offsets[min(rounds, self.memory)] + self.code
+        bucket = min(len(self.probabilities) - 1, int(round(self.reputation / self.reputation_bucket)))
+        return "C" if self.rng.random() < self.probabilities[bucket][state] else "D"
+
+    def reset(self):
+        super().reset()
+        self.code = self.rounds_seen = 0
@@ -0,0 +1,73 @@
+_CODES = {"C": 67, "D": 68}
+_MOVES = {67: "C", 68: "D"}
+
+class History:
+    """
+    Sequence of moves that only keeps the last `maxlen` of them.
+
+    Moves are stored as bytes in a ring buffer (or a growing bytearray when
+    maxlen is None) and running cooperate/defect counts cover the whole match,
+    so len(), count() and `in` are O(1) whatever the match length. Indexing uses
+    the same positions as a list of every move played; positions older than the
+    retained window raise IndexError.
+    """
+    __slots__ = ("maxlen", "cooperations", "defections", "_buf")
+
+    def __init__(self, maxlen=None, moves=()):
+        self.maxlen = maxlen
+        self.cooperations = 0
+        self.defections = 0
+        self._buf = bytearray(maxlen or 0)
+        for move in moves:
+            self.append(move)
+
+    def append(self, move: str):
+        n = self.cooperations + self.defections
+        if move == "C":
+            self.cooperations += 1
+        else:
+            self.defections += 1
+        if self.maxlen is None:
+            self._buf.append(_CODES[move])
+        elif self.maxlen:
+            self._buf[n % self.maxlen] = _CODES[move]
+
+    def retained(self) -> int:
+        """Number of most recent moves still available for indexing."""
+        n = len(self)
+        return n if self.maxlen is None else min(n, self.maxlen)
+
+    def _move_at(self, index: int) -> str:
+        n = len(self)
+        if index < 0:
+            index += n
+        if not n - self.retained() <= index < n:
+            raise IndexError("history index out of the retained window")
+        if self.maxlen is None:
+            return _MOVES[self._buf[index]]
+        return _MOVES[self._buf[index % self.maxlen]]
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self._move_at(i) for i in range(*index.indices(len(self)))]
+        return self._move_at(index)
+
+    def __len__(self) -> int:
+        return self.cooperations + self.defections
+
+    def __iter__(self):
+        n = len(self)
+        return (self._move_at(i) for i in range(n - self.retained(), n))
+
+    def __contains__(self, move) -> bool:
+        return self.count(move) > 0
+
+    def count(self, move) -> int:
+        if move == "C":
+            return self.cooperations
+        if move == "D":
+            return self.defections
+        return 0
+
+    def __repr__(self):
+        return f"History({''.join(self)!r}, total={len(self)}, maxlen={self.maxlen})"
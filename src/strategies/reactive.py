@@ -1,7 +1,9 @@
 from src.strategies.base import Strategy
-import random
+from src.strategies.table import build_table
 
 class TitForTatExtended(Strategy):
+    memory_depth = 1
+
     def __init__(self, forgiveness_chance=0.1):
         """
         TitForTat with forgiveness - usually copies opponent's last move,
@@ -14,12 +16,18 @@ class TitForTatExtended(Strategy):
         if not self.opponent_history:
             return "C"  # Start with cooperation
         
-        if self.opponent_history[-1] == "D" and random.random() < self.forgiveness_chance:
+        if self.opponent_history[-1] == "D" and self.rng.random() < self.forgiveness_chance:
             return "C"  # Forgive with some probability
         
         return self.opponent_history[-1]  # Otherwise copy opponent's last move
 
+    def cooperation_table(self):
+        return build_table(lambda prev, last, grudge: self.forgiveness_chance if last == "D" else 1.0)
+
 class Grudger(Strategy):
+    # Only needs the running defection count, not past moves.
+    memory_depth = 0
+
     def __init__(self):
         """
         Cooperates until the opponent defects, then always defects.
@@ -35,12 +43,17 @@ class Grudger(Strategy):
             self.has_defected = True
             
         return "D" if self.has_defected else "C"
+
+    def cooperation_table(self):
+        return build_table(lambda prev, last, grudge: 0.0 if grudge else 1.0)
     
     def reset(self):
         super().reset()
         self.has_defected = False
 
 class Joss(Strategy):
+    memory_depth = 1
+
     def __init__(self, defect_prob=0.1):
         """
         Like TitForTat but occasionally defects when it would normally cooperate.
@@ -56,12 +69,21 @@ class Joss(Strategy):
         move = self.opponent_history[-1]
         
         # Occasionally defect when we would normally cooperate
-        if move == "C" and random.random() < self.defect_prob:
+        if move == "C" and self.rng.random() < self.defect_prob:
             move = "D"
             
         return move
 
+    def cooperation_table(self):
+        def rule(prev, last, grudge):
+            if last is None:
+                return 1.0
+            return 0.0 if last == "D" else 1.0 - self.defect_prob
+        return build_table(rule)
+
 class TitForTwoTats(Strategy):
+    memory_depth = 2
+
     def __init__(self):
         """
         Defects only if the opponent has defected twice in a row.
@@ -77,11 +99,18 @@ class TitForTwoTats(Strategy):
         else:
             return "C"
 
+    def cooperation_table(self):
+        return build_table(lambda prev, last, grudge: 0.0 if prev == "D" and last == "D" else 1.0)
+
 class HumanStrategy(Strategy):
     """
     A strategy that allows a human to make decisions.
     Useful for interactive gameplay and testing.
     """
+    # Needs the terminal, so it always plays in the main process.
+    parallel_safe = False
+    cacheable = False
+
     def __init__(self):
         super().__init__("HumanPlayer")
         
@@ -0,0 +1,65 @@
+"""
+Lookup-table representation of strategies that only react to recent opponent moves.
+
+A table-driven strategy is fully described by the probability that it cooperates
+in each of a small number of states. The state is built from what the strategy has
+seen of its opponent: the last two moves (or fewer at the start of a match) and
+whether the opponent has ever defected. This covers the memory-one and memory-two
+classics and lets whole populations of them be played as array operations.
+"""
+import numpy as np
+
+# Opponent-history codes. Two-move codes are (previous, last).
+START, LAST_C, LAST_D, CC, CD, DC, DD = range(7)
+N_HISTORY = 7
+# States 7..13 repeat the history codes for an opponent that has defected before.
+N_STATES = 2 * N_HISTORY
+
+_HISTORY_MOVES = {
+    START: (None, None),
+    LAST_C: (None, "C"),
+    LAST_D: (None, "D"),
+    CC: ("C", "C"),
+    CD: ("C", "D"),
+    DC: ("D", "C"),
+    DD: ("D", "D"),
+}
+
+def _history_code(prev, last):
+    for code, moves in _HISTORY_MOVES.items():
+        if moves == (prev, last):
+            return code
+    raise ValueError(f"Invalid history ({prev}, {last})")
+
+def _build_transitions():
+    transitions = np.zeros((N_STATES, 2), dtype=np.int64)
+    for state in range(N_STATES):
+        prev, last = _HISTORY_MOVES[state % N_HISTORY]
+        for defected, opp_move in enumerate("CD"):
+            if last is None:
+                code = _history_code(None, opp_move)
+            else:
+                code = _history_code(last, opp_move)
+            grudge = state >= N_HISTORY or opp_move == "D"
+            transitions[state, defected] = code + (N_HISTORY if grudge else 0)
+    return transitions
+
+# NEXT_STATE[state, opponent_defected] -> state after seeing the opponent's move.
+NEXT_STATE = _build_transitions()
+
+def build_table(rule):
+    """
+    Build a cooperation table from a rule.
+
+    Args:
+        rule: Callable taking (previous, last, ever_defected) about the opponent,
+            where previous/last are "C", "D" or None, and returning P(cooperate).
+
+    Returns:
+        Tuple of N_STATES cooperation probabilities.
+    """
+    table = []
+    for state in range(N_STATES):
+        prev, last = _HISTORY_MOVES[state % N_HISTORY]
+        table.append(float(rule(prev, last, state >= N_HISTORY)))
+    return tuple(table)
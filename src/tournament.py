@@ -1,14 +1,36 @@
+import asyncio
 import random
-import copy
+import hashlib
+import logging
+import os
+import time
+import uuid
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from itertools import repeat
+import numpy as np
 import networkx as nx
 from src.config import TournamentConfig
-from src.logger import setup_logger
+from src.logger import log_event, setup_logger, setup_worker_logger
 from src.strategies.basic import AlwaysCooperate, AlwaysDefect, RandomStrategy
 from src.strategies.reactive import TitForTatExtended, Grudger, Joss, TitForTwoTats, HumanStrategy
-from src.agents.learning import QLearningAgent
+from src.agents.learning import QLearningAgent, load_q_tables, save_q_tables
 from src.agents.meta import MetaAgent
+from src.strategies.distilled import DistilledPolicy
+from src.agents.llm.base import LLMAgentBase
+from src.agents.llm.cache import DecisionCache
+from src.agents.llm.client import CLIENT_POOL, LLMCallError
+from src.agents.llm.telemetry import LLMBudget, TournamentTelemetry
 from src.agents.llm.remote import RemoteLLMAgent
 from src.agents.llm.local import LocalLLMAgent
+from src.batch import BatchMatchEngine, PAYOFF_KEYS
+from src.analytic import expected_match
+from src.metrics import CooperationMetrics
+from src.trace import TRACE_DTYPE, TraceWriter
+from src.results_store import ResultsStore
+from src.pair_cache import PairResultsCache, pair_key, strategy_fingerprint
+from src.scheduler import LLMMatchScheduler
 
 # Mapping strategy names to classes or factory functions
 STRATEGY_MAP = {
@@ -23,28 +45,57 @@ STRATEGY_MAP = {
     "QLearningAgent": QLearningAgent,
     "RemoteLLMAgent": RemoteLLMAgent,
     "LocalLLMAgent": LocalLLMAgent,
-    "MetaAgent": MetaAgent
+    "MetaAgent": MetaAgent,
+    "DistilledPolicy": DistilledPolicy
 }
 
+FLIP = {"C": "D", "D": "C"}
+
 class Match:
-    def __init__(self, player1, player2, config: TournamentConfig, logger):
+    def __init__(self, player1, player2, config: TournamentConfig, logger, seed=None, metrics=None, trace=False):
         self.p1 = player1
         self.p2 = player2
         self.config = config
         self.logger = logger
+        self.metrics = metrics
+        # When set, play() leaves the per-round records (TRACE_DTYPE) in trace_records.
+        self.trace = trace
+        self.trace_records = None
+        # Every match draws from its own generator so it can be replayed on its own.
+        self.seed = seed
+        self.rng = np.random.default_rng(seed)
         self.rounds = config.rounds
         if config.rounds_random:
-            self.rounds = random.randint(config.min_rounds, config.max_rounds)
+            self.rounds = int(self.rng.integers(config.min_rounds, config.max_rounds + 1))
         self.payoffs = config.payoff_matrix.dict()
         self.dynamic_payoffs = config.dynamic_payoffs
         self.noise = config.noise
         self.shock_frequency = config.shock_frequency
         self.shock_duration = config.shock_duration
 
-    def apply_noise(self, move: str, current_noise: float) -> str:
-        if random.random() < current_noise:
-            return "D" if move == "C" else "C"
-        return move
+    def sample_schedule(self):
+        """
+        Draw the whole match's noise and shock events up front in one draw.
+
+        Returns:
+            (flip1, flip2, shock_starts, shocked) boolean lists with one entry per
+            round: whether each player's move is flipped by noise, whether a shock
+            event starts in that round and whether the round is inside one.
+        """
+        u = self.rng.random((3, self.rounds))
+        shocked = np.zeros(self.rounds, dtype=bool)
+        shock_starts = np.zeros(self.rounds, dtype=bool)
+        if self.shock_duration > 0:
+            # A shock can only start once the previous one has run its course.
+            next_free = 0
+            for r in np.flatnonzero(u[0] < self.shock_frequency):
+                if r >= next_free:
+                    shocked[r:r + self.shock_duration] = True
+                    shock_starts[r] = True
+                    next_free = r + self.shock_duration
+        current_noise = np.where(shocked, self.noise * 2, self.noise)
+        return ((u[1] < current_noise).tolist(), (u[2] < current_noise).tolist(),
+                shock_starts.tolist(), shocked.tolist())
 
     def get_round_reward(self, move1: str, move2: str) -> int:
         key = move1 + move2
@@ -58,11 +109,14 @@ class Match:
             else:
                 self.payoffs["DC"] = 5
 
-    def play(self, global_coop_rate: float):
+    def begin(self, global_coop_rate: float):
+        """Prepare the players and the match's random schedule before the first round."""
         # Optionally update payoffs based on global cooperation.
         self.update_dynamic_payoffs(global_coop_rate)
         self.p1.reset()
         self.p2.reset()
+        self.p1.set_rng(random.Random(int(self.rng.integers(2**63))))
+        self.p2.set_rng(random.Random(int(self.rng.integers(2**63))))
         
         # Pass payoff matrix to LLM agents if they support it
         if hasattr(self.p1, 'payoff_matrix'):
@@ -70,60 +124,84 @@ class Match:
         if hasattr(self.p2, 'payoff_matrix'):
             self.p2.payoff_matrix = self.payoffs
         
-        p1_total = 0
-        p2_total = 0
+        self.p1_total = 0
+        self.p2_total = 0
 
-        shock_remaining = 0
-        for r in range(self.rounds):
-            # Possibly trigger a shock event.
-            if shock_remaining == 0 and random.random() < self.shock_frequency:
-                shock_remaining = self.shock_duration
-                self.logger.info("Shock event triggered! Noise is doubled for next rounds.")
-            current_noise = self.noise * 2 if shock_remaining > 0 else self.noise
-            if shock_remaining > 0:
-                shock_remaining -= 1
-
-            m1 = self.apply_noise(self.p1.move(), current_noise)
-            m2 = self.apply_noise(self.p2.move(), current_noise)
-            reward1 = self.get_round_reward(m1, m2)
-            reward2 = self.get_round_reward(m2, m1)
-            p1_total += reward1
-            p2_total += reward2
-
-            if hasattr(self.p1, "record"):
-                if isinstance(self.p1, QLearningAgent):
-                    self.p1.record(m1, m2, reward1)
-                else:
-                    self.p1.record(m1, m2)
-            if hasattr(self.p2, "record"):
-                if isinstance(self.p2, QLearningAgent):
-                    self.p2.record(m2, m1, reward2)
-                else:
-                    self.p2.record(m2, m1)
-
-            # Store rewards for LLM agents
-            if hasattr(self.p1, 'round_rewards'):
-                if not hasattr(self.p1, 'round_rewards'):
-                    self.p1.round_rewards = []
-                self.p1.round_rewards.append(reward1)
-                
-            if hasattr(self.p2, 'round_rewards'):
-                if not hasattr(self.p2, 'round_rewards'):
-                    self.p2.round_rewards = []
-                self.p2.round_rewards.append(reward2)
-                
-            # For reward_visibility="both" scenario
-            if hasattr(self.p1, 'opponent_rewards'):
-                if not hasattr(self.p1, 'opponent_rewards'):
-                    self.p1.opponent_rewards = []
-                self.p1.opponent_rewards.append(reward2)
-                
-            if hasattr(self.p2, 'opponent_rewards'):
-                if not hasattr(self.p2, 'opponent_rewards'):
-                    self.p2.opponent_rewards = []
-                self.p2.opponent_rewards.append(reward1)
+        self.names = (str(self.p1), str(self.p2))
+        self.trace_rows = [] if self.trace else None
+        # Per-round events are only built when DEBUG is on, and then only for a
+        # sample of rounds: every `log_stride`-th one, starting from a phase taken
+        # from the seed so short matches are not all sampled at round 1.
+        # play_round() only compares r with next_log_round.
+        sample_rate = self.config.logging.round_sample_rate
+        self.log_stride = max(1, round(1 / sample_rate)) if sample_rate > 0 else 0
+        if self.log_stride and self.logger.isEnabledFor(logging.DEBUG):
+            self.next_log_round = (self.seed or 0) % self.log_stride
+        else:
+            self.next_log_round = self.rounds
+        self.flip1, self.flip2, self.shock_starts, self.shocked = self.sample_schedule()
+
+    def play_round(self, r: int, intended1: str, intended2: str):
+        """Apply noise to the moves the players chose for round r and settle it."""
+        if self.shock_starts[r]:
+            log_event(self.logger, logging.INFO, "shock", round=r + 1, duration=self.shock_duration)
+
+        m1 = FLIP[intended1] if self.flip1[r] else intended1
+        m2 = FLIP[intended2] if self.flip2[r] else intended2
+        reward1 = self.get_round_reward(m1, m2)
+        reward2 = self.get_round_reward(m2, m1)
+        self.p1_total += reward1
+        self.p2_total += reward2
+        if self.trace_rows is not None:
+            self.trace_rows.append((0, r, intended1 == "D", intended2 == "D", m1 == "D", m2 == "D",
+                                    reward1, reward2, self.shocked[r]))
+        if self.metrics is not None:
+            self.metrics.record_round(self.names[0], self.names[1], m1, m2)
+
+        if hasattr(self.p1, "record"):
+            if isinstance(self.p1, QLearningAgent):
+                self.p1.record(m1, m2, reward1)
+            else:
+                self.p1.record(m1, m2)
+        if hasattr(self.p2, "record"):
+            if isinstance(self.p2, QLearningAgent):
+                self.p2.record(m2, m1, reward2)
+            else:
+                self.p2.record(m2, m1)
+
+        # Store rewards for LLM agents
+        if hasattr(self.p1, 'round_rewards'):
+            if not hasattr(self.p1, 'round_rewards'):
+                self.p1.round_rewards = []
+            self.p1.round_rewards.append(reward1)
+            
+        if hasattr(self.p2, 'round_rewards'):
+            if not hasattr(self.p2, 'round_rewards'):
+                self.p2.round_rewards = []
+            self.p2.round_rewards.append(reward2)
+            
+        # For reward_visibility="both" scenario
+        if hasattr(self.p1, 'opponent_rewards'):
+            if not hasattr(self.p1, 'opponent_rewards'):
+                self.p1.opponent_rewards = []
+            self.p1.opponent_rewards.append(reward2)
+            
+        if hasattr(self.p2, 'opponent_rewards'):
+            if not hasattr(self.p2, 'opponent_rewards'):
+                self.p2.opponent_rewards = []
+            self.p2.opponent_rewards.append(reward1)
+
+        if r == self.next_log_round:
+            self.next_log_round += self.log_stride
+            log_event(self.logger, logging.DEBUG, "round", round=r + 1, player1=self.names[0], move1=m1,
+                      player2=self.names[1], move2=m2, reward1=reward1, reward2=reward2)
 
-            self.logger.debug(f"Round {r+1}: {self.p1} played {m1}, {self.p2} played {m2}. Rewards: {reward1, reward2}")
+    def finish(self):
+        """Wrap up after the last round and return both players' totals."""
+        if self.trace_rows is not None:
+            self.trace_records = np.array(self.trace_rows, dtype=TRACE_DTYPE)
+        if self.metrics is not None:
+            self.metrics.commit_match(*self.names)
 
         # Update reputation after the match.
         if hasattr(self.p1, "update_reputation"):
@@ -131,19 +209,99 @@ class Match:
         if hasattr(self.p2, "update_reputation"):
             self.p2.update_reputation()
 
-        return p1_total, p2_total
+        return self.p1_total, self.p2_total
+
+    def play(self, global_coop_rate: float):
+        self.begin(global_coop_rate)
+        for r in range(self.rounds):
+            self.play_round(r, self.p1.move(), self.p2.move())
+        return self.finish()
+
+    async def play_async(self, global_coop_rate: float):
+        """Like play(), but both players choose each round's move concurrently."""
+        self.begin(global_coop_rate)
+        for r in range(self.rounds):
+            intended1, intended2 = await asyncio.gather(self.p1.move_async(), self.p2.move_async())
+            self.play_round(r, intended1, intended2)
+        return self.finish()
+
+def play_pairing(player1, player2, config: TournamentConfig, seed: int, global_coop_rate: float,
+                 metrics=None, trace=False):
+    """
+    Play one pairing on fresh copies of the players.
+
+    The match draws from its own generator seeded with the pairing's seed, so the
+    result does not depend on which process plays it or in what order.
+
+    Returns:
+        Dict with score1, score2, cooperations1, cooperations2 and rounds, plus
+        the round records under "trace" when `trace` is set. If an LLM call
+        fails for good the match is abandoned and the dict only has "error".
+    """
+    match = Match(player1.spawn(), player2.spawn(), config, logging.getLogger("TournamentLogger"),
+                  seed, metrics, trace)
+    try:
+        match.play(global_coop_rate)
+    except LLMCallError as e:
+        if metrics is not None:
+            # Leave the rounds played so far out of the tournament's cooperation counts.
+            metrics.discard_match(str(match.p1), str(match.p2))
+        return {"error": str(e)}
+    return match_result(match)
+
+async def play_pairing_async(player1, player2, config: TournamentConfig, seed: int, global_coop_rate: float,
+                             trace=False):
+    """Like play_pairing(), with both players choosing their moves concurrently."""
+    match = Match(player1.spawn(), player2.spawn(), config, logging.getLogger("TournamentLogger"),
+                  seed, trace=trace)
+    try:
+        await match.play_async(global_coop_rate)
+    except LLMCallError as e:
+        return {"error": str(e)}
+    return match_result(match)
+
+def match_result(match):
+    """Result dict of a match that has been played."""
+    result = {
+        "score1": match.p1_total,
+        "score2": match.p2_total,
+        "cooperations1": match.p1.my_history.count("C"),
+        "cooperations2": match.p2.my_history.count("C"),
+        "rounds": match.rounds,
+    }
+    for seat, player in (("1", match.p1), ("2", match.p2)):
+        if isinstance(player, LLMAgentBase):
+            result["llm_stats" + seat] = player.call_stats
+        elif isinstance(player, QLearningAgent):
+            result["q_values" + seat] = player.q_values
+    if match.trace:
+        result["trace"] = match.trace_records
+    return result
 
 class Tournament:
     def __init__(self, config: TournamentConfig):
         self.config = config
-        self.logger = setup_logger(config.logging.log_file, config.logging.verbose)
+        self.logger = setup_logger(config.logging.log_file, config.logging.verbose, config.logging.queue)
+        self.seed = config.seed if config.seed is not None else random.randrange(2**32)
+        self.run_id = uuid.uuid4().hex
+        self.logger.info(f"Tournament run {self.run_id}, seed: {self.seed}")
+        CLIENT_POOL.configure(**config.llm_client.dict())
         self.players = self.create_players()
+        self.load_learner_state()
+        self.decision_cache = self.create_decision_cache()
         if config.network.enabled:
             self.graph = self.build_network(len(self.players), config.network)
         else:
             self.graph = None
         self.scores = {str(player): 0 for player in self.players}
         self.match_results = []
+        self.failed_matches = []
+        telemetry = config.llm_telemetry
+        self.llm_telemetry = TournamentTelemetry(telemetry.prompt_cost_per_1k, telemetry.completion_cost_per_1k)
+        self.budget = self.create_budget()
+        self.metrics = CooperationMetrics(config.metrics_window)
+        self.elapsed = 0.0
+        self.pair_cache = self.create_pair_cache()
 
     def create_players(self):
         players = []
@@ -166,17 +324,138 @@ class Tournament:
             elif strat_name == "MetaAgent":
                 params = self.config.meta_agent.dict()
                 player = STRATEGY_MAP[strat_name](**params)
+            elif strat_name == "DistilledPolicy":
+                params = self.config.distilled_policy.dict()
+                player = STRATEGY_MAP[strat_name](**params)
+                if player.payoffs != self.config.payoff_matrix.dict():
+                    self.logger.warning(f"{params['path']} was distilled under payoffs {player.payoffs}, "
+                                        f"not the configured {self.config.payoff_matrix.dict()}.")
             else:
                 player = STRATEGY_MAP[strat_name]()
             
             players.append(player)
         return players
 
+    def learners(self):
+        return [player for player in self.players if isinstance(player, QLearningAgent)]
+
+    def load_learner_state(self):
+        """Warm-start the Q-learning agents, in order, from the configured checkpoint."""
+        params = self.config.learner_state
+        if params.save_path and not params.carry_over:
+            self.logger.warning("learner_state.save_path is set without carry_over; the checkpoint will hold "
+                                "the starting Q-values, not what was learned in the matches.")
+        learners = self.learners()
+        if not params.load_path or not learners:
+            return
+        if not os.path.exists(params.load_path):
+            self.logger.info(f"No Q-learning checkpoint at {params.load_path}; starting from scratch.")
+            return
+        checkpoint = load_q_tables(params.load_path)
+        tables = checkpoint["q_values"]
+        if len(tables) < len(learners):
+            self.logger.warning(f"Checkpoint {params.load_path} has {len(tables)} Q-tables for "
+                                f"{len(learners)} Q-learning agents; the rest start from scratch.")
+        for player, q_values, matches in zip(learners, tables, checkpoint["matches_trained"]):
+            player.q_values = q_values.copy()
+            player.matches_trained = int(matches)
+        self.logger.info(f"Loaded {min(len(tables), len(learners))} Q-tables from {params.load_path}")
+
+    def save_learner_state(self):
+        learners = self.learners()
+        path = self.config.learner_state.save_path
+        if not path or not learners:
+            return
+        save_q_tables(path, [player.q_values for player in learners],
+                      [player.matches_trained for player in learners], [str(player) for player in learners])
+        self.logger.info(f"Q-tables of {len(learners)} agents saved to {path} "
+                         f"({', '.join(str(player.matches_trained) for player in learners)} matches trained)")
+
+    def carries_learner_state(self, i, j) -> bool:
+        """Whether the pairing must be played in order so learning carries over to later matches."""
+        return self.config.learner_state.carry_over and (
+            isinstance(self.players[i], QLearningAgent) or isinstance(self.players[j], QLearningAgent))
+
+    def create_decision_cache(self):
+        params = self.config.llm_cache
+        if not params.enabled:
+            return None
+        cache = DecisionCache(params.max_entries, params.path, params.history_window,
+                              params.reputation_bucket, params.min_samples, params.deterministic_temperature)
+        if cache.entries:
+            self.logger.info(f"Loaded {len(cache.entries)} cached LLM decisions from {params.path}")
+        for player in self.players:
+            if isinstance(player, LLMAgentBase):
+                player.decision_cache = cache
+        return cache
+
+    def create_pair_cache(self):
+        params = self.config.pair_cache
+        if not params.enabled:
+            return None
+        if self.config.dynamic_payoffs or self.config.trace.enabled:
+            # Dynamic payoffs depend on the order of play, and cached results have no round records.
+            self.logger.warning("The pairwise results cache is not used with dynamic_payoffs or trace.")
+            return None
+        cache = PairResultsCache(params.path, params.max_entries)
+        self.fingerprints = [strategy_fingerprint(player) for player in self.players]
+        self.logger.info(f"Pairwise results cache {params.path} holds {len(cache)} results.")
+        return cache
+
+    def pair_cache_key(self, i, j, seed):
+        """Cache key of a pairing, or None if its result must not be reused."""
+        p1, p2 = self.players[i], self.players[j]
+        if not (p1.cacheable and p2.cacheable) or self.carries_learner_state(i, j):
+            return None
+        # The batch and analytic engines only take table-driven pairings; the rest are played as scalar matches.
+        # A batch row draws from its own match's generator, so its result depends only on the seed as well.
+        engine = "scalar"
+        if self.config.engine != "scalar" and BatchMatchEngine.supports(p1) and BatchMatchEngine.supports(p2):
+            engine = self.config.engine
+        # Analytic results are expectations and do not depend on the seed.
+        return pair_key(self.fingerprints[i], self.fingerprints[j], self.config, engine,
+                        None if engine == "analytic" else seed)
+
+    def cached_results(self, pairs, seeds):
+        """
+        Look every pairing up in the pairwise results cache.
+
+        Returns:
+            Dict mapping the index of each cached pairing to its result dict, and
+            dict mapping the index of every other cacheable pairing to its key.
+        """
+        results, keys = {}, {}
+        if self.pair_cache is None:
+            return results, keys
+        for k, (i, j) in enumerate(pairs):
+            key = self.pair_cache_key(i, j, seeds[k])
+            if key is None:
+                continue
+            result = self.pair_cache.get(key)
+            if result is None:
+                keys[k] = key
+            else:
+                results[k] = result
+        if results:
+            self.logger.info(f"Reusing {len(results)} of {len(pairs)} match results from the pairwise cache.")
+        return results, keys
+
+    def create_budget(self):
+        params = self.config.llm_telemetry
+        if params.max_tokens is None and params.max_calls is None and params.max_cost is None:
+            return None
+        budget = LLMBudget(params.max_tokens, params.max_calls, params.max_cost,
+                           params.prompt_cost_per_1k, params.completion_cost_per_1k)
+        for player in self.players:
+            if isinstance(player, LLMAgentBase):
+                player.budget = budget
+        return budget
+
     def build_network(self, n: int, net_params) -> 'nx.Graph':
         if net_params.type == "random":
-            G = nx.erdos_renyi_graph(n, net_params.connectivity)
+            G = nx.erdos_renyi_graph(n, net_params.connectivity, seed=self.seed)
         elif net_params.type == "scale_free":
-            G = nx.scale_free_graph(n)
+            G = nx.scale_free_graph(n, seed=self.seed)
             G = nx.Graph(G)  # convert to simple graph
         else:
             G = nx.complete_graph(n)
@@ -188,57 +467,277 @@ class Tournament:
         return G
 
     def global_cooperation_rate(self) -> float:
-        # Calculate cooperation rate across all players (from last match).
-        total = 0
-        moves = 0
-        for player in self.players:
-            total += player.my_history.count("C")
-            moves += len(player.my_history)
-        return total / moves if moves > 0 else 1.0
+        """Cooperation rate over the most recent metrics_window moves of the tournament."""
+        return self.metrics.window_rate()
+
+    def pairings(self):
+        """Return the (i, j) player index pairs that meet in this tournament."""
+        if self.graph:
+            # For network structure, let each player play with its neighbors.
+            return [(i, j) for i in self.graph.nodes() for j in self.graph.neighbors(i) if i < j]
+        # Full round-robin tournament.
+        n = len(self.players)
+        return [(i, j) for i in range(n) for j in range(i+1, n)]
+
+    def pairing_seeds(self, pairs):
+        """
+        Derive a seed for every pairing from the tournament seed and the names of
+        the two players, so a pairing gets the same seed however the work is split.
+        """
+        seen = Counter()
+        seeds = []
+        for i, j in pairs:
+            key = f"{self.players[i]}:{self.players[j]}"
+            seen[key] += 1
+            digest = hashlib.sha256(f"{self.seed}:{key}:{seen[key]}".encode()).digest()
+            seeds.append(int.from_bytes(digest[:8], "little"))
+        return seeds
+
+    def play_batched(self, pairs, seeds, indices, global_coop_rate):
+        """
+        Play the given pairings that are between table-driven players with the batch engine.
+
+        Returns:
+            Dict mapping the index of each batched pairing to its result dict.
+        """
+        indices = [k for k in indices
+                   if BatchMatchEngine.supports(self.players[pairs[k][0]])
+                   and BatchMatchEngine.supports(self.players[pairs[k][1]])]
+        if not indices:
+            return {}
+        matches = [Match(self.players[pairs[k][0]], self.players[pairs[k][1]], self.config, self.logger, seeds[k])
+                   for k in indices]
+        self.logger.info(f"Playing {len(matches)} table-driven matches with the batch engine.")
+        results = BatchMatchEngine().play(matches, global_coop_rate, self.config.trace.enabled)
+        return dict(zip(indices, results))
+
+    def play_analytic(self, pairs, indices, global_coop_rate):
+        """
+        Compute exact expected results for the given pairings that are between
+        table-driven players instead of simulating them (see src.analytic).
+
+        Returns:
+            Dict mapping the index of each solved pairing to its result dict.
+        """
+        indices = [k for k in indices
+                   if BatchMatchEngine.supports(self.players[pairs[k][0]])
+                   and BatchMatchEngine.supports(self.players[pairs[k][1]])]
+        if not indices:
+            return {}
+        self.logger.info(f"Solving {len(indices)} table-driven matches analytically.")
+        config = self.config
+        results = {}
+        for k in indices:
+            match = Match(self.players[pairs[k][0]], self.players[pairs[k][1]], config, self.logger)
+            match.update_dynamic_payoffs(global_coop_rate)
+            results[k] = expected_match(
+                match.p1.cooperation_table(), match.p2.cooperation_table(),
+                [match.payoffs.get(key, 0) for key in PAYOFF_KEYS],
+                config.noise, config.shock_frequency, config.shock_duration,
+                rounds=None if config.rounds_random else config.rounds,
+                min_rounds=config.min_rounds, max_rounds=config.max_rounds,
+            )
+        return results
+
+    def play_llm_matches(self, pairs, seeds, indices, global_coop_rate):
+        """
+        Play the given pairings that involve an LLM agent with the asyncio scheduler.
+
+        Returns:
+            Dict mapping the index of each pairing played to its result dict.
+        """
+        params = self.config.llm_scheduler
+        scheduler = LLMMatchScheduler(params.max_concurrency, params.max_batch,
+                                      params.batch_wait_ms / 1000, self.logger)
+        indices = [k for k in indices
+                   if scheduler.involves_llm(*(self.players[p] for p in pairs[k]))
+                   and not self.carries_learner_state(*pairs[k])]
+        if not indices:
+            return {}
+        jobs = [partial(play_pairing_async, self.players[pairs[k][0]], self.players[pairs[k][1]],
+                        self.config, seeds[k], global_coop_rate, self.config.trace.enabled)
+                for k in indices]
+        scheduler.attach(self.players)
+        try:
+            results = scheduler.run(jobs)
+        finally:
+            scheduler.detach(self.players)
+        return dict(zip(indices, results))
+
+    def create_executor(self):
+        self.workers = self.config.parallel.workers or os.cpu_count()
+        self.logger.info(f"Playing matches across {self.workers} worker processes.")
+        return ProcessPoolExecutor(max_workers=self.workers, initializer=setup_worker_logger,
+                                   initargs=(self.config.logging.log_file, self.config.logging.verbose))
+
+    def play_parallel(self, pairs, seeds, indices, global_coop_rate, executor):
+        """
+        Play the given pairings across the process pool `executor`.
+
+        Returns:
+            Dict mapping the index of each pairing played to its result dict.
+        """
+        indices = [k for k in indices
+                   if self.players[pairs[k][0]].parallel_safe and self.players[pairs[k][1]].parallel_safe
+                   and not self.carries_learner_state(*pairs[k])]
+        if self.budget is not None or self.decision_cache is not None:
+            # Workers would spend copies of the budget and fill copies of the
+            # decision cache, so LLM matches stay in this process.
+            indices = [k for k in indices if not LLMMatchScheduler.involves_llm(*(self.players[p] for p in pairs[k]))]
+        if not indices:
+            return {}
+        results = executor.map(
+            play_pairing,
+            [self.players[pairs[k][0]] for k in indices],
+            [self.players[pairs[k][1]] for k in indices],
+            repeat(self.config),
+            [seeds[k] for k in indices],
+            repeat(global_coop_rate),
+            repeat(None),
+            repeat(self.config.trace.enabled),
+            chunksize=max(1, len(indices) // (self.workers * 4)),
+        )
+        return dict(zip(indices, results))
+
+    def play_wave(self, pairs, seeds, indices, global_coop_rate, cached, executor):
+        """
+        Results of the pairings in `indices` that are cached or played outside
+        the serial loop (batch or analytic engine, LLM scheduler, process pool).
+
+        Returns:
+            Dict mapping the index of each of those pairings to its result dict.
+        """
+        results = {k: cached[k] for k in indices if k in cached}
+        if self.config.engine == "batch":
+            results.update(self.play_batched(pairs, seeds, [k for k in indices if k not in results],
+                                             global_coop_rate))
+        elif self.config.engine == "analytic":
+            results.update(self.play_analytic(pairs, [k for k in indices if k not in results], global_coop_rate))
+        if self.config.llm_scheduler.enabled:
+            results.update(self.play_llm_matches(pairs, seeds, [k for k in indices if k not in results],
+                                                 global_coop_rate))
+        if executor is not None:
+            results.update(self.play_parallel(pairs, seeds, [k for k in indices if k not in results],
+                                              global_coop_rate, executor))
+        return results
+
+    def settle_match(self, i, j, result, cache_key, tracer):
+        """Add a played (or cached) pairing's result to the scores, metrics, trace and telemetry."""
+        if "error" in result:
+            exhausted = self.budget is not None and self.budget.exhausted()
+            self.logger.log(logging.WARNING if exhausted else logging.ERROR,
+                            f"Match {self.players[i]} vs {self.players[j]} abandoned: {result['error']}")
+            self.failed_matches.append({"player1": str(self.players[i]), "player2": str(self.players[j]),
+                                        "error": result["error"]})
+            return
+        if cache_key is not None:
+            self.pair_cache.put(cache_key, result)
+        self.metrics.end_match()
+        if result.get("trace") is not None:
+            tracer.write_match(str(self.players[i]), str(self.players[j]), result.pop("trace"))
+        for seat, player, opponent in (("1", self.players[i], self.players[j]),
+                                       ("2", self.players[j], self.players[i])):
+            q_values = result.pop("q_values" + seat, None)
+            if q_values is not None and self.config.learner_state.carry_over:
+                player.q_values = q_values
+                player.matches_trained += 1
+            stats = result.pop("llm_stats" + seat, None)
+            if stats is not None:
+                self.llm_telemetry.add_match(len(self.match_results), str(player), str(opponent), stats)
+                log_event(self.logger, logging.DEBUG, "llm_usage", player=player, opponent=opponent,
+                          calls=stats.calls, cache_hits=stats.cache_hits, planned_moves=stats.planned_moves,
+                          replans=stats.replans, prompt_tokens=stats.prompt_tokens,
+                          completion_tokens=stats.completion_tokens, retries=stats.retries)
+        score1, score2 = result["score1"], result["score2"]
+        log_event(self.logger, logging.INFO, "result", player1=self.players[i], score1=score1,
+                  player2=self.players[j], score2=score2)
+        self.scores[str(self.players[i])] += score1
+        self.scores[str(self.players[j])] += score2
+        self.match_results.append({
+            "player1": str(self.players[i]),
+            "player2": str(self.players[j]),
+            "score1": score1,
+            "score2": score2
+        })
 
     def run(self):
         n = len(self.players)
         self.logger.info(f"Starting tournament with {n} players.")
-        if self.graph:
-            # For network structure, let each player play with its neighbors.
-            for i in self.graph.nodes():
-                for j in self.graph.neighbors(i):
-                    if i < j:
-                        self.logger.info(f"Network match: {self.players[i]} vs {self.players[j]}")
-                        p1 = copy.deepcopy(self.players[i])
-                        p2 = copy.deepcopy(self.players[j])
-                        match = Match(p1, p2, self.config, self.logger)
-                        gcoop = self.global_cooperation_rate()
-                        score1, score2 = match.play(gcoop)
-                        self.logger.info(f"Result: {p1} scored {score1}, {p2} scored {score2}")
-                        self.scores[str(self.players[i])] += score1
-                        self.scores[str(self.players[j])] += score2
-                        self.match_results.append({
-                            "player1": str(self.players[i]),
-                            "player2": str(self.players[j]),
-                            "score1": score1,
-                            "score2": score2
-                        })
-        else:
-            # Full round-robin tournament.
-            for i in range(n):
-                for j in range(i+1, n):
-                    self.logger.info(f"Match: {self.players[i]} vs {self.players[j]}")
-                    p1 = copy.deepcopy(self.players[i])
-                    p2 = copy.deepcopy(self.players[j])
-                    match = Match(p1, p2, self.config, self.logger)
-                    gcoop = self.global_cooperation_rate()
-                    score1, score2 = match.play(gcoop)
-                    self.logger.info(f"Result: {p1} scored {score1}, {p2} scored {score2}")
-                    self.scores[str(self.players[i])] += score1
-                    self.scores[str(self.players[j])] += score2
-                    self.match_results.append({
-                        "player1": str(self.players[i]),
-                        "player2": str(self.players[j]),
-                        "score1": score1,
-                        "score2": score2
-                    })
+        start = time.perf_counter()
+        label = "network_match" if self.graph else "match"
+        tracer = TraceWriter(self.config.trace.path) if self.config.trace.enabled else None
+        if tracer and self.config.engine == "analytic":
+            self.logger.warning("Analytically solved matches have no rounds and are left out of the trace.")
+        pairs = self.pairings()
+        seeds = self.pairing_seeds(pairs)
+        cached, cache_keys = self.cached_results(pairs, seeds)
+        # With dynamic payoffs, matches are played in waves of payoff_update_interval
+        # pairings. Every match in a wave sees the cooperation rate taken before
+        # the wave, however it is played, so serial, parallel, batch and scheduler
+        # runs give the same results.
+        interval = max(1, self.config.payoff_update_interval) if self.config.dynamic_payoffs else max(1, len(pairs))
+        executor = self.create_executor() if self.config.parallel.enabled else None
+        try:
+            for wave_start in range(0, len(pairs), interval):
+                wave = range(wave_start, min(wave_start + interval, len(pairs)))
+                gcoop = self.global_cooperation_rate()
+                results = self.play_wave(pairs, seeds, wave, gcoop, cached, executor)
+                for k in wave:
+                    i, j = pairs[k]
+                    log_event(self.logger, logging.DEBUG, label, player1=self.players[i], player2=self.players[j])
+                    if k in results:
+                        result = results[k]
+                        if "error" not in result:
+                            self.metrics.record_counts(str(self.players[i]), str(self.players[j]),
+                                                       result["cooperations1"], result["cooperations2"],
+                                                       result["rounds"])
+                    elif self.budget is not None and self.budget.exhausted() and \
+                            LLMMatchScheduler.involves_llm(self.players[i], self.players[j]):
+                        result = {"error": "LLM budget exhausted before the match started"}
+                    else:
+                        result = play_pairing(self.players[i], self.players[j], self.config,
+                                              seeds[k], gcoop, self.metrics, tracer is not None)
+                    self.settle_match(i, j, result, cache_keys.get(k), tracer)
+        finally:
+            if executor is not None:
+                executor.shutdown()
+        self.elapsed = time.perf_counter() - start
+        if tracer:
+            tracer.close()
+            self.logger.info(f"Round trace written to {tracer.records_file}")
+        if self.decision_cache:
+            cache = self.decision_cache
+            self.logger.info(f"LLM decision cache: {cache.hits} hits, {cache.misses} misses "
+                             f"({cache.hit_rate():.1%} hit rate), {len(cache.entries)} states.")
+            if cache.path:
+                cache.save()
+        self.save_learner_state()
+        if self.pair_cache:
+            cache = self.pair_cache
+            evicted = cache.flush()
+            self.logger.info(f"Pairwise results cache: {cache.hits} hits, {cache.misses} misses "
+                             f"({cache.hit_rate():.1%} hit rate), {len(cache)} results"
+                             + (f", {evicted} evicted." if evicted else "."))
 
+        self.logger.info(f"Played {len(pairs)} matches in {self.elapsed:.2f}s.")
+        if self.failed_matches:
+            self.logger.warning(f"{len(self.failed_matches)} matches were abandoned after LLM call failures "
+                                f"and are left out of the scores.")
+        for agent, summary in self.llm_telemetry.summary()["agents"].items():
+            latency = summary["latency_ms"]
+            self.logger.info(f"{agent}: {summary['calls']} LLM calls, {summary['cache_hits']} cache hits, "
+                             f"{summary['planned_moves']} planned moves ({summary['replans']} replans), "
+                             f"{summary['prompt_tokens']} prompt + {summary['completion_tokens']} completion tokens, "
+                             f"{summary['retries']} retries, est. cost {summary['estimated_cost']:.4f}; "
+                             f"latency p50 {latency['p50']:.0f} ms, p95 {latency['p95']:.0f} ms, "
+                             f"p99 {latency['p99']:.0f} ms")
+        if self.budget is not None and self.budget.exhausted():
+            self.logger.warning(f"LLM budget reached: {self.budget.calls} calls, {self.budget.tokens} tokens, "
+                                f"cost {self.budget.cost:.4f}.")
+        for provider, stats in CLIENT_POOL.latency_summary().items():
+            self.logger.info(f"{provider} LLM calls: {stats['calls']} ok, {stats['retries']} retries, "
+                             f"{stats['errors']} errors; latency mean {stats['mean_ms']:.0f} ms, "
+                             f"p50 {stats['p50_ms']:.0f} ms, p95 {stats['p95_ms']:.0f} ms")
         self.logger.info("Tournament finished. Leaderboard:")
         sorted_scores = sorted(self.scores.items(), key=lambda x: x[1], reverse=True)
         for rank, (player, score) in enumerate(sorted_scores, start=1):
@@ -253,3 +752,14 @@ class Tournament:
             for row in self.match_results:
                 writer.writerow(row)
         self.logger.info(f"Results saved to {filename}")
+        if self.config.llm_telemetry.write_summary and self.llm_telemetry.by_agent:
+            telemetry_file = f"{os.path.splitext(filename)[0]}_llm_telemetry.json"
+            self.llm_telemetry.write(telemetry_file)
+            self.logger.info(f"LLM telemetry saved to {telemetry_file}")
+        if self.config.results_store.enabled:
+            store = ResultsStore(self.config.results_store.path)
+            try:
+                store.record_run(self.config, self.match_results, self.run_id, self.seed)
+            finally:
+                store.close()
+            self.logger.info(f"Run {self.run_id} added to {self.config.results_store.path}")
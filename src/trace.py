@@ -0,0 +1,112 @@
+"""
+Binary per-round trace of a tournament.
+
+Rounds are stored as fixed-width records in `<path>.trace`, a raw file that is
+written through a growing memory map and can be read back with
+np.memmap(path, dtype=TRACE_DTYPE). `<path>.index.npy` lists every match with
+its players and the slice of records it occupies. Moves are stored as 0 for
+cooperate and 1 for defect.
+"""
+import os
+import numpy as np
+
+TRACE_DTYPE = np.dtype([
+    ("match", "<u4"),
+    ("round", "<u4"),
+    ("intended1", "u1"),  # move chosen by player 1 before noise
+    ("intended2", "u1"),
+    ("move1", "u1"),      # move actually played after noise
+    ("move2", "u1"),
+    ("reward1", "<i2"),
+    ("reward2", "<i2"),
+    ("shock", "u1"),      # 1 if the round was inside a shock event
+])
+
+INDEX_DTYPE = np.dtype([
+    ("match", "<u4"),
+    ("player1", "U64"),
+    ("player2", "U64"),
+    ("offset", "<u8"),
+    ("length", "<u8"),
+])
+
+def trace_files(path: str):
+    """Return the (records, index) file names for a trace base path."""
+    return f"{path}.trace", f"{path}.index.npy"
+
+class TraceWriter:
+    """Appends per-match round records to a memory-mapped trace file."""
+    def __init__(self, path: str, capacity: int = 1 << 16):
+        self.records_file, self.index_file = trace_files(path)
+        directory = os.path.dirname(self.records_file)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.size = 0
+        self.index = []
+        self._file = open(self.records_file, "w+b")
+        self._map = None
+        self._resize(capacity)
+
+    def _resize(self, capacity: int):
+        if self._map is not None:
+            self._map.flush()
+            self._map = None
+        self._file.truncate(capacity * TRACE_DTYPE.itemsize)
+        self.capacity = capacity
+        self._map = np.memmap(self._file, dtype=TRACE_DTYPE, mode="r+", shape=(capacity,))
+
+    def write_match(self, player1: str, player2: str, records) -> int:
+        """
+        Append one match's records (an array of TRACE_DTYPE) and return its id.
+        """
+        match_id = len(self.index)
+        n = len(records)
+        if self.size + n > self.capacity:
+            self._resize(max(2 * self.capacity, self.size + n))
+        view = self._map[self.size:self.size + n]
+        view[:] = records
+        view["match"] = match_id
+        self.index.append((match_id, player1, player2, self.size, n))
+        self.size += n
+        return match_id
+
+    def close(self):
+        """Trim the trace to the records written and save the match index."""
+        if self._map is None:
+            return
+        self._map.flush()
+        self._map = None
+        self._file.truncate(self.size * TRACE_DTYPE.itemsize)
+        self._file.close()
+        np.save(self.index_file, np.array(self.index, dtype=INDEX_DTYPE))
+
+class TraceReader:
+    """Zero-copy access to a trace written by TraceWriter."""
+    def __init__(self, path: str):
+        records_file, index_file = trace_files(path)
+        if os.path.getsize(records_file) == 0:
+            self.records = np.empty(0, dtype=TRACE_DTYPE)
+        else:
+            self.records = np.memmap(records_file, dtype=TRACE_DTYPE, mode="r")
+        self.index = np.load(index_file)
+
+    def __len__(self):
+        return len(self.index)
+
+    def match(self, match_id: int, start: int = 0, stop=None):
+        """Records of one match, optionally limited to rounds [start, stop)."""
+        entry = self.index[match_id]
+        length = int(entry["length"])
+        stop = length if stop is None else min(stop, length)
+        offset = int(entry["offset"])
+        return self.records[offset + start:offset + stop]
+
+    def pairing(self, player1: str, player2: str, start: int = 0, stop=None):
+        """
+        Records of every match between two players (in either seat), as a list
+        with one view per match.
+        """
+        index = self.index
+        mask = ((index["player1"] == player1) & (index["player2"] == player2)) | \
+               ((index["player1"] == player2) & (index["player2"] == player1))
+        return [self.match(int(match_id), start, stop) for match_id in index["match"][mask]]
@@ -0,0 +1,212 @@
+"""
+Batched self-play training for Q-learning agents.
+
+SelfPlayEnv is a gym-style vector environment: every row is one game between
+a learner and an opponent drawn from a pool of table-driven strategies, played
+under the same rules as Match (payoff matrix, noise, shocks, dynamic payoffs,
+fixed or random match length). Each step plays one round of every game as
+array operations, and finished games restart against a new opponent.
+
+Usage:
+    python -m src.training --learners 4096 --steps 5000 --out qlearning.npz -- noise=0.05
+
+The checkpoint holds the best learners' Q-tables and warm-starts tournament
+agents via learner_state.load_path.
+"""
+import argparse
+import logging
+import time
+import numpy as np
+from src.agents.learning import QLearningPopulation, save_q_tables
+from src.batch import PAYOFF_KEYS
+from src.metrics import CooperationMetrics
+from src.strategies.table import NEXT_STATE as TABLE_NEXT_STATE
+
+class SelfPlayEnv:
+    """
+    `size` learner-vs-opponent games stepped together.
+
+    Moves are 0 (C) and 1 (D). step() takes the learners' intended moves and
+    returns the moves as played (after noise) on both sides, the learners'
+    rewards and which games just ended; ended games are restarted before
+    step() returns, so their learners should start a new match too.
+    """
+    def __init__(self, config, opponents, size, seed=None):
+        from src.tournament import Match  # Imported here: src.tournament imports the agents.
+        self.config = config
+        self.size = size
+        self.rng = np.random.default_rng(seed)
+        self.opponent_names = [str(opponent) for opponent in opponents]
+        self.tables = np.array([opponent.cooperation_table() for opponent in opponents])
+        # A Match without players applies the payoff rules (including dynamic payoffs) for new games.
+        self.rules = Match(None, None, config, logging.getLogger("TournamentLogger"))
+        self.base_payoffs = config.payoff_matrix.dict()
+        self.metrics = CooperationMetrics(config.metrics_window)
+        self.rows = np.arange(size)
+        self.opponents = np.zeros(size, dtype=np.int64)
+        self.opponent_states = np.zeros(size, dtype=np.int64)
+        self.payoffs = np.zeros((size, 4), dtype=np.int64)
+        self.rounds_left = np.zeros(size, dtype=np.int64)
+        self.rounds = np.zeros(size, dtype=np.int64)
+        self.shock_remaining = np.zeros(size, dtype=np.int64)
+        self.cooperations = np.zeros((size, 2), dtype=np.int64)
+        self.games = 0
+
+    def reset(self):
+        """Start a new game in every row; returns the opponent index per row."""
+        self.start(self.rows)
+        return self.opponents
+
+    def start(self, rows):
+        self.rules.payoffs = dict(self.base_payoffs)
+        self.rules.update_dynamic_payoffs(self.metrics.window_rate())
+        self.payoffs[rows] = [self.rules.payoffs.get(key, 0) for key in PAYOFF_KEYS]
+        self.opponents[rows] = self.rng.integers(0, len(self.tables), len(rows))
+        self.opponent_states[rows] = 0
+        self.shock_remaining[rows] = 0
+        self.cooperations[rows] = 0
+        config = self.config
+        if config.rounds_random:
+            self.rounds[rows] = self.rng.integers(config.min_rounds, config.max_rounds + 1, len(rows))
+        else:
+            self.rounds[rows] = config.rounds
+        self.rounds_left[rows] = self.rounds[rows]
+
+    def step(self, actions):
+        config = self.config
+        rows = self.rows
+        u = self.rng.random((4, self.size))
+        triggered = (self.shock_remaining == 0) & (u[0] < config.shock_frequency)
+        self.shock_remaining[triggered] = config.shock_duration
+        shocked = self.shock_remaining > 0
+        noise = np.where(shocked, config.noise * 2, config.noise)
+        self.shock_remaining -= shocked
+
+        intended = u[1] >= self.tables[self.opponents, self.opponent_states]
+        defect = (np.asarray(actions) == 1) ^ (u[2] < noise)
+        opponent_defect = intended ^ (u[3] < noise)
+        moves = defect.astype(np.int64)
+        opponent_moves = opponent_defect.astype(np.int64)
+        rewards = self.payoffs[rows, 2 * moves + opponent_moves]
+        self.opponent_states = TABLE_NEXT_STATE[self.opponent_states, moves]
+        self.cooperations[:, 0] += 1 - moves
+        self.cooperations[:, 1] += 1 - opponent_moves
+
+        self.rounds_left -= 1
+        done = self.rounds_left == 0
+        ended = np.flatnonzero(done)
+        if len(ended):
+            for k in ended:
+                self.metrics.record_counts("QLearningAgent", self.opponent_names[self.opponents[k]],
+                                           int(self.cooperations[k, 0]), int(self.cooperations[k, 1]),
+                                           int(self.rounds[k]))
+            self.games += len(ended)
+            self.start(ended)
+        return moves, opponent_moves, rewards, done
+
+def train(population, env, steps, rng, log_every=500):
+    """
+    Train `population` (one learner per env row) for `steps` rounds.
+
+    Returns:
+        Learning curve: one dict per `log_every` steps with the mean reward per
+        round, the learners' cooperation rate, the mean reward against each
+        opponent, games finished so far and learner-steps per second.
+    """
+    population.reset()
+    opponents = env.reset()
+    n_opponents = len(env.opponent_names)
+    curve = []
+    reward_sum = cooperations = 0
+    by_opponent = np.zeros((2, n_opponents))
+    start = time.perf_counter()
+    for step in range(1, steps + 1):
+        actions = population.act(rng)
+        played = opponents.copy()
+        moves, opponent_moves, rewards, done = env.step(actions)
+        population.observe(moves, opponent_moves, rewards)
+        population.reset(done)
+        reward_sum += rewards.sum()
+        cooperations += env.size - moves.sum()
+        by_opponent += [np.bincount(played, rewards, n_opponents), np.bincount(played, minlength=n_opponents)]
+        if step % log_every == 0 or step == steps:
+            rounds = by_opponent[1].sum()
+            curve.append({
+                "step": step,
+                "mean_reward": reward_sum / rounds,
+                "cooperation": cooperations / rounds,
+                "by_opponent": {name: total / count if count else None
+                                for name, total, count in zip(env.opponent_names, *by_opponent)},
+                "games": env.games,
+                "steps_per_second": step * env.size / (time.perf_counter() - start),
+            })
+            reward_sum = cooperations = 0
+            by_opponent[:] = 0
+    return curve
+
+def evaluate(population, env, steps, rng):
+    """Mean reward per round of every learner playing greedily for `steps` rounds, without learning."""
+    greedy = QLearningPopulation(population.size, 0.0, population.df, 0.0, population.q_values.copy())
+    env.reset()
+    totals = np.zeros(population.size)
+    for _ in range(steps):
+        moves, opponent_moves, rewards, done = env.step(greedy.act(rng))
+        greedy.observe(moves, opponent_moves, rewards)
+        greedy.reset(done)
+        totals += rewards
+    return totals / steps
+
+def main():
+    from hydra import compose, initialize
+    from omegaconf import OmegaConf
+    from src.agents.llm.base import LLMAgentBase
+    from src.config import load_config
+    from src.tournament import STRATEGY_MAP, Tournament
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--learners", type=int, default=1024, help="Games (and learners) stepped at once")
+    parser.add_argument("--steps", type=int, default=5000, help="Rounds played per learner")
+    parser.add_argument("--opponents", nargs="+", default=None,
+                        help="Opponent pool (default: the table-driven strategies in the config)")
+    parser.add_argument("--log-every", type=int, default=500)
+    parser.add_argument("--out", default=None, help="Write the best learners' Q-tables here")
+    parser.add_argument("--keep", type=int, default=1, help="Learners saved to --out, best final reward first")
+    parser.add_argument("overrides", nargs="*", help="Hydra overrides for conf/config.yaml")
+    args = parser.parse_args()
+
+    with initialize(version_base=None, config_path="../conf"):
+        cfg = compose(config_name="config", overrides=["gui.enabled=false", "network.enabled=false",
+                                                       "logging.verbose=false"] + args.overrides)
+    config = load_config(OmegaConf.to_container(cfg, resolve=True))
+    # Build the opponents the way the tournament would and keep the table-driven ones.
+    config.strategies = [name for name in (args.opponents or config.strategies)
+                         if name in STRATEGY_MAP and not issubclass(STRATEGY_MAP[name], LLMAgentBase)]
+    pool = [player for player in Tournament(config).players if player.cooperation_table() is not None]
+    if not pool:
+        parser.error("No table-driven opponents to train against")
+    seed = config.seed if config.seed is not None else 0
+    env = SelfPlayEnv(config, pool, args.learners, seed)
+    params = config.rl_params
+    population = QLearningPopulation(args.learners, params.learning_rate, params.discount_factor,
+                                     params.exploration_rate)
+    names = [str(player) for player in pool]
+    print(f"Training {args.learners} learners against {', '.join(names)}")
+    print(f"{'step':>7} {'reward':>7} {'coop':>6} {'games':>8} {'steps/s':>10}  " +
+          " ".join(f"{name[:12]:>12}" for name in names))
+    curve = train(population, env, args.steps, np.random.default_rng(seed + 1), args.log_every)
+    for point in curve:
+        print(f"{point['step']:>7} {point['mean_reward']:7.3f} {point['cooperation']:6.1%} {point['games']:>8} "
+              f"{point['steps_per_second']:10.0f}  " +
+              " ".join(f"{point['by_opponent'][name] or 0:12.3f}" for name in names))
+
+    if args.out:
+        # Rank the learners by how they play greedily.
+        rewards = evaluate(population, env, args.log_every, np.random.default_rng(seed + 2))
+        best = np.argsort(-rewards, kind="stable")[:args.keep]
+        save_q_tables(args.out, population.q_values[best], [env.games // args.learners] * len(best),
+                      [f"learner {k}" for k in best])
+        print(f"Saved {len(best)} Q-tables to {args.out} (greedy reward per round: "
+              f"{', '.join(f'{rewards[k]:.3f}' for k in best)}; mean over all learners {rewards.mean():.3f})")
+
+if __name__ == "__main__":
+    main()